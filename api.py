@@ -1,17 +1,69 @@
 # api.py
 
-from fastapi import FastAPI, HTTPException
+import os
+import json
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from llm_client import call_llm
-from typing import List, Dict, Any
+import llm_client
+from llm_client import async_call_llm, stream_llm
+from metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, REGISTRY
+from sectioned import LLM_SUMMARY_STRATEGY, SUMMARY_STRATEGIES
+from template_renderer import SUMMARY_MODE, SUMMARY_MODES, summarize_with_mode
+from summary_store import STORED_STRATEGY, SUMMARY_STORE_PATH, SummaryStore, fact_hash
+from typing import List, Dict, Any, Optional, Union
+
+# Per-request cap on concurrent LLM calls for /generate-summaries, and the
+# largest batch accepted. All requests together are still bounded by
+# llm_client.LLM_MAX_CONCURRENCY.
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+
+# Load the clinical data at startup (default) rather than on the first
+# request that needs it. patient_facts, and with it pandas, numpy and
+# pyarrow, is only imported at that point.
+PRELOAD_CLINICAL_DATA = os.getenv("PRELOAD_CLINICAL_DATA", "1") != "0"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One warm, indexed copy of the clinical tables for every request.
+    if PRELOAD_CLINICAL_DATA:
+        await asyncio.to_thread(_patients)
+    # Summaries precomputed by scheduler.py, written through on live calls.
+    app.state.summaries = SummaryStore(SUMMARY_STORE_PATH) if SUMMARY_STORE_PATH else None
+    yield
+    await llm_client.close()
+
 
 app = FastAPI(
     title="Clinical Summary LLM API",
     description="API endpoint for generating clinical summaries using LLM",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+
+    # Label by route template rather than raw path to keep cardinality
+    # bounded. For streaming responses this is the time to the first byte.
+    route = request.scope.get("route")
+    HTTP_REQUEST_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code)
+    )
+    return response
+
+
 # Request/Response models
 class ClinicalFactsRequest(BaseModel):
     clinical_facts: List[Dict[str, Any]]
@@ -19,6 +71,45 @@ class ClinicalFactsRequest(BaseModel):
 
 class SummaryResponse(BaseModel):
     summary_markdown: str
+    timings: Optional[Dict[str, float]] = None
+    prompt: Optional[Dict[str, int]] = None
+
+
+class PatientFactsResponse(BaseModel):
+    patient_id: int
+    episode_id: int
+    clinical_facts: List[Dict[str, Any]]
+
+
+class PatientSummaryResponse(BaseModel):
+    patient_id: int
+    episode_id: int
+    summary_markdown: str
+    precomputed: bool = False
+    clinical_facts: Optional[List[Dict[str, Any]]] = None
+    timings: Optional[Dict[str, Any]] = None
+    prompt: Optional[Dict[str, int]] = None
+
+
+class BatchItem(BaseModel):
+    id: Union[int, str]
+    clinical_facts: List[Dict[str, Any]]
+
+
+class BatchSummaryRequest(BaseModel):
+    items: List[BatchItem]
+
+
+class BatchItemResult(BaseModel):
+    id: Union[int, str]
+    summary_markdown: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchSummaryResponse(BaseModel):
+    results: List[BatchItemResult]
+    succeeded: int
+    failed: int
 
 
 # API Endpoint
@@ -26,34 +117,366 @@ class SummaryResponse(BaseModel):
 def read_root():
     return {
         "message": "Clinical Summary LLM API",
-        "endpoint": "POST /generate-summary"
+        "endpoint": "POST /generate-summary",
+        "batch_endpoint": "POST /generate-summaries",
+        "stream_endpoint": "POST /generate-summary/stream",
+        "patient_endpoint": "GET /patients/{patient_id}/summary"
     }
 
 
-@app.post("/generate-summary", response_model=SummaryResponse)
-def generate_summary(request: ClinicalFactsRequest):
+@app.get("/metrics")
+def metrics():
+    """
+    Prometheus metrics: DataLoader lookups, per-summarizer time, LLM latency,
+    tokens and errors, cache lookups, and API request latency.
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Hit/miss counters of the LLM response cache, with the LLM latency and
+    tokens the hits have saved.
+    """
+    cache = llm_client.get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def _check_strategy(strategy: Optional[str]):
+    if strategy is not None and strategy not in SUMMARY_STRATEGIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"strategy must be one of: {', '.join(SUMMARY_STRATEGIES)}"
+        )
+
+
+def _check_mode(mode: Optional[str]):
+    if mode is not None and mode not in SUMMARY_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode must be one of: {', '.join(SUMMARY_MODES)}"
+        )
+
+
+@app.post("/generate-summary", response_model=SummaryResponse, response_model_exclude_none=True)
+async def generate_summary(
+    request: ClinicalFactsRequest,
+    include_timings: bool = False,
+    include_prompt_stats: bool = False,
+    strategy: Optional[str] = None,
+    mode: Optional[str] = None
+):
     """
     Generate clinical summary from structured clinical facts using LLM.
     
     Args:
         request: JSON body containing clinical_facts array
+        include_timings: Add per-stage timings (seconds) to the response
+        include_prompt_stats: Add the prompt compaction report (estimated
+            prompt tokens, tokens saved, facts dropped) to the response;
+            omitted when the summary came from the cache
+        strategy: `single` (one completion) or `sectioned` (one completion
+            per section, in parallel; see sectioned.py). Default:
+            LLM_SUMMARY_STRATEGY
+        mode: `llm` (the LLM writes the summary), `template` (rendered
+            from the facts, no LLM call) or `hybrid` (the LLM writes only
+            the overview); see template_renderer.py. Default: SUMMARY_MODE
         
     Returns:
         Markdown-formatted clinical summary
     """
+    _check_strategy(strategy)
+    _check_mode(mode)
     try:
         if not request.clinical_facts:
             raise HTTPException(status_code=400, detail="clinical_facts cannot be empty")
         
+        start = time.perf_counter()
+        report = {}
+        markdown_summary = await summarize_with_mode(request.clinical_facts, report, mode, strategy) # generate summary
+        llm_seconds = time.perf_counter() - start
+
+        timings = None
+        if include_timings:
+            timings = {"llm_seconds": llm_seconds}
         
-        markdown_summary = call_llm(request.clinical_facts) # generate summary
-        
-        return SummaryResponse(summary_markdown=markdown_summary)
+        return SummaryResponse(
+            summary_markdown=markdown_summary,
+            timings=timings,
+            prompt=report if include_prompt_stats and report else None
+        )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
 
 
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+def _summary_stream(facts: list, *leading: str, stored: Optional[str] = None, on_complete=None) -> StreamingResponse:
+    # `leading` events are sent before the summary deltas. A `stored`
+    # summary is sent as one delta instead of calling the LLM; otherwise
+    # `on_complete` is awaited with the full summary and the model that
+    # wrote it once the stream has finished.
+    async def events():
+        for event in leading:
+            yield event
+        if stored is not None:
+            yield _sse({"delta": stored})
+            yield _sse({}, event="done")
+            return
+        report = {}
+        models = set()
+        parts = []
+        try:
+            async for delta in stream_llm(facts, report, models):
+                parts.append(delta)
+                yield _sse({"delta": delta})
+        except Exception as e:
+            yield _sse({"detail": f"Error generating summary: {str(e)}"}, event="error")
+            return
+        if on_complete is not None:
+            await on_complete("".join(parts).strip(), models)
+        yield _sse(report, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/generate-summary/stream")
+async def generate_summary_stream(request: ClinicalFactsRequest):
+    """
+    Stream a clinical summary as Server-Sent Events while the LLM writes it.
+
+    Each `data:` event carries {"delta": "..."} with the next piece of
+    markdown. The stream ends with an `event: done` event carrying the
+    prompt compaction report ({} for a cached summary), or an
+    `event: error` event carrying {"detail": "..."} if generation fails
+    part-way.
+
+    Args:
+        request: JSON body containing clinical_facts array
+    """
+    if not request.clinical_facts:
+        raise HTTPException(status_code=400, detail="clinical_facts cannot be empty")
+
+    return _summary_stream(request.clinical_facts)
+
+
+def _patients():
+    from patient_facts import shared_patient_facts
+
+    return shared_patient_facts()
+
+
+async def _patient_facts(patient_id: int, episode_id: Optional[int], timings: Optional[dict] = None) -> tuple[int, list]:
+    from patient_facts import PatientNotFound
+
+    # Loading (on first use) and fact generation are CPU-bound; keep them
+    # off the event loop.
+    try:
+        return await asyncio.to_thread(lambda: _patients().generate(patient_id, episode_id, timings))
+    except PatientNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def _uses_store(mode: Optional[str], strategy: Optional[str]) -> bool:
+    # Only summaries made the way scheduler.py makes them share the store.
+    return (mode or SUMMARY_MODE) == "llm" and (strategy or LLM_SUMMARY_STRATEGY) == STORED_STRATEGY
+
+
+# The summary store is SQLite, shared with scheduler.py; its reads and writes
+# run in a thread so a busy database never stalls the event loop.
+
+async def _stored_summary(request: Request, patient_id: int, episode_id: int, facts_hash: str) -> Optional[str]:
+    store = request.app.state.summaries
+    if store is None:
+        return None
+    return await asyncio.to_thread(store.current, patient_id, episode_id, facts_hash)
+
+
+async def _store_summary(request: Request, patient_id: int, episode_id: int, facts_hash: str, summary: str, models: set):
+    # Only the primary model's summaries are stored, as in the LLM cache; a
+    # fallback model's is served but leaves the store as it was.
+    store = request.app.state.summaries
+    if store is not None and models == {llm_client.LLM_MODEL}:
+        await asyncio.to_thread(store.put, patient_id, episode_id, facts_hash, summary, llm_client.LLM_MODEL)
+
+
+@app.get("/patients")
+def list_patients():
+    """
+    Patient IDs that have at least one episode.
+    """
+    return {"patient_ids": _patients().patient_ids()}
+
+
+@app.get("/patients/{patient_id}/facts", response_model=PatientFactsResponse)
+async def patient_facts(patient_id: int, episode_id: Optional[int] = None):
+    """
+    Clinical facts for a patient episode, generated from the server's data.
+
+    Args:
+        patient_id: Patient to summarize
+        episode_id: Episode to summarize (default: the patient's latest)
+    """
+    episode_id, facts = await _patient_facts(patient_id, episode_id)
+    return PatientFactsResponse(patient_id=patient_id, episode_id=episode_id, clinical_facts=facts)
+
+
+@app.get("/patients/{patient_id}/summary", response_model=PatientSummaryResponse, response_model_exclude_none=True)
+async def patient_summary(
+    request: Request,
+    patient_id: int,
+    episode_id: Optional[int] = None,
+    include_facts: bool = False,
+    include_timings: bool = False,
+    include_prompt_stats: bool = False,
+    strategy: Optional[str] = None,
+    mode: Optional[str] = None
+):
+    """
+    Generate a clinical summary for a patient episode. Facts are built
+    server-side, so only the patient ID travels over the wire. In the llm
+    mode with the single strategy, a summary precomputed by scheduler.py
+    from the same facts is returned without calling the LLM (`precomputed`
+    is true); other modes and strategies neither read nor replace stored
+    summaries.
+
+    Args:
+        patient_id: Patient to summarize
+        episode_id: Episode to summarize (default: the patient's latest)
+        include_facts: Add the clinical facts sent to the LLM to the response
+        include_timings: Add timings (seconds) to the response: fact
+            generation, each summarizer, and the summary (LLM or store)
+        include_prompt_stats: Add the prompt compaction report, as in
+            /generate-summary
+        strategy: `single` or `sectioned`, as in /generate-summary
+        mode: `llm`, `template` or `hybrid`, as in /generate-summary
+    """
+    _check_strategy(strategy)
+    _check_mode(mode)
+    start = time.perf_counter()
+    summarizer_seconds = {}
+    episode_id, facts = await _patient_facts(patient_id, episode_id, summarizer_seconds)
+    facts_seconds = time.perf_counter() - start
+    if not facts:
+        raise HTTPException(status_code=404, detail=f"No clinical facts for patient {patient_id}")
+
+    start = time.perf_counter()
+    stored = _uses_store(mode, strategy)
+    facts_hash = fact_hash(facts)
+    report = {}
+    models = set()
+    markdown_summary = await _stored_summary(request, patient_id, episode_id, facts_hash) if stored else None
+    precomputed = markdown_summary is not None
+    if not precomputed:
+        try:
+            markdown_summary = await summarize_with_mode(facts, report, mode, strategy, models)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
+        if stored:
+            await _store_summary(request, patient_id, episode_id, facts_hash, markdown_summary, models)
+    llm_seconds = time.perf_counter() - start
+
+    timings = None
+    if include_timings:
+        timings = {
+            "facts_seconds": facts_seconds,
+            "summarizer_seconds": summarizer_seconds,
+            "llm_seconds": llm_seconds,
+        }
+
+    return PatientSummaryResponse(
+        patient_id=patient_id,
+        episode_id=episode_id,
+        summary_markdown=markdown_summary,
+        precomputed=precomputed,
+        clinical_facts=facts if include_facts else None,
+        timings=timings,
+        prompt=report if include_prompt_stats and report else None
+    )
+
+
+@app.get("/patients/{patient_id}/summary/stream")
+async def patient_summary_stream(request: Request, patient_id: int, episode_id: Optional[int] = None):
+    """
+    Stream a patient's summary as Server-Sent Events. The first event is
+    `event: facts` carrying {"patient_id", "episode_id", "clinical_facts"};
+    the rest are as in /generate-summary/stream. A precomputed summary
+    (see /patients/{patient_id}/summary) arrives as a single delta.
+
+    Args:
+        patient_id: Patient to summarize
+        episode_id: Episode to summarize (default: the patient's latest)
+    """
+    episode_id, facts = await _patient_facts(patient_id, episode_id)
+    if not facts:
+        raise HTTPException(status_code=404, detail=f"No clinical facts for patient {patient_id}")
+
+    first = _sse({"patient_id": patient_id, "episode_id": episode_id, "clinical_facts": facts}, event="facts")
+    facts_hash = fact_hash(facts)
+    return _summary_stream(
+        facts,
+        first,
+        stored=await _stored_summary(request, patient_id, episode_id, facts_hash),
+        on_complete=lambda summary, models: _store_summary(request, patient_id, episode_id, facts_hash, summary, models)
+    )
+
+
+@app.post("/generate-summaries", response_model=BatchSummaryResponse)
+async def generate_summaries(request: BatchSummaryRequest):
+    """
+    Generate summaries for many patients in one request.
+
+    Items are sent to the LLM concurrently, at most BATCH_MAX_CONCURRENCY
+    at a time. A failing item is reported in its own result's `error`
+    field and does not affect the others; results keep the request order.
+
+    Args:
+        request: JSON body containing items of {id, clinical_facts}
+
+    Returns:
+        Per-item summaries or errors, plus success/failure counts
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="items cannot be empty")
+    if len(request.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"at most {BATCH_MAX_ITEMS} items are accepted per batch"
+        )
+
+    slots = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def summarize(item: BatchItem) -> BatchItemResult:
+        if not item.clinical_facts:
+            return BatchItemResult(id=item.id, error="clinical_facts cannot be empty")
+        try:
+            async with slots:
+                markdown_summary = await async_call_llm(item.clinical_facts)
+            return BatchItemResult(id=item.id, summary_markdown=markdown_summary)
+        except Exception as e:
+            return BatchItemResult(id=item.id, error=f"Error generating summary: {str(e)}")
+
+    results = await asyncio.gather(*(summarize(item) for item in request.items))
+    failed = sum(result.error is not None for result in results)
+
+    return BatchSummaryResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,73 @@
+# benchmarks/bench_cohort.py
+#
+# Checks that the cohort engine reproduces the per-patient facts exactly and
+# times both paths. --replicate N tiles data/ N times under fresh patient and
+# episode ids to get a larger census.
+#
+#   python -m benchmarks.bench_cohort --replicate 200
+
+import argparse
+import time
+
+import pandas as pd
+
+from clinical_data import read_clinical_tables
+from cohort import CohortSummaryGenerator, latest_episodes
+from summarizers import DataLoader, SummaryGenerator
+
+
+def replicate(dataframes: dict, copies: int) -> dict:
+    if copies <= 1:
+        return dataframes
+
+    out = {}
+    for table, df in dataframes.items():
+        parts = []
+        for i in range(copies):
+            part = df.copy()
+            part["patient_id"] = part["patient_id"] + i * 100_000
+            if "episode_id" in part:
+                part["episode_id"] = part["episode_id"] + i * 100_000
+            parts.append(part)
+        out[table] = pd.concat(parts, ignore_index=True)
+    return out
+
+
+def per_patient_facts(dataframes: dict) -> dict:
+    repo = DataLoader(dataframes)
+    episodes = latest_episodes(dataframes["diagnoses_df"])
+    return {
+        patient_id: SummaryGenerator.for_patient(repo, patient_id, episode_id).generate()
+        for patient_id, episode_id in zip(
+            episodes["patient_id"].tolist(), episodes["episode_id"].tolist()
+        )
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cohort vs per-patient fact generation")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--replicate", type=int, default=1)
+    args = parser.parse_args()
+
+    dataframes = replicate(read_clinical_tables(args.data_dir), args.replicate)
+
+    start = time.perf_counter()
+    expected = per_patient_facts(dataframes)
+    per_patient_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = CohortSummaryGenerator(dataframes).generate()
+    cohort_s = time.perf_counter() - start
+
+    mismatched = [pid for pid in expected if expected[pid] != actual.get(pid)]
+    if mismatched or expected.keys() != actual.keys():
+        raise SystemExit(f"cohort output differs for patients {mismatched[:10]}")
+
+    print(f"patients:     {len(expected):,}")
+    print(f"per-patient:  {per_patient_s:.3f}s")
+    print(f"cohort:       {cohort_s:.3f}s ({per_patient_s / cohort_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
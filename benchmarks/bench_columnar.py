@@ -0,0 +1,66 @@
+# benchmarks/bench_columnar.py
+#
+# Cold-start cost of the CSV path (parse every table, hold it in memory) vs
+# the Parquet store (read one patient's row groups on demand), and a check
+# that both produce the same facts.
+#
+#   python -m benchmarks.bench_columnar --replicate 2000
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_cohort import replicate
+from clinical_data import TABLE_FILES, read_clinical_tables
+from cohort import latest_episodes
+from columnar import ParquetDataLoader, convert_data_dir
+from summarizers import DataLoader, SummaryGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs Parquet cold start")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--replicate", type=int, default=500)
+    parser.add_argument("--patients", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = os.path.join(tmp, "csv")
+        parquet_dir = os.path.join(tmp, "parquet")
+        os.makedirs(csv_dir)
+
+        for table, df in replicate(read_clinical_tables(args.data_dir), args.replicate).items():
+            df.to_csv(os.path.join(csv_dir, TABLE_FILES[table]), index=False)
+
+        start = time.perf_counter()
+        convert_data_dir(csv_dir, parquet_dir)
+        print(f"ingest:            {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        dataframes = read_clinical_tables(csv_dir)
+        csv_load_s = time.perf_counter() - start
+        csv_bytes = sum(df.memory_usage(deep=True).sum() for df in dataframes.values())
+
+        episodes = latest_episodes(dataframes["diagnoses_df"]).sample(
+            args.patients, random_state=0
+        )
+        keys = list(zip(episodes["patient_id"].tolist(), episodes["episode_id"].tolist()))
+
+        csv_repo = DataLoader(dataframes)
+        parquet_repo = ParquetDataLoader(parquet_dir)
+
+        start = time.perf_counter()
+        parquet_facts = [SummaryGenerator.for_patient(parquet_repo, *k).generate() for k in keys]
+        parquet_s = (time.perf_counter() - start) / len(keys)
+
+        csv_facts = [SummaryGenerator.for_patient(csv_repo, *k).generate() for k in keys]
+        if csv_facts != parquet_facts:
+            raise SystemExit("Parquet facts differ from CSV facts")
+
+    print(f"CSV load:          {csv_load_s:.2f}s, {csv_bytes / 2**20:.1f} MiB resident")
+    print(f"Parquet per patient: {parquet_s * 1e3:.1f} ms, nothing resident")
+
+
+if __name__ == "__main__":
+    main()
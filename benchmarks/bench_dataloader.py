@@ -0,0 +1,78 @@
+# benchmarks/bench_dataloader.py
+#
+# Compares the indexed DataLoader lookups against the old boolean-mask path
+# on a synthetic vitals-shaped table.
+#
+#   python -m benchmarks.bench_dataloader --rows 10000 1000000 10000000
+
+import argparse
+import time
+
+import pandas as pd
+
+from summarizers import DataLoader
+from tests.reference import make_vitals
+
+
+def mask_get(df: pd.DataFrame, patient_id: int, episode_id: int) -> pd.DataFrame:
+    # The pre-index DataLoader.get implementation.
+    return df[(df["patient_id"] == patient_id) & (df["episode_id"] == episode_id)].copy()
+
+
+def bench(n_rows: int, lookups: int) -> dict:
+    df = make_vitals(n_rows)
+    keys = df[["patient_id", "episode_id"]].drop_duplicates().sample(
+        min(lookups, len(df)), replace=True, random_state=0
+    ).to_numpy().tolist()
+
+    start = time.perf_counter()
+    for patient_id, episode_id in keys:
+        mask_get(df, patient_id, episode_id)
+    mask_s = (time.perf_counter() - start) / len(keys)
+
+    loader = DataLoader({"vitals_df": df})
+    start = time.perf_counter()
+    loader.get("vitals_df", *keys[0], copy=False)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for patient_id, episode_id in keys:
+        loader.get("vitals_df", patient_id, episode_id, copy=False)
+    view_s = (time.perf_counter() - start) / len(keys)
+
+    start = time.perf_counter()
+    for patient_id, episode_id in keys:
+        loader.get("vitals_df", patient_id, episode_id)
+    copy_s = (time.perf_counter() - start) / len(keys)
+
+    for patient_id, episode_id in keys[:5]:
+        expected = mask_get(df, patient_id, episode_id)
+        pd.testing.assert_frame_equal(loader.get("vitals_df", patient_id, episode_id), expected)
+
+    return {
+        "rows": n_rows,
+        "mask_ms": mask_s * 1e3,
+        "index_build_s": build_s,
+        "index_view_ms": view_s * 1e3,
+        "index_copy_ms": copy_s * 1e3,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed vs boolean-mask DataLoader lookups")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--lookups", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'mask ms':>10} {'build s':>9} {'view ms':>9} {'copy ms':>9} {'speedup':>9}")
+    for n_rows in args.rows:
+        r = bench(n_rows, args.lookups)
+        print(
+            f"{r['rows']:>12,} {r['mask_ms']:>10.3f} {r['index_build_s']:>9.3f} "
+            f"{r['index_view_ms']:>9.4f} {r['index_copy_ms']:>9.4f} "
+            f"{r['mask_ms'] / r['index_view_ms']:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
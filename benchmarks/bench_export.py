@@ -0,0 +1,84 @@
+# benchmarks/bench_export.py
+#
+# Peak memory and time of exporting every patient's facts from a synthetic
+# dataset: all tables in memory and one CohortSummaryGenerator pass, vs.
+# cohort_export.py with an increasing number of partitions. Each run is a
+# fresh spawned process, so its peak RSS (VmHWM) is its own.
+#
+#   python -m benchmarks.bench_export --patients 50000 --partitions 1 4 16
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from synthetic_data import generate_tables, write_tables
+
+
+def in_memory(data_dir: str, out_path: str) -> int:
+    from clinical_data import read_clinical_tables
+    from cohort import CohortSummaryGenerator, latest_episodes
+    from cohort_export import JsonlFactsWriter
+
+    dataframes = read_clinical_tables(data_dir, compact=True)
+    facts = CohortSummaryGenerator(dataframes).generate()
+    episodes = latest_episodes(dataframes["diagnoses_df"])
+    writer = JsonlFactsWriter(out_path)
+    writer.write([
+        (patient_id, episode_id, facts[patient_id])
+        for patient_id, episode_id in zip(episodes["patient_id"], episodes["episode_id"])
+    ])
+    writer.close()
+    return len(facts)
+
+
+def worker(partitions: int, data_dir: str, out_path: str, results):
+    from cohort_export import export_facts, peak_rss_mib
+
+    start = time.perf_counter()
+    if partitions:
+        patients = export_facts(data_dir, out_path, partitions=partitions, progress=lambda line: None)["patients"]
+    else:
+        patients = in_memory(data_dir, out_path)
+    results.put({
+        "seconds": time.perf_counter() - start,
+        "patients": patients,
+        "peak_rss_mib": peak_rss_mib(),
+    })
+
+
+def run(partitions: int, data_dir: str, out_path: str) -> dict:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=worker, args=(partitions, data_dir, out_path, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cohort export: in memory vs. partitioned")
+    parser.add_argument("--patients", type=int, default=50000, help="synthetic patients")
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "csv")
+        write_tables(generate_tables(args.patients), data_dir)
+        size_mib = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir)) / 2**20
+        print(f"{args.patients:,} patients, {size_mib:,.0f} MiB of CSV\n")
+
+        print(f"{'run':<16} {'seconds':>8} {'patients/s':>11} {'peak RSS MiB':>13}")
+        for partitions in [0] + args.partitions:
+            result = run(partitions, data_dir, os.path.join(tmp, "facts.jsonl"))
+            name = f"{partitions} partitions" if partitions else "in memory"
+            print(
+                f"{name:<16} {result['seconds']:>8.1f} {result['patients'] / result['seconds']:>11,.0f} "
+                f"{result['peak_rss_mib']:>13,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
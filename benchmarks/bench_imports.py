@@ -0,0 +1,57 @@
+# benchmarks/bench_imports.py
+#
+# Import time of the service modules, each in a fresh interpreter, as
+# reported by `python -X importtime` (the cumulative time of the module's
+# own import, so interpreter startup is excluded). The best of --samples
+# runs is kept. bench_suite.py records these alongside its throughput
+# numbers, so --save/--compare there catch import-time regressions too.
+#
+#   python -m benchmarks.bench_imports
+#   python -m benchmarks.bench_imports api llm_client --samples 10
+
+import argparse
+import subprocess
+import sys
+
+# What a uvicorn worker, the scheduler and the CLI tools import first.
+MODULES = ["api", "llm_client", "sectioned", "scheduler", "patient_facts", "summarizers"]
+
+
+def import_seconds(module: str, samples: int = 3) -> float:
+    best = None
+    for _ in range(samples):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # Lines read "import time: <self us> | <cumulative us> | <name>";
+        # the top-level module is the last line naming it unindented.
+        cumulative = None
+        for line in result.stderr.splitlines():
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+                cumulative = int(fields[1]) / 1e6
+        if cumulative is None:
+            raise RuntimeError(f"no importtime line for {module}")
+        best = cumulative if best is None else min(best, cumulative)
+    return best
+
+
+def import_times(modules: list[str] = MODULES, samples: int = 3) -> dict:
+    return {f"import {module}": import_seconds(module, samples) for module in modules}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Module import times (python -X importtime)")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, seconds in import_times(args.modules, args.samples).items():
+        print(f"  {name:<22} {seconds * 1e3:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_llm_throughput.py
+#
+# Fires concurrent async_call_llm requests and reports throughput. Run it
+# against fake_llm_server.py to measure client-side concurrency offline:
+#
+#   uvicorn fake_llm_server:app --port 8001
+#   python -m benchmarks.bench_llm_throughput --base-url http://localhost:8001/v1 \
+#       --requests 1000 --concurrency 10 100 500
+
+import argparse
+import asyncio
+import os
+import time
+
+FACTS = [{"statement": "Patient has hypertension", "source": "diagnoses.csv", "date": None}]
+
+
+async def run(call, n_requests: int, concurrency: int) -> float:
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with gate:
+            await call(FACTS)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async LLM client throughput")
+    parser.add_argument("--base-url", default="http://localhost:8001/v1")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 250])
+    args = parser.parse_args()
+
+    # llm_client reads its configuration at import time.
+    os.environ["LLM_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPEN_ROUTER_API_KEY", "offline")
+    from llm_client import async_call_llm
+
+    async def sweep():
+        print(f"{'concurrency':>12} {'seconds':>9} {'req/s':>9}")
+        for concurrency in args.concurrency:
+            elapsed = await run(async_call_llm, args.requests, concurrency)
+            print(f"{concurrency:>12} {elapsed:>9.2f} {args.requests / elapsed:>9.1f}")
+
+    asyncio.run(sweep())
+
+
+if __name__ == "__main__":
+    main()
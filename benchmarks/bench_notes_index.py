@@ -0,0 +1,84 @@
+# benchmarks/bench_notes_index.py
+#
+# Relevant-note retrieval for one episode on synthetic notes: a scan of the
+# episode's note_text per request (regular expressions over the notes of an
+# indexed DataLoader lookup) vs. the FTS5 index of notes_index.py. Both
+# return the matching notes; the index also builds the snippets.
+#
+#   python -m benchmarks.bench_notes_index --patients 50000 --lookups 1000
+
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+
+from notes_index import NOTE_TOPICS, NotesIndex, build_notes_index
+from summarizers import DataLoader
+from synthetic_data import generate_tables
+
+# The NOTE_TOPICS terms as case-insensitive patterns, for the scan.
+TOPIC_PATTERNS = {
+    "wound": r"\b(wound|ulcer|dressing|incision|pressure injur)",
+    "hospice": r"\b(hospice|palliative|comfort care|end of life)",
+    "falls": r"\b(fall|fell)",
+    "weight loss": r"\b(weight loss|lost weight|losing weight|cachexia|poor appetite)",
+}
+
+
+def scan(repo: DataLoader, patient_id: int, episode_id: int) -> int:
+    notes = repo.get("notes_df", patient_id, episode_id, copy=False)["note_text"].astype(str)
+    matched = np.zeros(len(notes), dtype=bool)
+    for pattern in TOPIC_PATTERNS.values():
+        matched |= notes.str.contains(pattern, flags=re.IGNORECASE, regex=True).to_numpy()
+    return int(matched.sum())
+
+
+def percentiles(seconds: list[float]) -> str:
+    p50, p99 = np.percentile(seconds, [50, 99]) * 1e3
+    return f"p50 {p50:>7.3f} ms   p99 {p99:>7.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Note retrieval: per-request scan vs. FTS5 index")
+    parser.add_argument("--patients", type=int, default=50000)
+    parser.add_argument("--visits", type=int, default=10, help="visits (and notes) per episode")
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+    assert set(TOPIC_PATTERNS) == set(NOTE_TOPICS)
+
+    notes = generate_tables(args.patients, args.visits)["notes_df"]
+    keys = notes[["patient_id", "episode_id"]].drop_duplicates().sample(
+        min(args.lookups, args.patients), random_state=0
+    )
+    keys = list(keys.itertuples(index=False, name=None))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notes_index.sqlite")
+        start = time.perf_counter()
+        build_notes_index(notes, path)
+        print(f"{len(notes):,} notes indexed in {time.perf_counter() - start:.2f}s, "
+              f"{os.path.getsize(path) / 2**20:.1f} MiB\n")
+
+        index = NotesIndex(path)
+        repo = DataLoader({"notes_df": notes})
+        repo.get("notes_df", None, None, copy=False)
+
+        results = {}
+        for name, lookup in (("scan", lambda k: scan(repo, *k)), ("index", lambda k: index.search(*k))):
+            seconds = []
+            for key in keys:
+                start = time.perf_counter()
+                lookup(key)
+                seconds.append(time.perf_counter() - start)
+            results[name] = seconds
+            print(f"{name:<6} {percentiles(seconds)}")
+
+    speedup = np.median(results["scan"]) / np.median(results["index"])
+    print(f"\nindex is {speedup:.1f}x faster per episode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/bench_parallel.py
+#
+# Times SummaryGenerator in serial, thread and process mode for one patient
+# episode whose vitals and notes tables are inflated to --rows rows each, and
+# checks that every mode returns the same facts in the same order.
+#
+#   python -m benchmarks.bench_parallel --rows 200000 1000000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from clinical_data import read_clinical_tables
+from cohort import latest_episodes
+from summarizers import EXECUTION_MODES, DataLoader, SummaryGenerator
+
+
+def inflate(df: pd.DataFrame, n_rows: int, seed: int = 0) -> pd.DataFrame:
+    # Repeat the episode's rows up to n_rows, spreading dates over a year so
+    # drop_duplicates keeps most of them.
+    if df.empty:
+        return df
+    rng = np.random.default_rng(seed)
+    out = df.sample(n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    date_col = "visit_date" if "visit_date" in out.columns else "note_date"
+    shift = pd.to_timedelta(rng.integers(0, 365, n_rows), unit="D")
+    out[date_col] = (pd.to_datetime(out[date_col]) + shift).dt.strftime("%Y-%m-%d")
+    if "reading" in out.columns:
+        out["reading"] = (out["reading"] + rng.normal(0, 5, n_rows)).round(1)
+    return out
+
+
+def bench(dataframes: dict, n_rows: int, repeats: int) -> dict:
+    patient_id, episode_id = latest_episodes(dataframes["diagnoses_df"]).iloc[0].tolist()
+
+    dfs = dict(dataframes)
+    for table in ("vitals_df", "notes_df"):
+        rows = dfs[table][(dfs[table]["patient_id"] == patient_id) & (dfs[table]["episode_id"] == episode_id)]
+        dfs[table] = inflate(rows, n_rows)
+    repo = DataLoader(dfs)
+
+    results, facts = {}, {}
+    for mode in EXECUTION_MODES:
+        # Warm-up: builds the loader index and starts the pool.
+        SummaryGenerator.for_patient(repo, patient_id, episode_id, mode=mode).generate()
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            facts[mode] = SummaryGenerator.for_patient(repo, patient_id, episode_id, mode=mode).generate()
+        results[mode] = (time.perf_counter() - start) / repeats
+
+    for mode in EXECUTION_MODES:
+        if facts[mode] != facts["serial"]:
+            raise AssertionError(f"{mode} facts differ from serial")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SummaryGenerator execution modes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[200_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    dataframes = read_clinical_tables("data")
+    print(f"{'rows':>12} " + " ".join(f"{mode:>10}" for mode in EXECUTION_MODES))
+    for n_rows in args.rows:
+        results = bench(dataframes, n_rows, args.repeats)
+        print(f"{n_rows:>12,} " + " ".join(f"{results[mode]:>9.3f}s" for mode in EXECUTION_MODES))
+
+
+if __name__ == "__main__":
+    main()
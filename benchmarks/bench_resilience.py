@@ -0,0 +1,119 @@
+# benchmarks/bench_resilience.py
+#
+# Success rate and latency percentiles of async_call_llm against a faulty
+# fake_llm_server.py (in-process, no network), single attempt vs. the
+# resilience policy of llm_resilience.py:
+#
+#   single      one model, no retries, no hedging
+#   resilient   retries with backoff, hedging at --hedge-percentile and a
+#               fallback model that the fake server always answers
+#
+#   python -m benchmarks.bench_resilience --requests 500 --concurrency 50 \
+#       --rate-limit 0.1 --errors 0.05 --slow 0.05 --failing-primary
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+
+PRIMARY = "primary-model"
+FALLBACK = "fallback-model"
+
+
+async def run(call, n_requests: int, concurrency: int) -> tuple[list[float], int]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        # Distinct facts per request, so nothing is coalesced.
+        facts = [{"statement": f"Patient {i} has hypertension", "source": "diagnoses.csv", "date": None}]
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await call(facts)
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    # llm_client prints every failed call; keep the table readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM client resilience under injected faults")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--rate-limit", type=float, default=0.1, help="fraction of 429 responses")
+    parser.add_argument("--errors", type=float, default=0.05, help="fraction of 500 responses")
+    parser.add_argument("--slow", type=float, default=0.05, help="fraction of slow responses")
+    parser.add_argument("--slow-ms", type=float, default=2000)
+    parser.add_argument("--failing-primary", action="store_true", help="primary model always answers 503")
+    parser.add_argument("--hedge-percentile", type=float, default=90)
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=0.05, help="base backoff seconds")
+    args = parser.parse_args()
+
+    # llm_client reads its configuration at import time.
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("OPEN_ROUTER_API_KEY", "offline")
+
+    import httpx
+    from openai import AsyncOpenAI
+
+    import fake_llm_server
+    import llm_client
+    from llm_resilience import ResilientCaller
+
+    fake_llm_server.LATENCY_MS = args.latency_ms
+    fake_llm_server.JITTER_MS = args.latency_ms / 5
+    fake_llm_server.RATE_LIMIT_RATE = args.rate_limit
+    fake_llm_server.ERROR_RATE = args.errors
+    fake_llm_server.SLOW_RATE = args.slow
+    fake_llm_server.SLOW_MS = args.slow_ms
+    fake_llm_server.FAILING_MODELS = {PRIMARY} if args.failing_primary else set()
+
+    llm_client.async_client = AsyncOpenAI(
+        api_key="offline",
+        base_url="http://fake-llm/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_llm_server.app)),
+    )
+
+    policies = {
+        "single": ResilientCaller([PRIMARY], max_retries=0, deadline_seconds=0),
+        "resilient": ResilientCaller(
+            [PRIMARY, FALLBACK],
+            max_retries=args.max_retries,
+            backoff_seconds=args.backoff,
+            max_backoff_seconds=args.backoff * 16,
+            deadline_seconds=30,
+            hedge_percentile=args.hedge_percentile,
+        ),
+    }
+
+    async def compare():
+        print(f"{'policy':<10} {'success':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for name, policy in policies.items():
+            llm_client.resilience = policy
+            # Warm up the latency window that hedging reads.
+            await run(llm_client.async_call_llm, 50, args.concurrency)
+            latencies, failures = await run(llm_client.async_call_llm, args.requests, args.concurrency)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3 if latencies else (float("nan"),) * 3
+            success = 1 - failures / args.requests
+            print(f"{name:<10} {success:>8.1%} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+
+    asyncio.run(compare())
+
+
+if __name__ == "__main__":
+    main()
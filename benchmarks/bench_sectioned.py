@@ -0,0 +1,74 @@
+# benchmarks/bench_sectioned.py
+#
+# Wall-clock time of one summary, single completion vs. sectioned map-reduce
+# (sectioned.py), against fake_llm_server.py in-process. The fake server
+# charges --token-ms per requested max_tokens, so a completion's latency
+# follows its output budget the way decode time does:
+#
+#   python -m benchmarks.bench_sectioned --token-ms 2 --repeat 3
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single vs. sectioned summary generation latency")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--token-ms", type=float, default=2, help="fake decode time per max_tokens")
+    parser.add_argument("--latency-ms", type=float, default=100, help="fake time to first token")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # llm_client reads its configuration at import time.
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("OPEN_ROUTER_API_KEY", "offline")
+
+    import httpx
+    from openai import AsyncOpenAI
+
+    import fake_llm_server
+    import llm_client
+    from clinical_data import read_clinical_tables
+    from patient_facts import PatientFacts
+    from sectioned import SECTIONS, partition_facts, summarize
+    from summarizers import DataLoader
+
+    fake_llm_server.LATENCY_MS = args.latency_ms
+    fake_llm_server.JITTER_MS = 0
+    fake_llm_server.TOKEN_MS = args.token_ms
+    llm_client.async_client = AsyncOpenAI(
+        api_key="offline",
+        base_url="http://fake-llm/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_llm_server.app)),
+    )
+
+    patients = PatientFacts(DataLoader(read_clinical_tables(args.data_dir, compact=True)))
+    facts = patients.generate(patients.patient_ids()[0])[1]
+    filled = sum(1 for part in partition_facts(facts) if part)
+    print(f"{len(facts)} facts, {filled}/{len(SECTIONS)} sections with facts\n")
+
+    async def timed(strategy: str) -> list[float]:
+        seconds = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await summarize(facts, strategy=strategy)
+            seconds.append(time.perf_counter() - start)
+        return seconds
+
+    async def compare():
+        results = {strategy: await timed(strategy) for strategy in ("single", "sectioned")}
+        print(f"{'strategy':<10} {'median ms':>10} {'min ms':>10}")
+        for strategy, seconds in results.items():
+            print(f"{strategy:<10} {statistics.median(seconds) * 1e3:>10.1f} {min(seconds) * 1e3:>10.1f}")
+        speedup = statistics.median(results["single"]) / statistics.median(results["sectioned"])
+        print(f"\nsectioned is {speedup:.1f}x faster")
+
+    asyncio.run(compare())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_shared.py
+#
+# Memory of N worker processes serving the same synthetic dataset, each
+# with its own in-memory copy of the CSV tables vs. all of them mapping one
+# published shared dataset (shared_dataset.py). Every worker loads its data,
+# generates facts for --patients patients and, while all workers are still
+# alive, reports its RSS and PSS from /proc/self/smaps_rollup (Linux). PSS
+# splits shared pages between the processes mapping them, so the PSS sum
+# is what the workers cost the host together.
+#
+#   python -m benchmarks.bench_shared --patients-total 20000 --workers 4
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from synthetic_data import generate_tables, write_tables
+
+
+def memory_kib() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name.lower()] = int(rest.split()[0])
+    return values
+
+
+def worker(mode: str, data_dir: str, shared_dir: str, n_patients: int, barrier, results):
+    from clinical_data import read_clinical_tables
+    from patient_facts import PatientFacts
+    from shared_dataset import SharedDataLoader
+    from summarizers import DataLoader
+
+    start = time.perf_counter()
+    if mode == "shared":
+        repo = SharedDataLoader(shared_dir)
+    else:
+        repo = DataLoader(read_clinical_tables(data_dir, compact=True))
+    patients = PatientFacts(repo)
+    patients.warm()
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for patient_id in patients.patient_ids()[:n_patients]:
+        patients.generate(patient_id)
+    per_patient_s = (time.perf_counter() - start) / n_patients
+
+    barrier.wait()
+    results.put({"load_s": load_s, "per_patient_s": per_patient_s, **memory_kib()})
+    # Stay mapped until every worker has measured.
+    barrier.wait()
+
+
+def run(mode: str, data_dir: str, shared_dir: str, workers: int, n_patients: int) -> list[dict]:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, data_dir, shared_dir, n_patients, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory, private CSV copies vs. shared mapping")
+    parser.add_argument("--patients-total", type=int, default=20000, help="synthetic patients")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--patients", type=int, default=50, help="patients summarized per worker")
+    args = parser.parse_args()
+
+    from shared_dataset import publish
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "csv")
+        shared_dir = os.path.join(tmp, "shared")
+        write_tables(generate_tables(args.patients_total), data_dir)
+        start = time.perf_counter()
+        publish(data_dir, shared_dir)
+        print(f"publish: {time.perf_counter() - start:.2f}s\n")
+
+        print(
+            f"{'mode':<8} {'load s':>8} {'ms/patient':>11} {'RSS MiB/worker':>15} "
+            f"{'PSS MiB/worker':>15} {'PSS MiB total':>14}"
+        )
+        for mode in ("csv", "shared"):
+            measured = run(mode, data_dir, shared_dir, args.workers, args.patients)
+            n = len(measured)
+            rss = sum(m["rss"] for m in measured) / 1024
+            pss = sum(m["pss"] for m in measured) / 1024
+            print(
+                f"{mode:<8} {sum(m['load_s'] for m in measured) / n:>8.2f} "
+                f"{sum(m['per_patient_s'] for m in measured) / n * 1e3:>11.1f} "
+                f"{rss / n:>15.1f} {pss / n:>15.1f} {pss:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
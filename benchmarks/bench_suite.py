@@ -0,0 +1,185 @@
+# benchmarks/bench_suite.py
+#
+# Throughput regression suite on synthetic data (synthetic_data.py). For each
+# cohort size it times, per operation:
+#
+#   dataloader_index      first lookup per table (builds the key indexes)
+#   dataloader_get        one indexed DataLoader lookup
+#   <Summarizer>          each of the six summarizers on one patient episode
+#   summary_generate      SummaryGenerator.for_patient(...).generate()
+#   api_round_trip        POST /generate-summary through the ASGI app, with
+#                         fake_llm_server.py standing in for the LLM (no
+#                         network, no response cache, zero model latency)
+#
+# plus, once per run, the import time of the service modules
+# (bench_imports.py), recorded under "imports".
+#
+#   python -m benchmarks.bench_suite --patients 1000 100000 --save baseline.json
+#   python -m benchmarks.bench_suite --patients 1000 100000 --compare baseline.json
+#
+# With --compare the run fails (exit status 1) when any operation is more
+# than --tolerance slower than the baseline. 1M patients needs a few GB of
+# memory; use fewer --visits on small machines.
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_imports import import_times
+from cohort import latest_episodes
+from schema import compact_tables
+from summarizers import DataLoader, SummaryGenerator
+from synthetic_data import generate_tables
+
+TABLES = ["diagnoses_df", "meds_df", "vitals_df", "notes_df", "wounds_df"]
+
+
+def sample_episodes(dataframes: dict, n: int, seed: int = 0) -> list[tuple[int, int]]:
+    episodes = latest_episodes(dataframes["diagnoses_df"])
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(episodes), size=min(n, len(episodes)), replace=False)
+    return [tuple(pair) for pair in episodes.iloc[rows].to_numpy().tolist()]
+
+
+def per_call(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def bench_pipeline(dataframes: dict, keys: list) -> dict:
+    repo = DataLoader(dataframes)
+    results = {}
+
+    start = time.perf_counter()
+    for table in TABLES:
+        repo.get(table, *keys[0], copy=False)
+    repo.get_patient_only("oasis_df", keys[0][0])
+    results["dataloader_index"] = time.perf_counter() - start
+
+    results["dataloader_get"] = per_call(
+        lambda key: [repo.get(table, *key) for table in TABLES], keys
+    ) / len(TABLES)
+
+    # Build every generator up front so the summarizer timings exclude lookups.
+    generators = [SummaryGenerator.for_patient(repo, *key, mode="serial") for key in keys]
+    for position, summarizer in enumerate(generators[0].summaries):
+        name = type(summarizer).__name__
+        results[name] = per_call(lambda g: g.summaries[position].summarize(), generators)
+
+    results["summary_generate"] = per_call(
+        lambda key: SummaryGenerator.for_patient(repo, *key, mode="serial").generate(), keys
+    )
+    return results
+
+
+def bench_api(dataframes: dict, keys: list) -> float:
+    # llm_client reads its configuration at import time.
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("OPEN_ROUTER_API_KEY", "offline")
+
+    import httpx
+    from openai import AsyncOpenAI
+
+    import api
+    import fake_llm_server
+    import llm_client
+
+    fake_llm_server.LATENCY_MS = 0
+    fake_llm_server.JITTER_MS = 0
+    llm_client.async_client = AsyncOpenAI(
+        api_key="offline",
+        base_url="http://fake-llm/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_llm_server.app)),
+    )
+
+    repo = DataLoader(dataframes)
+    payloads = [
+        {"clinical_facts": SummaryGenerator.for_patient(repo, *key, mode="serial").generate()}
+        for key in keys
+    ]
+
+    async def run() -> float:
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            await client.post("/generate-summary", json=payloads[0])
+            start = time.perf_counter()
+            for payload in payloads:
+                response = await client.post("/generate-summary", json=payload)
+                response.raise_for_status()
+            return (time.perf_counter() - start) / len(payloads)
+
+    return asyncio.run(run())
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for size, operations in results.items():
+        label = size if size == "imports" else f"{size} patients"
+        for operation, seconds in operations.items():
+            before = baseline.get(size, {}).get(operation)
+            if before and seconds > before * (1 + tolerance):
+                regressions.append(
+                    f"{label} {operation}: {seconds * 1e3:.3f}ms vs {before * 1e3:.3f}ms baseline"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic-data throughput regression suite")
+    parser.add_argument("--patients", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--visits", type=int, default=10, help="visits per episode")
+    parser.add_argument("--episodes", type=int, default=1, help="episodes per patient")
+    parser.add_argument("--compact", action="store_true", help="apply schema.compact_tables after generating")
+    parser.add_argument("--samples", type=int, default=200, help="patient episodes timed per size")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. baseline")
+    args = parser.parse_args()
+
+    # Measured first, in fresh interpreters, before this process warms anything.
+    results = {"imports": import_times()}
+    print("imports")
+    for operation, seconds in results["imports"].items():
+        print(f"  {operation:<22} {seconds * 1e3:>10.3f} ms")
+
+    for n_patients in args.patients:
+        start = time.perf_counter()
+        dataframes = generate_tables(n_patients, args.visits, args.episodes)
+        if args.compact:
+            dataframes = compact_tables(dataframes)
+        rows = sum(len(df) for df in dataframes.values())
+        print(f"\n{n_patients:,} patients, {rows:,} rows (generated in {time.perf_counter() - start:.1f}s)")
+
+        keys = sample_episodes(dataframes, args.samples)
+        timings = bench_pipeline(dataframes, keys)
+        timings["api_round_trip"] = bench_api(dataframes, keys)
+        del dataframes
+
+        for operation, seconds in timings.items():
+            print(f"  {operation:<22} {seconds * 1e3:>10.3f} ms")
+        results[str(n_patients)] = timings
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nregressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
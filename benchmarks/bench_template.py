@@ -0,0 +1,72 @@
+# benchmarks/bench_template.py
+#
+# Wall-clock time of one patient summary per mode of template_renderer.py
+# (template, hybrid, llm), against fake_llm_server.py in-process. The fake
+# server charges --token-ms per requested max_tokens, so the overview-only
+# call of the hybrid mode is cheaper than a whole summary, as decode time
+# would make it:
+#
+#   python -m benchmarks.bench_template --latency-ms 300 --token-ms 2 --repeat 5
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary latency: template vs. hybrid vs. llm")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--token-ms", type=float, default=2, help="fake decode time per max_tokens")
+    parser.add_argument("--latency-ms", type=float, default=300, help="fake time to first token")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # llm_client reads its configuration at import time.
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("OPEN_ROUTER_API_KEY", "offline")
+
+    import httpx
+    from openai import AsyncOpenAI
+
+    import fake_llm_server
+    import llm_client
+    from clinical_data import read_clinical_tables
+    from patient_facts import PatientFacts
+    from summarizers import DataLoader
+    from template_renderer import SUMMARY_MODES, summarize_with_mode
+
+    fake_llm_server.LATENCY_MS = args.latency_ms
+    fake_llm_server.JITTER_MS = 0
+    fake_llm_server.TOKEN_MS = args.token_ms
+    llm_client.async_client = AsyncOpenAI(
+        api_key="offline",
+        base_url="http://fake-llm/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_llm_server.app)),
+    )
+
+    patients = PatientFacts(DataLoader(read_clinical_tables(args.data_dir, compact=True)))
+    facts = patients.generate(patients.patient_ids()[0])[1]
+    print(f"{len(facts)} facts\n")
+
+    async def timed(mode: str) -> list[float]:
+        seconds = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            await summarize_with_mode(facts, mode=mode)
+            seconds.append(time.perf_counter() - start)
+        return seconds
+
+    async def compare():
+        results = {mode: await timed(mode) for mode in SUMMARY_MODES}
+        print(f"{'mode':<10} {'median ms':>10} {'min ms':>10}")
+        for mode, seconds in results.items():
+            print(f"{mode:<10} {statistics.median(seconds) * 1e3:>10.2f} {min(seconds) * 1e3:>10.2f}")
+
+    asyncio.run(compare())
+
+
+if __name__ == "__main__":
+    main()
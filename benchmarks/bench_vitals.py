@@ -0,0 +1,51 @@
+# benchmarks/bench_vitals.py
+#
+# Checks the vectorized VitalSummarizer against the previous per-vital-type
+# loop (with the alert mask's operator precedence corrected) on
+# data/vitals.csv and on a synthetic table, and times both.
+#
+#   python -m benchmarks.bench_vitals --rows 100000
+
+import argparse
+import time
+
+import pandas as pd
+
+from summarizers import VitalSummarizer
+from tests.reference import loop_vital_summary, make_vitals, split_episodes
+
+
+def compare(episodes: list[pd.DataFrame]) -> tuple[float, float]:
+    start = time.perf_counter()
+    expected = [loop_vital_summary(df.copy()) for df in episodes]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [VitalSummarizer(df).summarize() for df in episodes]
+    vectorized_s = time.perf_counter() - start
+
+    if actual != expected:
+        raise SystemExit("vectorized VitalSummarizer output differs from the loop")
+    return loop_s, vectorized_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized vs loop VitalSummarizer")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rows-per-episode", type=int, default=500)
+    args = parser.parse_args()
+
+    loop_s, vectorized_s = compare(split_episodes(pd.read_csv(f"{args.data_dir}/vitals.csv")))
+    print(f"vitals.csv:   loop {loop_s * 1e3:8.1f} ms   vectorized {vectorized_s * 1e3:8.1f} ms   (identical)")
+
+    synthetic = make_vitals(args.rows, rows_per_episode=args.rows_per_episode)
+    loop_s, vectorized_s = compare(split_episodes(synthetic))
+    print(
+        f"{args.rows:,} rows: loop {loop_s * 1e3:8.1f} ms   vectorized {vectorized_s * 1e3:8.1f} ms   "
+        f"({loop_s / vectorized_s:.1f}x, identical)"
+    )
+
+
+if __name__ == "__main__":
+    main()
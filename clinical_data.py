@@ -0,0 +1,28 @@
+# clinical_data.py
+
+import pandas as pd
+
+from schema import compact_tables
+
+# DataLoader table key -> CSV file in the data directory
+TABLE_FILES = {
+    "diagnoses_df": "diagnoses.csv",
+    "meds_df": "medications.csv",
+    "vitals_df": "vitals.csv",
+    "notes_df": "notes.csv",
+    "wounds_df": "wounds.csv",
+    "oasis_df": "oasis.csv",
+}
+
+
+def read_clinical_tables(data_dir="data", compact: bool = False) -> dict:
+    """
+    {table: DataFrame} for every CSV in TABLE_FILES. With compact=True the
+    tables get the memory-efficient dtypes of schema.TABLE_SCHEMAS
+    (categories, int32 ids, float32 readings, parsed dates).
+    """
+    dataframes = {
+        table: pd.read_csv(f"{data_dir}/{filename}")
+        for table, filename in TABLE_FILES.items()
+    }
+    return compact_tables(dataframes) if compact else dataframes
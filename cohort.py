@@ -0,0 +1,272 @@
+# cohort.py
+
+import pandas as pd
+
+from schema import as_datetime
+from summarizers import (
+    IMPORTANT_NOTE_TYPES,
+    OASIS_FUNCTIONAL_SUMMARY,
+    aggregate_vital_alerts,
+    classify_vital_alerts,
+    diagnosis_statement,
+    medication_statement,
+    note_snippet_facts,
+    note_statement,
+    oasis_field_statement,
+    vital_statement,
+    wound_statement,
+)
+
+KEYS = ["patient_id", "episode_id"]
+
+
+def latest_episodes(diagnoses_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    (patient_id, episode_id) of each patient's latest episode, ordered by
+    patient_id -- the same episode main.get_latest_episode picks.
+    """
+    return (
+        diagnoses_df
+        .dropna(subset=["episode_id"])
+        .groupby("patient_id")["episode_id"]
+        .max()
+        .reset_index()
+    )
+
+
+class CohortSummaryGenerator:
+    """
+    Clinical facts for every patient's latest episode in one pass.
+
+    Each table is restricted to the cohort's latest episodes once and
+    aggregated with a single groupby, instead of running the six per-patient
+    summarizers once per patient. `generate()` returns
+    {patient_id: facts}, where facts is exactly what
+    SummaryGenerator.for_patient(...).generate() returns for that patient,
+    given the same `notes_index`.
+    """
+
+    def __init__(self, dataframes: dict, notes_index=None):
+        self.dfs = dataframes
+        self.notes_index = notes_index
+
+    def generate(self) -> dict[int, list[dict]]:
+
+        episodes = latest_episodes(self.dfs["diagnoses_df"])
+        self._episode_index = pd.MultiIndex.from_frame(episodes)
+
+        sections = [
+            self._diagnoses(),
+            self._medications(),
+            self._vitals(),
+            self._wounds(),
+            self._notes(),
+            self._oasis(episodes["patient_id"]),
+        ]
+
+        facts = {}
+        for patient_id in episodes["patient_id"].tolist():
+            facts[patient_id] = []
+            for section in sections:
+                facts[patient_id].extend(section.get(patient_id, []))
+
+        return facts
+
+    def _latest_rows(self, table: str) -> pd.DataFrame:
+        # Rows of `table` belonging to a latest episode, in their original order.
+        df = self.dfs[table]
+        in_cohort = pd.MultiIndex.from_frame(df[KEYS]).isin(self._episode_index)
+        return df[in_cohort]
+
+    def _diagnoses(self) -> dict:
+
+        df = self._latest_rows("diagnoses_df").drop_duplicates()
+        position = df.groupby(KEYS, sort=False, observed=True).cumcount()
+
+        primary = df[position == 0]
+
+        # Grouped in Python: a groupby .agg(list) runs a Python function per
+        # group anyway, and is far slower on categorical columns.
+        secondary = {}
+        rows = df[(position > 0) & df["diagnosis_description"].notna()]
+        for patient_id, episode_id, description in zip(
+            rows["patient_id"].tolist(),
+            rows["episode_id"].tolist(),
+            rows["diagnosis_description"].tolist(),
+        ):
+            secondary.setdefault((patient_id, episode_id), []).append(description)
+
+        out = {}
+        for patient_id, episode_id, description in zip(
+            primary["patient_id"].tolist(),
+            primary["episode_id"].tolist(),
+            primary["diagnosis_description"].tolist(),
+        ):
+            others = secondary.get((patient_id, episode_id), [])
+            out[patient_id] = [{
+                "statement": diagnosis_statement(description, others),
+                "source": "diagnoses.csv",
+                "date": None
+            }]
+
+        return out
+
+    def _medications(self) -> dict:
+
+        df = self._latest_rows("meds_df")
+        df = df[df["classification"].notna()]
+        group_keys = KEYS + ["classification"]
+
+        def joined(column) -> dict:
+            # {group key: ", ".join(sorted(unique non-null values))}
+            rows = df[group_keys + [column]].dropna(subset=[column]).drop_duplicates()
+            values = {}
+            for *key, value in zip(*(rows[c].tolist() for c in group_keys + [column])):
+                values.setdefault(tuple(key), []).append(value)
+            return {key: ", ".join(sorted(group)) for key, group in values.items()}
+
+        reasons = joined("reason")
+        frequencies = joined("frequency")
+
+        out = {}
+        for key in sorted(set(zip(*(df[c].tolist() for c in group_keys)))):
+            patient_id, _, classification = key
+            out.setdefault(patient_id, []).append({
+                "statement": medication_statement(
+                    classification, reasons.get(key, ""), frequencies.get(key, "")
+                ),
+                "source": "medications.csv",
+                "date": None
+            })
+
+        return out
+
+    def _vitals(self) -> dict:
+
+        df = self._latest_rows("vitals_df").drop_duplicates()
+        df = df.assign(visit_date=as_datetime(df["visit_date"]))
+        df = df.assign(alert=classify_vital_alerts(df))
+
+        stats = aggregate_vital_alerts(df, KEYS + ["vital_type"])
+
+        out = {}
+        for patient_id, vital, high_count, low_count, reading, last_date in zip(
+            stats["patient_id"].tolist(),
+            stats["vital_type"].tolist(),
+            stats["high_count"].tolist(),
+            stats["low_count"].tolist(),
+            stats["reading"].tolist(),
+            stats["last_date"].tolist(),
+        ):
+            statement = vital_statement(vital, high_count, low_count, reading, last_date)
+            if statement is None:
+                continue
+            out.setdefault(patient_id, []).append({
+                "statement": statement,
+                "source": "vitals.csv",
+                "date": last_date
+            })
+
+        return out
+
+    def _wounds(self) -> dict:
+
+        df = self._latest_rows("wounds_df")
+        df = df.assign(
+            visit_date=as_datetime(df["visit_date"]),
+            onset_date=as_datetime(df["onset_date"]),
+        )
+        group_keys = KEYS + ["location", "onset_date"]
+
+        df = df.dropna(subset=["location", "onset_date"]).sort_values("visit_date", kind="stable")
+        groups = df.groupby(group_keys, sort=False, observed=True)
+
+        first = groups.head(1).set_index(group_keys)["description"].rename("first_description")
+        last = groups.tail(1).set_index(group_keys)[["description", "visit_date"]]
+        wounds = (
+            last.rename(columns={"description": "latest_description", "visit_date": "last_seen"})
+            .join(first)
+            .join(groups.size().rename("visit_count"))
+            .sort_index()
+            .reset_index()
+        )
+
+        out = {}
+        for w in wounds.to_dict("records"):
+            w["onset_date"] = w["onset_date"].date()
+            w["last_seen"] = w["last_seen"].date()
+            out.setdefault(w["patient_id"], []).append({
+                "statement": wound_statement(w),
+                "source": "wounds.csv"
+            })
+
+        return out
+
+    def _notes(self) -> dict:
+
+        df = self._latest_rows("notes_df")
+        df = df.assign(note_date=as_datetime(df["note_date"], errors="coerce"))
+        df = df[df["note_date"].notna()]
+        dated_episodes = df[KEYS].drop_duplicates().itertuples(index=False)
+        df = df[df["note_type"].isin(IMPORTANT_NOTE_TYPES)]
+
+        recent = (
+            df.sort_values(KEYS + ["note_date"], ascending=[True, True, False], kind="stable")
+            .groupby(KEYS, sort=False, observed=True)
+            .head(3)   # limit volume
+        )
+
+        out = {}
+        for patient_id, note_type, note_date in zip(
+            recent["patient_id"].tolist(),
+            recent["note_type"].tolist(),
+            recent["note_date"].dt.strftime("%Y-%m-%d").tolist(),
+        ):
+            out.setdefault(patient_id, []).append({
+                "statement": note_statement(note_type, note_date),
+                "source": "notes.csv"
+            })
+
+        # Snippets follow the episode's note facts, for every episode with a
+        # dated note, as in NotesSummarizer.
+        if self.notes_index is not None:
+            for patient_id, episode_id in dated_episodes:
+                snippets = note_snippet_facts(self.notes_index, patient_id, episode_id)
+                if snippets:
+                    out.setdefault(patient_id, []).extend(snippets)
+
+        return out
+
+    def _oasis(self, patient_ids: pd.Series) -> dict:
+
+        # OASIS assessments are per patient, across all of their episodes.
+        df = self.dfs["oasis_df"]
+        df = df[df["patient_id"].isin(patient_ids)]
+        df = df.assign(assessment_date=as_datetime(df["assessment_date"]))
+
+        latest = (
+            df.drop_duplicates()
+            .sort_values("assessment_date", kind="stable")
+            .groupby("patient_id", sort=False, observed=True)
+            .tail(1)
+        )
+        fields = list(df.columns[3:])
+        dates = latest["assessment_date"].dt.strftime("%Y-%m-%d").tolist()
+        values = [latest[col].tolist() for col in fields]
+
+        out = {}
+        for i, patient_id in enumerate(latest["patient_id"].tolist()):
+            statements = [{
+                "statement": OASIS_FUNCTIONAL_SUMMARY,
+                "source": "oasis.csv",
+                "date": dates[i]
+            }]
+            for col, column_values in zip(fields, values):
+                statements.append({
+                    "statement": oasis_field_statement(col, column_values[i]),
+                    "source": "oasis.csv",
+                    "date": dates[i]
+                })
+            out[patient_id] = statements
+
+        return out
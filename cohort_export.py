@@ -0,0 +1,278 @@
+# cohort_export.py
+#
+# Out-of-core export of every patient's clinical facts (latest episode) to
+# JSONL or Parquet, for data directories larger than memory:
+#
+#   python cohort_export.py data facts.jsonl
+#   python cohort_export.py data/synthetic facts.parquet --partition-mb 64
+#
+# Two passes, each holding a bounded amount of data:
+#
+#   partition  every CSV is streamed in --chunksize rows and its rows are
+#              appended to one of N spill files by patient_id % N, so each
+#              patient's rows, in every table, land in the same partition
+#              (note_text is not read, as in columnar.py)
+#   generate   one partition at a time is loaded with compact dtypes, its
+#              facts are generated (the cohort engine, or the per-patient
+#              summarizers) and written out before the next is read
+#
+# Peak memory is one CSV chunk during the first pass and one partition's
+# tables plus its facts during the second; N defaults to the input size
+# over --partition-mb. Patients come out grouped by partition, in patient_id
+# order within each. A progress line is printed per partition.
+
+import argparse
+import json
+import math
+import os
+import resource
+import tempfile
+import time
+from collections.abc import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from clinical_data import TABLE_FILES
+from cohort import CohortSummaryGenerator, latest_episodes
+from columnar import SUMMARY_COLUMNS
+from notes_index import NotesIndex
+from schema import compact_tables
+from summarizers import DataLoader, SummaryGenerator
+
+EXPORT_FORMATS = ("jsonl", "parquet")
+ENGINES = ("cohort", "per-patient")
+
+DEFAULT_CHUNKSIZE = 200_000
+DEFAULT_PARTITION_MB = 256
+
+FACT_SCHEMA = pa.schema([
+    ("patient_id", pa.int64()),
+    ("episode_id", pa.int64()),
+    ("fact_index", pa.int32()),
+    ("statement", pa.string()),
+    ("source", pa.string()),
+    ("date", pa.string()),
+    ("error", pa.bool_()),
+])
+
+
+def spill_path(work_dir: str, table: str, partition: int) -> str:
+    return os.path.join(work_dir, f"{table}.{partition}.csv")
+
+
+def default_partitions(data_dir: str, partition_mb: float) -> int:
+    size = sum(os.path.getsize(os.path.join(data_dir, filename)) for filename in TABLE_FILES.values())
+    return max(1, math.ceil(size / (partition_mb * 2**20)))
+
+
+def partition_tables(data_dir: str, work_dir: str, partitions: int, chunksize: int = DEFAULT_CHUNKSIZE) -> dict:
+    """
+    Stream every table of `data_dir` into `partitions` spill files by
+    patient_id. Rows keep their source order within a partition. Returns
+    {table: rows}.
+    """
+    rows = {}
+    for table, filename in TABLE_FILES.items():
+        columns = SUMMARY_COLUMNS.get(table)
+        rows[table] = 0
+        written = set()
+        for chunk in pd.read_csv(os.path.join(data_dir, filename), usecols=columns, chunksize=chunksize):
+            chunk = chunk.dropna(subset=["patient_id"])
+            rows[table] += len(chunk)
+            keys = (chunk["patient_id"].astype("int64") % partitions).to_numpy()
+            for partition, part in chunk.groupby(keys, sort=False):
+                # Arrow's CSV writer is several times faster than to_csv.
+                with open(spill_path(work_dir, table, partition), "ab") as f:
+                    pacsv.write_csv(
+                        pa.Table.from_pandas(part, preserve_index=False),
+                        f,
+                        pacsv.WriteOptions(include_header=partition not in written),
+                    )
+                written.add(partition)
+        # A partition without rows still gets the header, so it reads as
+        # an empty table with the right columns.
+        header = pd.read_csv(os.path.join(data_dir, filename), usecols=columns, nrows=0)
+        for partition in set(range(partitions)) - written:
+            header.to_csv(spill_path(work_dir, table, partition), index=False)
+    return rows
+
+
+def read_partition(work_dir: str, partition: int) -> dict:
+    return compact_tables({
+        table: pd.read_csv(spill_path(work_dir, table, partition))
+        for table in TABLE_FILES
+    })
+
+
+def partition_facts(dataframes: dict, engine: str = "cohort", notes_index=None) -> Iterator[tuple[int, int, list[dict]]]:
+    """
+    (patient_id, episode_id, facts) for every patient in one partition's
+    tables, by patient_id, for their latest episode.
+    """
+    episodes = latest_episodes(dataframes["diagnoses_df"])
+    keys = zip(episodes["patient_id"].tolist(), episodes["episode_id"].tolist())
+
+    if engine == "cohort":
+        facts = CohortSummaryGenerator(dataframes, notes_index).generate()
+        for patient_id, episode_id in keys:
+            yield patient_id, episode_id, facts[patient_id]
+        return
+
+    repo = DataLoader(dataframes)
+    for patient_id, episode_id in keys:
+        generator = SummaryGenerator.for_patient(repo, patient_id, episode_id, mode="serial", notes_index=notes_index)
+        yield patient_id, episode_id, generator.generate()
+
+
+class JsonlFactsWriter:
+    """One JSON line per patient: {patient_id, episode_id, clinical_facts}."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, records: list[tuple[int, int, list[dict]]]):
+        for patient_id, episode_id, facts in records:
+            line = {"patient_id": int(patient_id), "episode_id": int(episode_id), "clinical_facts": facts}
+            self._file.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetFactsWriter:
+    """One row per fact (FACT_SCHEMA), one row group per partition."""
+
+    def __init__(self, path: str):
+        self._writer = pq.ParquetWriter(path, FACT_SCHEMA)
+
+    def write(self, records: list[tuple[int, int, list[dict]]]):
+        columns = {name: [] for name in FACT_SCHEMA.names}
+        for patient_id, episode_id, facts in records:
+            for i, fact in enumerate(facts):
+                columns["patient_id"].append(int(patient_id))
+                columns["episode_id"].append(int(episode_id))
+                columns["fact_index"].append(i)
+                columns["statement"].append(str(fact.get("statement", "")))
+                columns["source"].append(fact.get("source"))
+                date = fact.get("date")
+                columns["date"].append(None if date is None else str(date))
+                columns["error"].append(bool(fact.get("error", False)))
+        if columns["patient_id"]:
+            self._writer.write_table(pa.Table.from_pydict(columns, schema=FACT_SCHEMA))
+
+    def close(self):
+        self._writer.close()
+
+
+def peak_rss_mib() -> float:
+    # VmHWM starts over at exec, where ru_maxrss keeps the peak of the
+    # process that forked this one. Both are in KiB on Linux.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def export_facts(
+    data_dir: str,
+    out_path: str,
+    fmt: str | None = None,
+    partitions: int | None = None,
+    partition_mb: float = DEFAULT_PARTITION_MB,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    engine: str = "cohort",
+    notes_index=None,
+    work_dir: str | None = None,
+    progress=print,
+) -> dict:
+    """
+    Write the facts of every patient in `data_dir` to `out_path`, in `fmt`
+    (default: from the file extension). Returns counts and timings.
+    """
+    fmt = fmt or ("parquet" if out_path.endswith(".parquet") else "jsonl")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {EXPORT_FORMATS}, got {fmt!r}")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    partitions = partitions or default_partitions(data_dir, partition_mb)
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=work_dir, prefix="cohort_export-") as spill_dir:
+        rows = partition_tables(data_dir, spill_dir, partitions, chunksize)
+        partitioned_s = time.perf_counter() - started
+        progress(
+            f"partitioned {sum(rows.values()):,} rows into {partitions} partitions "
+            f"in {partitioned_s:.1f}s"
+        )
+
+        writer = ParquetFactsWriter(out_path) if fmt == "parquet" else JsonlFactsWriter(out_path)
+        patients = facts_written = 0
+        try:
+            for partition in range(partitions):
+                records = list(partition_facts(read_partition(spill_dir, partition), engine, notes_index))
+                writer.write(records)
+                patients += len(records)
+                facts_written += sum(len(facts) for _, _, facts in records)
+
+                elapsed = time.perf_counter() - started - partitioned_s
+                progress(
+                    f"partition {partition + 1}/{partitions}: {len(records):,} patients, "
+                    f"{patients:,} total, {patients / elapsed:,.0f} patients/s, "
+                    f"peak RSS {peak_rss_mib():,.0f} MiB"
+                )
+                # Drop this partition's frames before reading the next.
+                del records
+        finally:
+            writer.close()
+
+    return {
+        "patients": patients,
+        "facts": facts_written,
+        "rows": rows,
+        "partitions": partitions,
+        "partition_seconds": partitioned_s,
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every patient's clinical facts, out of core")
+    parser.add_argument("data_dir")
+    parser.add_argument("out", help="output file, .jsonl or .parquet")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=None, help="default: from the extension")
+    parser.add_argument("--partitions", type=int, default=None, help="default: input size / --partition-mb")
+    parser.add_argument("--partition-mb", type=float, default=DEFAULT_PARTITION_MB)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="CSV rows read at a time")
+    parser.add_argument("--engine", choices=ENGINES, default="cohort")
+    parser.add_argument("--notes-index", default=None, help="notes_index.py index for note snippets")
+    parser.add_argument("--work-dir", default=None, help="where spill files go (default: system temp)")
+    args = parser.parse_args()
+
+    result = export_facts(
+        args.data_dir,
+        args.out,
+        fmt=args.format,
+        partitions=args.partitions,
+        partition_mb=args.partition_mb,
+        chunksize=args.chunksize,
+        engine=args.engine,
+        notes_index=NotesIndex(args.notes_index) if args.notes_index else None,
+        work_dir=args.work_dir,
+    )
+    print(
+        f"\n{result['patients']:,} patients, {result['facts']:,} facts to {args.out} "
+        f"in {result['seconds']:.1f}s ({result['patients'] / result['seconds']:,.0f} patients/s), "
+        f"peak RSS {result['peak_rss_mib']:,.0f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# columnar.py
+#
+# Columnar (Parquet) copy of the clinical tables for fast per-patient reads.
+#
+#   python columnar.py data data/parquet
+#
+# Each table is written to <out_dir>/<table>.parquet sorted by patient_id and
+# episode_id, so every row group covers a narrow key range and its min/max
+# statistics let a per-patient read skip all other row groups.
+
+import argparse
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from clinical_data import TABLE_FILES, read_clinical_tables
+
+# Columns the summarizers actually read. Tables not listed are read whole;
+# the free-text note_text column is never loaded.
+SUMMARY_COLUMNS = {
+    "notes_df": ["episode_id", "note_date", "note_type", "patient_id"],
+}
+
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+
+
+def convert_data_dir(data_dir: str, out_dir: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> dict:
+    """
+    Write every clinical CSV in `data_dir` to a sorted Parquet file in
+    `out_dir`. Returns {table: row_count}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    rows = {}
+    for table, df in read_clinical_tables(data_dir, compact=True).items():
+        keys = [k for k in ("patient_id", "episode_id") if k in df.columns]
+        df = df.sort_values(keys, kind="stable")
+
+        pq.write_table(
+            pa.Table.from_pandas(df, preserve_index=False),
+            parquet_path(out_dir, table),
+            row_group_size=row_group_size,
+        )
+        rows[table] = len(df)
+
+    return rows
+
+
+def parquet_path(parquet_dir: str, table: str) -> str:
+    return os.path.join(parquet_dir, f"{table}.parquet")
+
+
+class ParquetDataLoader:
+    """
+    DataLoader over the Parquet store written by convert_data_dir.
+
+    Nothing is held in memory: every lookup reads only the row groups whose
+    statistics can contain the requested patient, and only the columns in
+    SUMMARY_COLUMNS. Results are always fresh frames, so `copy` is accepted
+    for interface compatibility and ignored.
+    """
+
+    def __init__(self, parquet_dir: str):
+        self.parquet_dir = parquet_dir
+        self._datasets = {}
+
+    def _dataset(self, table: str) -> ds.Dataset:
+        if table not in self._datasets:
+            self._datasets[table] = ds.dataset(parquet_path(self.parquet_dir, table), format="parquet")
+        return self._datasets[table]
+
+    def _read(self, table: str, filter, columns: list[str] | None = None) -> pd.DataFrame:
+        columns = columns or SUMMARY_COLUMNS.get(table)
+        return self._dataset(table).to_table(columns=columns, filter=filter).to_pandas()
+
+    def get(self, table: str, patient_id: int, episode_id: int, copy: bool = True) -> pd.DataFrame:
+        key = (ds.field("patient_id") == patient_id) & (ds.field("episode_id") == episode_id)
+        return self._read(table, key)
+
+    def get_patient_only(self, key, patient_id, copy: bool = False) -> pd.DataFrame:
+        return self._read(key, ds.field("patient_id") == patient_id)
+
+    def get_columns(self, table: str, columns: list[str]) -> pd.DataFrame:
+        return self._read(table, None, columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the clinical CSVs to a sorted Parquet store")
+    parser.add_argument("data_dir", nargs="?", default="data")
+    parser.add_argument("out_dir", nargs="?", default="data/parquet")
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = convert_data_dir(args.data_dir, args.out_dir, args.row_group_size)
+    elapsed = time.perf_counter() - start
+
+    for table, count in rows.items():
+        print(f"{TABLE_FILES[table]:<18} {count:>12,} rows -> {parquet_path(args.out_dir, table)}")
+    print(f"converted in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
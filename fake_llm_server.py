@@ -0,0 +1,187 @@
+# fake_llm_server.py
+#
+# Minimal OpenAI-compatible chat completions server for offline runs and
+# throughput measurements. Point the client at it with
+#
+#   uvicorn fake_llm_server:app --port 8001
+#   LLM_BASE_URL=http://localhost:8001/v1 uvicorn api:app
+#
+# FAKE_LLM_LATENCY_MS sets the mean response delay and
+# FAKE_LLM_LATENCY_DISTRIBUTION how it varies:
+#
+#   uniform       +/- FAKE_LLM_JITTER_MS around the mean (the default)
+#   normal        standard deviation FAKE_LLM_JITTER_MS
+#   lognormal     standard deviation FAKE_LLM_JITTER_MS, long right tail
+#   exponential   memoryless, standard deviation equal to the mean
+#
+# FAKE_LLM_TOKEN_MS adds that much per requested max_tokens, as if every
+# completion used its whole output budget (decode time). Streamed responses
+# spread the same delay over their chunks.
+#
+# Fault injection, for exercising llm_resilience.py:
+#
+#   FAKE_LLM_429_RATE       fraction of requests answered 429, with
+#                           Retry-After: FAKE_LLM_RETRY_AFTER_SECONDS
+#   FAKE_LLM_ERROR_RATE     fraction of requests answered 500
+#   FAKE_LLM_SLOW_RATE      fraction of requests delayed by a further
+#                           FAKE_LLM_SLOW_MS (a slow tail for hedging)
+#   FAKE_LLM_FAILING_MODELS comma-separated models that always answer 503
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
+
+LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "500"))
+JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "0"))
+LATENCY_DISTRIBUTIONS = ("uniform", "normal", "lognormal", "exponential")
+LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "uniform")
+if LATENCY_DISTRIBUTION not in LATENCY_DISTRIBUTIONS:
+    raise ValueError(f"FAKE_LLM_LATENCY_DISTRIBUTION must be one of {LATENCY_DISTRIBUTIONS}")
+TOKEN_MS = float(os.getenv("FAKE_LLM_TOKEN_MS", "0"))
+RATE_LIMIT_RATE = float(os.getenv("FAKE_LLM_429_RATE", "0"))
+RETRY_AFTER_SECONDS = float(os.getenv("FAKE_LLM_RETRY_AFTER_SECONDS", "0"))
+ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+SLOW_RATE = float(os.getenv("FAKE_LLM_SLOW_RATE", "0"))
+SLOW_MS = float(os.getenv("FAKE_LLM_SLOW_MS", "5000"))
+FAILING_MODELS = {model.strip() for model in os.getenv("FAKE_LLM_FAILING_MODELS", "").split(",") if model.strip()}
+
+app = FastAPI(
+    title="Fake LLM API",
+    description="OpenAI-compatible stand-in for load and throughput testing",
+    version="1.0.0"
+)
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str
+    messages: List[Dict[str, Any]]
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    stream: bool = False
+    stream_options: Optional[Dict[str, Any]] = None
+
+
+def fake_summary(messages: List[Dict[str, Any]]) -> str:
+    prompt = messages[-1].get("content", "") if messages else ""
+    return (
+        "## 📋 Clinical Summary\n"
+        f"Synthetic summary generated from a {len(prompt)}-character prompt.\n"
+    )
+
+
+def usage(messages: List[Dict[str, Any]], content: str) -> dict:
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens
+    }
+
+
+async def stream_chunks(request: ChatCompletionRequest, content: str, delay_ms: float):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    words = content.split(" ")
+
+    def chunk(delta: dict, finish_reason=None, chunk_usage=None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": request.model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+            "usage": chunk_usage
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for i, word in enumerate(words):
+        await asyncio.sleep(delay_ms / len(words) / 1000)
+        yield chunk({"content": word if i == 0 else f" {word}"})
+    yield chunk({}, finish_reason="stop")
+
+    if (request.stream_options or {}).get("include_usage"):
+        yield chunk(None, chunk_usage=usage(request.messages, content))
+    yield "data: [DONE]\n\n"
+
+
+def base_latency_ms() -> float:
+    if LATENCY_MS <= 0:
+        return 0.0
+    if LATENCY_DISTRIBUTION == "normal":
+        return random.gauss(LATENCY_MS, JITTER_MS)
+    if LATENCY_DISTRIBUTION == "lognormal":
+        # Parameters of the underlying normal that give this mean and spread.
+        sigma2 = math.log1p((JITTER_MS / LATENCY_MS) ** 2)
+        return random.lognormvariate(math.log(LATENCY_MS) - sigma2 / 2, math.sqrt(sigma2))
+    if LATENCY_DISTRIBUTION == "exponential":
+        return random.expovariate(1 / LATENCY_MS)
+    return LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS)
+
+
+def error_response(status: int, message: str, headers: dict | None = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": "fake_llm_fault", "code": status}},
+        headers=headers
+    )
+
+
+def injected_fault(model: str) -> JSONResponse | None:
+    if model in FAILING_MODELS:
+        return error_response(503, f"model {model} is unavailable")
+    roll = random.random()
+    if roll < RATE_LIMIT_RATE:
+        return error_response(429, "rate limit exceeded", {"Retry-After": f"{RETRY_AFTER_SECONDS:g}"})
+    if roll < RATE_LIMIT_RATE + ERROR_RATE:
+        return error_response(500, "internal error")
+    return None
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: ChatCompletionRequest):
+    fault = injected_fault(request.model)
+    if fault is not None:
+        return fault
+
+    delay_ms = max(0.0, base_latency_ms())
+    delay_ms += TOKEN_MS * (request.max_tokens or 0)
+    if random.random() < SLOW_RATE:
+        delay_ms += SLOW_MS
+    content = fake_summary(request.messages)
+
+    if request.stream:
+        return StreamingResponse(
+            stream_chunks(request, content, delay_ms),
+            media_type="text/event-stream"
+        )
+
+    await asyncio.sleep(delay_ms / 1000)
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": usage(request.messages, content)
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,448 @@
+# incremental.py
+#
+# Incremental fact maintenance: keeps the running aggregates each summarizer
+# needs per patient episode (alert counts and last reading per vital, first
+# and latest observation per wound, the latest OASIS assessment, ...) so new
+# rows update the facts in O(new rows) instead of a full recompute.
+#
+#   python incremental.py verify --data-dir data --batch-size 3
+#
+# replays the data directory in small batches and checks the incremental
+# facts against a full recompute after every round.
+
+import argparse
+import heapq
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from cohort import latest_episodes
+from summarizers import (
+    DataLoader,
+    IMPORTANT_NOTE_TYPES,
+    OASIS_FUNCTIONAL_SUMMARY,
+    SummaryGenerator,
+    classify_vital_alerts,
+    diagnosis_statement,
+    medication_statement,
+    note_statement,
+    oasis_field_statement,
+    vital_readings,
+    vital_statement,
+    wound_statement,
+)
+
+# Episode-scoped tables, in the order SummaryGenerator.for_patient emits them.
+EPISODE_TABLES = ["diagnoses_df", "meds_df", "vitals_df", "wounds_df", "notes_df"]
+
+# NaT sorts after every date, as in pandas' sort_values.
+_NAT = np.iinfo(np.int64).max
+
+
+def _date_ns(value) -> int:
+    return _NAT if pd.isna(value) else pd.Timestamp(value).value
+
+
+def _format_date(ns: int) -> str:
+    return pd.Timestamp(ns).strftime("%Y-%m-%d")
+
+
+def _empty_episode_state() -> dict:
+    return {
+        "seq": 0,
+        "diagnoses": [],
+        "medications": {},
+        "vitals": {},
+        "wounds": {},
+        "notes": [],
+    }
+
+
+class IncrementalFactStore:
+    """
+    Per-patient summarizer state persisted in SQLite.
+
+    `append(table, rows)` folds new rows of one table into the state of the
+    episodes they belong to; `facts(patient_id, episode_id)` renders the
+    same fact list SummaryGenerator.for_patient would produce over all rows
+    appended so far. Rows must be appended in the order they appear in the
+    source table, with that table's dtypes.
+
+    Exact-duplicate rows are ignored the way the summarizers'
+    drop_duplicates() ignores them; the row hashes for that live in their
+    own indexed table so checking a new row never loads the history.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS episode_state (
+                patient_id INTEGER NOT NULL,
+                episode_id INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                PRIMARY KEY (patient_id, episode_id)
+            );
+            CREATE TABLE IF NOT EXISTS oasis_state (
+                patient_id INTEGER PRIMARY KEY,
+                state TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS seen_rows (
+                tbl TEXT NOT NULL,
+                patient_id INTEGER NOT NULL,
+                episode_id INTEGER NOT NULL,
+                row_hash INTEGER NOT NULL,
+                PRIMARY KEY (tbl, patient_id, episode_id, row_hash)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    # -- persistence ---------------------------------------------------------
+
+    def _load(self, patient_id: int, episode_id: int) -> dict:
+        row = self._db.execute(
+            "SELECT state FROM episode_state WHERE patient_id = ? AND episode_id = ?",
+            (patient_id, episode_id),
+        ).fetchone()
+        return json.loads(row[0]) if row else _empty_episode_state()
+
+    def _save(self, patient_id: int, episode_id: int, state: dict):
+        self._db.execute(
+            "INSERT OR REPLACE INTO episode_state VALUES (?, ?, ?)",
+            (patient_id, episode_id, json.dumps(state)),
+        )
+
+    def _load_oasis(self, patient_id: int) -> dict | None:
+        row = self._db.execute(
+            "SELECT state FROM oasis_state WHERE patient_id = ?", (patient_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _save_oasis(self, patient_id: int, state: dict):
+        self._db.execute(
+            "INSERT OR REPLACE INTO oasis_state VALUES (?, ?)",
+            (patient_id, json.dumps(state)),
+        )
+
+    def _first_seen(self, table: str, patient_id: int, episode_id: int, row_hash: int) -> bool:
+        cursor = self._db.execute(
+            "INSERT OR IGNORE INTO seen_rows VALUES (?, ?, ?, ?)",
+            (table, patient_id, episode_id, row_hash),
+        )
+        return cursor.rowcount == 1
+
+    # -- updates -------------------------------------------------------------
+
+    def append(self, table: str, rows: pd.DataFrame) -> set:
+        """
+        Fold new rows of `table` into the stored state.
+
+        Returns the (patient_id, episode_id) keys whose facts changed; OASIS
+        rows report (patient_id, None) since OASIS facts span episodes.
+        """
+        if rows.empty:
+            return set()
+
+        if table == "oasis_df":
+            return self._append_oasis(rows)
+
+        update = {
+            "diagnoses_df": self._update_diagnoses,
+            "meds_df": self._update_medications,
+            "vitals_df": self._update_vitals,
+            "wounds_df": self._update_wounds,
+            "notes_df": self._update_notes,
+        }[table]
+
+        hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy().view(np.int64)
+        rows = rows.assign(_row_hash=hashes)
+
+        touched = set()
+        self._db.execute("BEGIN")
+        try:
+            for (patient_id, episode_id), group in rows.groupby(["patient_id", "episode_id"], sort=False):
+                patient_id, episode_id = int(patient_id), int(episode_id)
+                state = self._load(patient_id, episode_id)
+                update(table, patient_id, episode_id, state, group)
+                self._save(patient_id, episode_id, state)
+                touched.add((patient_id, episode_id))
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+        return touched
+
+    def _new_rows(self, table, patient_id, episode_id, group):
+        # Rows of `group` not seen before, in order.
+        keep = [
+            self._first_seen(table, patient_id, episode_id, int(h))
+            for h in group["_row_hash"].tolist()
+        ]
+        return group[keep]
+
+    def _update_diagnoses(self, table, patient_id, episode_id, state, group):
+        group = self._new_rows(table, patient_id, episode_id, group)
+        state["diagnoses"].extend(group["diagnosis_description"].tolist())
+
+    def _update_medications(self, table, patient_id, episode_id, state, group):
+        # Medications are grouped without de-duplication; the per-class value
+        # sets make repeats harmless anyway.
+        meds = state["medications"]
+        for classification, reason, frequency in zip(
+            group["classification"].tolist(),
+            group["reason"].tolist(),
+            group["frequency"].tolist(),
+        ):
+            if pd.isna(classification):
+                continue
+            entry = meds.setdefault(classification, {"reasons": [], "frequencies": []})
+            if not pd.isna(reason) and reason not in entry["reasons"]:
+                entry["reasons"].append(reason)
+            if not pd.isna(frequency) and frequency not in entry["frequencies"]:
+                entry["frequencies"].append(frequency)
+
+    def _update_vitals(self, table, patient_id, episode_id, state, group):
+        group = self._new_rows(table, patient_id, episode_id, group)
+        group = group.assign(visit_date=pd.to_datetime(group["visit_date"]))
+        group = group.assign(alert=classify_vital_alerts(group))
+
+        vitals = state["vitals"]
+        for vital, alert, reading, visit_date in zip(
+            group["vital_type"].tolist(),
+            group["alert"].tolist(),
+            vital_readings(group["reading"].to_numpy()).tolist(),
+            group["visit_date"].tolist(),
+        ):
+            if alert not in ("low", "high") or pd.isna(vital):
+                continue
+            entry = vitals.setdefault(vital, {"high": 0, "low": 0, "last_ns": None, "reading": None})
+            entry[alert] += 1
+
+            # Later rows win ties, as the last row of a stable date sort does.
+            ns = _date_ns(visit_date)
+            if entry["last_ns"] is None or ns >= entry["last_ns"]:
+                entry["last_ns"] = ns
+                entry["reading"] = reading
+
+    def _update_wounds(self, table, patient_id, episode_id, state, group):
+        group = group.assign(
+            visit_date=pd.to_datetime(group["visit_date"]),
+            onset_date=pd.to_datetime(group["onset_date"]),
+        )
+
+        wounds = state["wounds"]
+        for location, onset, description, visit_date in zip(
+            group["location"].tolist(),
+            group["onset_date"].tolist(),
+            group["description"].tolist(),
+            group["visit_date"].tolist(),
+        ):
+            if pd.isna(location) or pd.isna(onset):
+                continue
+            key = json.dumps([location, _date_ns(onset)])
+            ns = _date_ns(visit_date)
+
+            entry = wounds.get(key)
+            if entry is None:
+                wounds[key] = {
+                    "first_ns": ns, "first_description": description,
+                    "last_ns": ns, "latest_description": description,
+                    "visit_count": 1,
+                }
+                continue
+
+            entry["visit_count"] += 1
+            if ns < entry["first_ns"]:
+                entry["first_ns"], entry["first_description"] = ns, description
+            if ns >= entry["last_ns"]:
+                entry["last_ns"], entry["latest_description"] = ns, description
+
+    def _update_notes(self, table, patient_id, episode_id, state, group):
+        note_dates = pd.to_datetime(group["note_date"], errors="coerce")
+
+        # The three newest important notes; earlier arrivals win date ties,
+        # as in a stable descending sort.
+        notes = [tuple(n) for n in state["notes"]]
+        for note_type, note_date in zip(group["note_type"].tolist(), note_dates.tolist()):
+            state["seq"] += 1
+            if pd.isna(note_date) or note_type not in IMPORTANT_NOTE_TYPES:
+                continue
+            notes.append((-_date_ns(note_date), state["seq"], note_type))
+
+        state["notes"] = heapq.nsmallest(3, notes)
+
+    def _append_oasis(self, rows: pd.DataFrame) -> set:
+        fields = list(rows.columns[3:])
+        hashes = pd.util.hash_pandas_object(
+            rows.assign(assessment_date=pd.to_datetime(rows["assessment_date"])), index=False
+        ).to_numpy().view(np.int64)
+
+        touched = set()
+        self._db.execute("BEGIN")
+        try:
+            for i, row in enumerate(rows.itertuples(index=False)):
+                patient_id = int(row.patient_id)
+                if not self._first_seen("oasis_df", patient_id, 0, int(hashes[i])):
+                    continue
+
+                ns = _date_ns(pd.to_datetime(row.assessment_date))
+                state = self._load_oasis(patient_id)
+                if state is None or ns >= state["assessment_ns"]:
+                    values = dict(zip(rows.columns, row))
+                    self._save_oasis(patient_id, {
+                        "assessment_ns": ns,
+                        "fields": [[col, values[col]] for col in fields],
+                    })
+                    touched.add((patient_id, None))
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+        return touched
+
+    # -- rendering -----------------------------------------------------------
+
+    def facts(self, patient_id: int, episode_id: int) -> list[dict]:
+        patient_id, episode_id = int(patient_id), int(episode_id)
+        state = self._load(patient_id, episode_id)
+
+        facts = []
+        facts.extend(self._diagnosis_facts(state))
+        facts.extend(self._medication_facts(state))
+        facts.extend(self._vital_facts(state))
+        facts.extend(self._wound_facts(state))
+        facts.extend(self._note_facts(state))
+        facts.extend(self._oasis_facts(self._load_oasis(patient_id)))
+        return facts
+
+    @staticmethod
+    def _diagnosis_facts(state):
+        if not state["diagnoses"]:
+            return []
+        primary, *rest = state["diagnoses"]
+        secondary = [d for d in rest if not pd.isna(d)]
+        return [{
+            "statement": diagnosis_statement(primary, secondary),
+            "source": "diagnoses.csv",
+            "date": None
+        }]
+
+    @staticmethod
+    def _medication_facts(state):
+        return [
+            {
+                "statement": medication_statement(
+                    classification,
+                    ", ".join(sorted(entry["reasons"])),
+                    ", ".join(sorted(entry["frequencies"])),
+                ),
+                "source": "medications.csv",
+                "date": None
+            }
+            for classification, entry in sorted(state["medications"].items())
+        ]
+
+    @staticmethod
+    def _vital_facts(state):
+        facts = []
+        for vital, entry in state["vitals"].items():
+            last_date = _format_date(entry["last_ns"])
+            statement = vital_statement(vital, entry["high"], entry["low"], entry["reading"], last_date)
+            if statement is None:
+                continue
+            facts.append({"statement": statement, "source": "vitals.csv", "date": last_date})
+        return facts
+
+    @staticmethod
+    def _wound_facts(state):
+        facts = []
+        for key in sorted(state["wounds"], key=json.loads):
+            location, onset_ns = json.loads(key)
+            entry = state["wounds"][key]
+            w = {
+                "location": location,
+                "onset_date": pd.Timestamp(onset_ns).date(),
+                "latest_description": entry["latest_description"],
+                "last_seen": pd.Timestamp(entry["last_ns"]).date(),
+                "visit_count": entry["visit_count"],
+            }
+            facts.append({"statement": wound_statement(w), "source": "wounds.csv"})
+        return facts
+
+    @staticmethod
+    def _note_facts(state):
+        return [
+            {"statement": note_statement(note_type, _format_date(-neg_ns)), "source": "notes.csv"}
+            for neg_ns, _, note_type in state["notes"]
+        ]
+
+    @staticmethod
+    def _oasis_facts(state):
+        if state is None:
+            return []
+        date = _format_date(state["assessment_ns"])
+        facts = [{"statement": OASIS_FUNCTIONAL_SUMMARY, "source": "oasis.csv", "date": date}]
+        for col, value in state["fields"]:
+            facts.append({
+                "statement": oasis_field_statement(col, value),
+                "source": "oasis.csv",
+                "date": date
+            })
+        return facts
+
+
+def verify_incremental(dataframes: dict, batch_size: int = 1) -> list[str]:
+    """
+    Replay `dataframes` into a fresh IncrementalFactStore, `batch_size`
+    rows per table per round, and after every round compare the facts of
+    every patient's latest episode with a full recompute over the rows seen
+    so far. Returns a description of each mismatch (empty when identical).
+    """
+    store = IncrementalFactStore()
+    n_rounds = max(-(-len(df) // batch_size) for df in dataframes.values())
+    mismatches = []
+
+    for round_ in range(1, n_rounds + 1):
+        for table, df in dataframes.items():
+            store.append(table, df.iloc[(round_ - 1) * batch_size: round_ * batch_size])
+
+        seen = {table: df.iloc[: round_ * batch_size] for table, df in dataframes.items()}
+        repo = DataLoader(seen)
+        episodes = latest_episodes(seen["diagnoses_df"])
+
+        for patient_id, episode_id in zip(episodes["patient_id"].tolist(), episodes["episode_id"].tolist()):
+            expected = SummaryGenerator.for_patient(repo, patient_id, episode_id).generate()
+            actual = store.facts(patient_id, episode_id)
+            if actual != expected:
+                mismatches.append(
+                    f"round {round_}, patient {patient_id} episode {episode_id}: "
+                    f"expected {expected!r}, got {actual!r}"
+                )
+
+    return mismatches
+
+
+def main():
+    from clinical_data import read_clinical_tables
+
+    parser = argparse.ArgumentParser(description="Incremental clinical fact maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify", help="check incremental facts against full recomputes")
+    verify.add_argument("--data-dir", default="data")
+    verify.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+
+    mismatches = verify_incremental(read_clinical_tables(args.data_dir), args.batch_size)
+    for mismatch in mismatches[:10]:
+        print(mismatch)
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} mismatches")
+    print("incremental facts match full recompute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# llm_cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(facts, model: str, temperature: float, system_prompt: str, input_token_budget: int = 0) -> str:
+    """
+    Content address of one LLM request: a SHA-256 over the canonical JSON of
+    the fact list and every setting that changes the completion.
+    """
+    payload = {
+        "facts": facts,
+        "model": model,
+        "temperature": temperature,
+        "system_prompt": system_prompt,
+        "input_token_budget": input_token_budget,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM completions.
+
+    A bounded in-memory LRU sits in front of an SQLite table on disk, so
+    entries survive restarts and are shared by every process using the same
+    file. Entries expire after `ttl_seconds`; each tier evicts its least
+    recently used entries once it holds more than its item limit.
+
+    Every entry remembers how long the original LLM call took and how many
+    tokens it used, so the hit counters can report the latency and tokens
+    the cache has saved.
+
+    Async callers check the memory tier on the loop (`get_memory`) and run
+    `get_disk` and `set` in a thread when the cache is `on_disk`.
+    """
+
+    def __init__(
+        self,
+        path: str | None = ".llm_cache.sqlite",
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_memory_items: int = 512,
+        max_disk_items: int = 50_000,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+
+        # _lock guards the memory tier and the counters, _db_lock the SQLite
+        # connection, so memory lookups never wait behind disk I/O.
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "latency_saved_s": 0.0,
+            "tokens_saved": 0,
+        }
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    latency_s REAL NOT NULL,
+                    total_tokens INTEGER NOT NULL
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache(last_access)")
+
+    @property
+    def on_disk(self) -> bool:
+        return self._db is not None
+
+    def get(self, key: str) -> str | None:
+        value = self.get_memory(key)
+        if value is not None:
+            return value
+        return self.get_disk(key)
+
+    def get_memory(self, key: str) -> str | None:
+        """
+        The value from the in-memory tier only. A miss is not counted, as
+        the disk tier may still hold the entry; never touches SQLite, so it
+        is safe to call from an event loop.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry["created_at"] > self.ttl_seconds:
+                del self._memory[key]
+                entry = None
+            if entry is None:
+                return None
+
+            self._memory.move_to_end(key)
+            self._record_hit("memory_hits", entry)
+            return entry["value"]
+
+    def get_disk(self, key: str) -> str | None:
+        """
+        The value from the SQLite tier, promoted to memory on a hit. Counts
+        the hit or the miss. Blocking.
+        """
+        entry = self._disk_get(key, time.time())
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._memory_put(key, entry)
+            self._record_hit("disk_hits", entry)
+        return entry["value"]
+
+    def set(self, key: str, value: str, latency_s: float = 0.0, total_tokens: int = 0):
+        now = time.time()
+        entry = {
+            "value": value,
+            "created_at": now,
+            "latency_s": latency_s,
+            "total_tokens": total_tokens,
+        }
+
+        with self._lock:
+            self._memory_put(key, entry)
+
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, value, now, now, latency_s, total_tokens),
+                )
+                self._disk_evict(now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_items"] = len(self._memory)
+        if self._db is not None:
+            with self._db_lock:
+                stats["disk_items"] = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+
+    def _record_hit(self, counter: str, entry: dict):
+        self._counters[counter] += 1
+        self._counters["latency_saved_s"] += entry["latency_s"]
+        self._counters["tokens_saved"] += entry["total_tokens"]
+
+    def _memory_put(self, key: str, entry: dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float) -> dict | None:
+        if self._db is None:
+            return None
+
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, created_at, latency_s, total_tokens FROM llm_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at, latency_s, total_tokens = row
+            if now - created_at > self.ttl_seconds:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+
+            self._db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return {
+            "value": value,
+            "created_at": created_at,
+            "latency_s": latency_s,
+            "total_tokens": total_tokens,
+        }
+
+    def _disk_evict(self, now: float):
+        self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        self._db.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_disk_items,),
+        )
@@ -1,25 +1,184 @@
 # llm_client.py
 
 import os
-import json
+import time
+import asyncio
+import threading
+from typing import NamedTuple
 from dotenv import load_dotenv
-from openai import OpenAI
+from llm_cache import LLMCache, cache_key
+from llm_resilience import ResilientCaller
+from singleflight import SingleFlight, SQLiteLease
+from prompt_compaction import compact_prompt
+from metrics import (
+    LLM_CACHE_LOOKUPS,
+    LLM_COALESCED,
+    LLM_ERRORS,
+    LLM_PROMPT_FACTS_DROPPED,
+    LLM_PROMPT_SERIALIZE_SECONDS,
+    LLM_PROMPT_TOKENS_SAVED,
+    LLM_REQUEST_SECONDS,
+    LLM_TOKENS,
+)
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv("OPEN_ROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1"
+# LLM_BASE_URL can point at fake_llm_server.py for offline runs.
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "mistralai/mistral-small-3.1-24b-instruct:free")
+# Ordered fallback chain, comma-separated; the first model is the primary.
+LLM_MODELS = [model.strip() for model in os.getenv("LLM_MODELS", LLM_MODEL).split(",") if model.strip()]
+LLM_MODEL = LLM_MODELS[0]
+LLM_TEMPERATURE = 0.3
+LLM_MAX_TOKENS = 2500
+
+# Estimated-token ceiling for the clinical facts in the prompt; the
+# lowest-priority facts are dropped to stay under it. 0 disables the limit.
+LLM_INPUT_TOKEN_BUDGET = int(os.getenv("LLM_INPUT_TOKEN_BUDGET", "6000"))
+
+# Upper bound on LLM calls in flight from one process, and the size of the
+# shared connection pool behind them.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "256"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "256"))
+
+# Retries, deadline, hedging and fallback (see llm_resilience.py). The
+# OpenAI clients' own retries are off so they do not stack with these.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "120"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+resilience = ResilientCaller(
+    LLM_MODELS,
+    max_retries=LLM_MAX_RETRIES,
+    deadline_seconds=LLM_DEADLINE_SECONDS,
+    hedge_percentile=LLM_HEDGE_PERCENTILE,
+    breaker_failures=LLM_BREAKER_FAILURES,
+    breaker_reset_seconds=LLM_BREAKER_RESET_SECONDS,
 )
 
-SYSTEM_PROMPT = """
+# The OpenAI clients (and the openai package) are created on first use, so
+# importing this module stays cheap and works without an API key. Benchmarks
+# assign either attribute directly to point it elsewhere.
+client = None
+async_client = None
+_clients_lock = threading.Lock()
+
+
+def get_client():
+    global client
+    if client is not None:
+        return client
+    with _clients_lock:
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(
+                api_key=os.getenv("OPEN_ROUTER_API_KEY"),
+                base_url=LLM_BASE_URL,
+                max_retries=0
+            )
+    return client
+
+
+def get_async_client():
+    global async_client
+    if async_client is not None:
+        return async_client
+    with _clients_lock:
+        if async_client is None:
+            import httpx
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            async_client = AsyncOpenAI(
+                api_key=os.getenv("OPEN_ROUTER_API_KEY"),
+                base_url=LLM_BASE_URL,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    )
+                ),
+            )
+    return async_client
+
+
+async def close():
+    """
+    Close the async client's connection pool, if it was ever opened.
+    """
+    if async_client is not None:
+        await async_client.close()
+
+
+_llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+# Completions are cached by the content of the request, so regenerating an
+# unchanged patient summary skips the LLM. Set LLM_CACHE_PATH to "" for a
+# memory-only cache, or LLM_CACHE_ENABLED=0 to turn caching off.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite") or None
+
+# Like the clients, the cache and the lease are opened on first use, so
+# importing this module creates no files. Benchmarks may assign `cache`.
+cache = None
+_lease = None
+
+
+def get_cache() -> LLMCache | None:
+    global cache
+    if cache is not None or not LLM_CACHE_ENABLED:
+        return cache
+    with _clients_lock:
+        if cache is None:
+            cache = LLMCache(
+                path=LLM_CACHE_PATH,
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+                max_memory_items=int(os.getenv("LLM_CACHE_MEMORY_ITEMS", "512")),
+                max_disk_items=int(os.getenv("LLM_CACHE_DISK_ITEMS", "50000")),
+            )
+    return cache
+
+
+# Identical concurrent requests share one LLM call (LLM_SINGLEFLIGHT_ENABLED=0
+# turns this off). Setting LLM_SINGLEFLIGHT_LEASE_PATH to an SQLite file
+# extends this across worker processes; the waiting workers read the result
+# from the on-disk response cache, so it needs LLM_CACHE_PATH as well.
+LLM_SINGLEFLIGHT_ENABLED = os.getenv("LLM_SINGLEFLIGHT_ENABLED", "1") != "0"
+LLM_SINGLEFLIGHT_LEASE_PATH = os.getenv("LLM_SINGLEFLIGHT_LEASE_PATH", "")
+LLM_SINGLEFLIGHT_LEASE_SECONDS = float(os.getenv("LLM_SINGLEFLIGHT_LEASE_SECONDS", "120"))
+LLM_SINGLEFLIGHT_POLL_SECONDS = 0.05
+
+_flights = SingleFlight() if LLM_SINGLEFLIGHT_ENABLED else None
+
+
+def get_lease() -> SQLiteLease | None:
+    global _lease
+    if _lease is not None or not (
+        _flights is not None and LLM_SINGLEFLIGHT_LEASE_PATH and LLM_CACHE_ENABLED and LLM_CACHE_PATH
+    ):
+        return _lease
+    with _clients_lock:
+        if _lease is None:
+            _lease = SQLiteLease(LLM_SINGLEFLIGHT_LEASE_PATH, ttl_seconds=LLM_SINGLEFLIGHT_LEASE_SECONDS)
+    return _lease
+
+
+# Shared with the per-section prompts of sectioned.py.
+INPUT_FORMAT = """Input:
+You will receive a JSON object of clinical facts grouped by source file, then by date
+("undated" when the fact has no date): {"source": {"date": ["statement", ...]}}.
+If an "omitted_facts" count is present, that many lower-priority facts were left out for length.
+"""
+
+SYSTEM_PROMPT = f"""
 You are a clinical documentation specialist.
 
 Generate a comprehensive clinical summary using clear markdown formatting.
 
-Input:
-You will receive a JSON array of clinical facts with statements, sources, and dates.
-
+{INPUT_FORMAT}
 Output Format:
 Use this exact structure with markdown headers:
 
@@ -52,36 +211,339 @@ Instructions:
 - Organize information chronologically within each section when relevant
 """
 
-def call_llm(summary):
+
+class PromptSpec(NamedTuple):
+    """
+    What a completion is asked: the system prompt, the completion's
+    max_tokens, and the token budget its facts are compacted to.
     """
-    Generate clinical summary from structured facts.
+    system_prompt: str
+    max_tokens: int
+    token_budget: int
+
+
+SUMMARY_PROMPT = PromptSpec(SYSTEM_PROMPT, LLM_MAX_TOKENS, LLM_INPUT_TOKEN_BUDGET)
+
+def _build_messages(summary, report: dict | None = None, prompt: PromptSpec = SUMMARY_PROMPT) -> list[dict]:
+    with LLM_PROMPT_SERIALIZE_SECONDS.time():
+        user_prompt, compaction = compact_prompt(summary, prompt.token_budget)
+
+    LLM_PROMPT_TOKENS_SAVED.inc(max(compaction["tokens_saved"], 0))
+    LLM_PROMPT_FACTS_DROPPED.inc(compaction["facts_dropped"])
+    if report is not None:
+        report.update(compaction)
+
+    return [
+        {"role": "system", "content": prompt.system_prompt},
+        {"role": "user", "content": f"Clinical facts:\n\n{user_prompt}"}
+    ]
+
+
+def _cache_key(summary, prompt: PromptSpec = SUMMARY_PROMPT) -> str:
+    return cache_key(summary, LLM_MODEL, LLM_TEMPERATURE, prompt.system_prompt, prompt.token_budget)
+
+
+def _cache_get(summary, prompt: PromptSpec = SUMMARY_PROMPT) -> tuple[str, str | None]:
+    key = _cache_key(summary, prompt)
+    cache = get_cache()
+    if cache is None:
+        return key, None
+    cached = cache.get(key)
+    LLM_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+    return key, cached
+
+
+def _cache_put(key: str, content: str, usage, started: float, model: str):
+    # Keys name the primary model; a fallback model's answer is not cached
+    # under it.
+    cache = get_cache()
+    if cache is None or model != LLM_MODEL:
+        return
+    cache.set(
+        key,
+        content,
+        latency_s=time.perf_counter() - started,
+        total_tokens=getattr(usage, "total_tokens", 0) or 0,
+    )
+
+
+# The async paths check the memory tier on the event loop and leave SQLite
+# reads and writes to a worker thread, so disk I/O never stalls the loop.
+
+async def _cache_lookup(key: str) -> str | None:
+    cache = get_cache()
+    cached = cache.get_memory(key)
+    if cached is None:
+        cached = await asyncio.to_thread(cache.get_disk, key) if cache.on_disk else cache.get_disk(key)
+    return cached
+
+
+async def _async_cache_get(summary, prompt: PromptSpec = SUMMARY_PROMPT) -> tuple[str, str | None]:
+    key = _cache_key(summary, prompt)
+    if get_cache() is None:
+        return key, None
+    cached = await _cache_lookup(key)
+    LLM_CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+    return key, cached
+
+
+async def _async_cache_put(key: str, content: str, usage, started: float, model: str):
+    cache = get_cache()
+    if cache is not None and cache.on_disk:
+        await asyncio.to_thread(_cache_put, key, content, usage, started, model)
+    else:
+        _cache_put(key, content, usage, started, model)
+
+
+def _record_call(started: float, model: str, usage=None, error: Exception | None = None):
+    outcome = "success" if error is None else "error"
+    LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, model=model, outcome=outcome)
+
+    if error is not None:
+        LLM_ERRORS.inc(model=model, error=type(error).__name__)
+    if usage is not None:
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+
+
+def _response_text(response) -> str:
+    content = response.choices[0].message.content
+
+    if content is None:
+        raise ValueError("LLM returned empty response")
+
+    return content.strip()
+
+
+def call_llm(summary, report: dict | None = None):
+    """
+    Generate clinical summary from structured facts, with the retries,
+    deadline and model fallback of `resilience` (no hedging).
     
     Args:
         summary: List of clinical fact dictionaries
+        report: Optional dict that receives the prompt compaction report
+            (estimated prompt tokens, tokens saved, facts dropped); left
+            empty on a cache hit
         
     Returns:
         str: Markdown-formatted clinical summary
     """
-    user_prompt = json.dumps(summary, indent=2)
-    
+    key, cached = _cache_get(summary)
+    if cached is not None:
+        return cached
+
+    messages = _build_messages(summary, report)
+
+    def attempt(model, timeout):
+        started = time.perf_counter()
+        try:
+            response = get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=LLM_TEMPERATURE,
+                max_tokens=LLM_MAX_TOKENS,
+                timeout=timeout
+            )
+            content = _response_text(response)
+        except Exception as e:
+            _record_call(started, model, error=e)
+            raise
+        _record_call(started, model, usage=response.usage)
+        return content, response.usage, started
+
     try:
-        response = client.chat.completions.create(
-            model="mistralai/mistral-small-3.1-24b-instruct:free", 
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Clinical facts:\n\n{user_prompt}"}
-            ],
-            temperature=0.3,
-            max_tokens=2500
-        )
-        
-        content = response.choices[0].message.content
+        (content, usage, started), model = resilience.call_sync(attempt)
+    except Exception as e:
+        print(f"Error calling LLM: {e}")
+        raise
+
+    _cache_put(key, content, usage, started, model)
+    return content
+
+
+async def async_call_llm(summary, report: dict | None = None, models: set | None = None):
+    """
+    Async variant of call_llm for the API server.
+
+    Calls share one pooled HTTP client, and at most LLM_MAX_CONCURRENCY of
+    them are in flight at once; the rest wait for a slot. Concurrent calls
+    with identical facts share a single LLM request (see _flights). Each
+    request is retried, hedged and moved down LLM_MODELS as configured on
+    `resilience`.
+
+    Args:
+        summary: List of clinical fact dictionaries
+        report: Optional dict that receives the prompt compaction report,
+            as in call_llm
+        models: Optional set that receives the model that wrote the
+            summary (LLM_MODEL for a cached one, which only holds its
+            answers)
         
-        if content is None:
+    Returns:
+        str: Markdown-formatted clinical summary
+    """
+    return await complete(summary, SUMMARY_PROMPT, report, models)
+
+
+async def complete(summary, prompt: PromptSpec, report: dict | None = None, models: set | None = None) -> str:
+    """
+    One chat completion over `summary` for `prompt`, with the caching,
+    coalescing and resilience of async_call_llm.
+    """
+    key, cached = await _async_cache_get(summary, prompt)
+    if cached is not None:
+        content, flight_report, model = cached, {}, LLM_MODEL
+    elif _flights is None:
+        content, flight_report, model = await _request(summary, key, prompt)
+    else:
+        (content, flight_report, model), shared = await _flights.do(key, lambda: _lead(summary, key, prompt))
+        if shared:
+            LLM_COALESCED.inc(scope="process")
+
+    if report is not None:
+        report.update(flight_report)
+    if models is not None:
+        models.add(model)
+    return content
+
+
+async def _lead(summary, key: str, prompt: PromptSpec) -> tuple[str, dict, str]:
+    # Runs once per key per process. With a lease file, also once per key
+    # across workers: the others wait for the lease holder and read its
+    # result from the shared cache. The lease is an SQLite table that other
+    # workers write to, so its calls run in a thread, as disk cache reads do.
+    lease = get_lease()
+    if lease is None:
+        return await _request(summary, key, prompt)
+
+    while True:
+        if await asyncio.to_thread(lease.acquire, key):
+            try:
+                # The previous holder may have finished between our cache
+                # lookup and acquiring the lease.
+                cached = await _cache_lookup(key)
+                if cached is not None:
+                    return cached, {}, LLM_MODEL
+                return await _request(summary, key, prompt)
+            finally:
+                await asyncio.to_thread(lease.release, key)
+
+        LLM_COALESCED.inc(scope="worker")
+        while await asyncio.to_thread(lease.held, key):
+            await asyncio.sleep(LLM_SINGLEFLIGHT_POLL_SECONDS)
+
+        cached = await _cache_lookup(key)
+        if cached is not None:
+            return cached, {}, LLM_MODEL
+        # The holder failed or its lease lapsed; try to take over.
+
+
+async def _request(summary, key: str, prompt: PromptSpec) -> tuple[str, dict, str]:
+    report = {}
+    messages = _build_messages(summary, report, prompt)
+
+    async def attempt(model):
+        started = None
+        try:
+            async with _llm_slots:
+                started = time.perf_counter()
+                response = await get_async_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=LLM_TEMPERATURE,
+                    max_tokens=prompt.max_tokens
+                )
+            content = _response_text(response)
+        except Exception as e:
+            if started is not None:
+                _record_call(started, model, error=e)
+            raise
+        _record_call(started, model, usage=response.usage)
+        return content, response.usage, started
+
+    try:
+        (content, usage, started), model = await resilience.call(attempt)
+    except Exception as e:
+        print(f"Error calling LLM: {e}")
+        raise
+
+    await _async_cache_put(key, content, usage, started, model)
+    return content, report, model
+
+
+async def stream_llm(summary, report: dict | None = None, models: set | None = None):
+    """
+    Streaming variant of async_call_llm.
+
+    Yields the summary text in chunks as the LLM produces them. A cached
+    summary is yielded as a single chunk; a completed stream is cached.
+    Opening the stream is retried and falls back like async_call_llm.
+
+    Args:
+        summary: List of clinical fact dictionaries
+        report: Optional dict that receives the prompt compaction report,
+            as in call_llm
+        models: Optional set that receives the model that wrote the
+            summary, as in async_call_llm, once the stream has completed
+
+    Yields:
+        str: Successive pieces of the markdown-formatted clinical summary
+    """
+    key, cached = await _async_cache_get(summary)
+    if cached is not None:
+        if models is not None:
+            models.add(LLM_MODEL)
+        yield cached
+        return
+
+    messages = _build_messages(summary, report)
+
+    async def attempt(model):
+        started = time.perf_counter()
+        try:
+            stream = await get_async_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=LLM_TEMPERATURE,
+                max_tokens=LLM_MAX_TOKENS,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+        except Exception as e:
+            _record_call(started, model, error=e)
+            raise
+        return stream, started
+
+    model = None
+    try:
+        async with _llm_slots:
+            # Retries and fallback cover opening the stream; once text has
+            # been yielded a failure is final. Streams are never hedged.
+            (stream, started), model = await resilience.call(attempt, hedge=False)
+
+            parts = []
+            usage = None
+            async for chunk in stream:
+                # The final chunk carries usage and no choices.
+                usage = chunk.usage or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+
+        content = "".join(parts).strip()
+        if not content:
             raise ValueError("LLM returned empty response")
-        
-        return content.strip()
-        
+        _record_call(started, model, usage=usage)
+        await _async_cache_put(key, content, usage, started, model)
+        if models is not None:
+            models.add(model)
+
     except Exception as e:
+        if model is not None:
+            _record_call(started, model, error=e)
         print(f"Error calling LLM: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,294 @@
+# llm_resilience.py
+#
+# Retry, deadline, hedging and model fallback around one LLM request. The
+# caller supplies `attempt(model)`, which makes a single request; a
+# ResilientCaller decides which model to try, when to retry and when to
+# send a hedged duplicate:
+#
+#   for each model in the fallback chain whose circuit breaker is closed:
+#       up to 1 + max_retries attempts, retrying 429 / 5xx / timeouts /
+#       connection errors after jittered exponential backoff (at least the
+#       server's Retry-After); other errors move on to the next model
+#   only the retryable errors count towards a model's circuit breaker
+#   the whole call is bounded by deadline_seconds
+#
+# With hedge_percentile set (e.g. 95), an attempt still running after that
+# percentile of the model's recent latencies gets a duplicate request; the
+# first success wins and the other is cancelled.
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+
+from metrics import LLM_CIRCUIT_OPENED, LLM_FALLBACKS, LLM_HEDGES, LLM_RETRIES
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def retryable(error: Exception) -> bool:
+    # Imported here so that importing this module does not load openai.
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: float | None = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (0-based): full jitter
+    over an exponentially growing window of at most `cap`, but never less
+    than the server's Retry-After.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a model after `failure_threshold` consecutive failures.
+
+    Once open, the breaker rejects calls for `reset_seconds`, then lets a
+    single probe through (half-open): its success closes the breaker, its
+    failure opens it again. A probe that never reports back is replaced
+    after another `reset_seconds`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_at = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "open":
+                return False
+            now = time.monotonic()
+            if self._probe_at is not None and now - self._probe_at < self.reset_seconds:
+                return False
+            self._probe_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_at = None
+
+    def record_failure(self) -> bool:
+        """
+        Count a failure; True if it opened the breaker.
+        """
+        with self._lock:
+            self._failures += 1
+            reopen = self._opened_at is not None
+            if reopen or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probe_at = None
+                return not reopen
+            return False
+
+
+class LatencyWindow:
+    """
+    The most recent `size` successful latencies of one model.
+    """
+
+    def __init__(self, size: int = 256):
+        self._samples = deque(maxlen=size)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = 20) -> float | None:
+        if len(self._samples) < max(min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class ResilientCaller:
+    """
+    Runs `attempt(model)` under the retry, deadline, hedging and fallback
+    policy described at the top of this module. `call` is for coroutines;
+    `call_sync` is the blocking equivalent without hedging.
+    """
+
+    def __init__(
+        self,
+        models: list[str],
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 8.0,
+        deadline_seconds: float = 60.0,
+        hedge_percentile: float = 0.0,
+        hedge_min_samples: int = 20,
+        breaker_failures: int = 5,
+        breaker_reset_seconds: float = 30.0,
+    ):
+        if not models:
+            raise ValueError("at least one model is required")
+        self.models = list(models)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.deadline_seconds = deadline_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breakers = {model: CircuitBreaker(breaker_failures, breaker_reset_seconds) for model in self.models}
+        self.latencies = {model: LatencyWindow() for model in self.models}
+
+    def hedge_delay(self, model: str) -> float | None:
+        if not self.hedge_percentile:
+            return None
+        return self.latencies[model].percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    async def call(self, attempt, hedge: bool = True) -> tuple:
+        """
+        Returns (result, model). Raises TimeoutError past the deadline, the
+        last model's error when every model failed, or CircuitOpenError
+        when every breaker was open.
+        """
+        async with asyncio.timeout(self.deadline_seconds or None):
+            last_error = None
+            for model in self._available_models():
+                for retry in range(self.max_retries + 1):
+                    try:
+                        if hedge:
+                            result = await self._hedged(attempt, model)
+                        else:
+                            result = await self._timed(attempt, model)
+                    except Exception as e:
+                        last_error = e
+                        if not self._should_retry(model, e, retry):
+                            break
+                        await asyncio.sleep(self._backoff(retry, e))
+                        continue
+                    self.breakers[model].record_success()
+                    return result, model
+        raise last_error
+
+    def call_sync(self, attempt) -> tuple:
+        """
+        Blocking `call`. `attempt(model, timeout)` receives the seconds left
+        before the deadline (None without one) to use as its request timeout.
+        """
+        deadline = time.monotonic() + self.deadline_seconds if self.deadline_seconds else None
+
+        def remaining() -> float | None:
+            if deadline is None:
+                return None
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise TimeoutError(f"LLM call exceeded its {self.deadline_seconds}s deadline")
+            return left
+
+        last_error = None
+        for model in self._available_models():
+            for retry in range(self.max_retries + 1):
+                try:
+                    result = attempt(model, remaining())
+                except TimeoutError:
+                    raise
+                except Exception as e:
+                    last_error = e
+                    if not self._should_retry(model, e, retry):
+                        break
+                    delay = self._backoff(retry, e)
+                    left = remaining()
+                    time.sleep(delay if left is None else min(delay, left))
+                    continue
+                self.breakers[model].record_success()
+                return result, model
+        raise last_error
+
+    def _available_models(self):
+        # Yields models whose breaker lets a call through; raises when none
+        # of them did.
+        tried = False
+        for position, model in enumerate(self.models):
+            if not self.breakers[model].allow():
+                continue
+            if position > 0:
+                LLM_FALLBACKS.inc(model=model)
+            tried = True
+            yield model
+        if not tried:
+            raise CircuitOpenError(f"circuit open for every model: {', '.join(self.models)}")
+
+    def _should_retry(self, model: str, error: Exception, retry: int) -> bool:
+        # Errors the request itself caused (a 400 for an oversized prompt,
+        # say) say nothing about the model's health and stay off its breaker.
+        if not retryable(error):
+            return False
+        breaker = self.breakers[model]
+        if breaker.record_failure():
+            LLM_CIRCUIT_OPENED.inc(model=model)
+        if retry >= self.max_retries or breaker.state != "closed":
+            return False
+        LLM_RETRIES.inc(model=model, error=type(error).__name__)
+        return True
+
+    def _backoff(self, retry: int, error: Exception) -> float:
+        return backoff_delay(retry, self.backoff_seconds, self.max_backoff_seconds, retry_after(error))
+
+    async def _timed(self, attempt, model: str):
+        started = time.perf_counter()
+        result = await attempt(model)
+        self.latencies[model].observe(time.perf_counter() - started)
+        return result
+
+    async def _hedged(self, attempt, model: str):
+        delay = self.hedge_delay(model)
+        if delay is None:
+            return await self._timed(attempt, model)
+
+        tasks = [asyncio.ensure_future(self._timed(attempt, model))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                LLM_HEDGES.inc(model=model)
+                tasks.append(asyncio.ensure_future(self._timed(attempt, model)))
+
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,268 @@
+# loadtest.py
+#
+# Closed-loop load generator for api.py: at each concurrency step, that many
+# clients send requests back to back for --duration seconds, and the step
+# reports throughput, error rate and p50/p95/p99 latency. The highest step
+# within --slo-p95-ms is the node's capacity, for sizing uvicorn workers.
+#
+# Against servers you started, with fake_llm_server.py as the LLM:
+#
+#   uvicorn fake_llm_server:app --port 8001
+#   LLM_BASE_URL=http://localhost:8001/v1 uvicorn api:app --workers 2
+#   python loadtest.py --concurrency 1 8 32 128 --duration 20
+#
+# or let the harness start both (the FAKE_LLM_* variables shape the fake
+# LLM's latency and faults; see fake_llm_server.py):
+#
+#   FAKE_LLM_LATENCY_MS=800 FAKE_LLM_JITTER_MS=400 FAKE_LLM_LATENCY_DISTRIBUTION=lognormal \
+#       python loadtest.py --spawn --api-workers 2 --concurrency 1 8 32 128 --slo-p95-ms 2000
+#
+# Scenarios:
+#
+#   generate-summary   POST /generate-summary; every request's facts differ
+#                      (unless --repeat-facts), so none is a cache hit
+#   patient-summary    GET /patients/{id}/summary, cycling through /patients;
+#                      includes server-side fact generation
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+SCENARIOS = ("generate-summary", "patient-summary")
+
+SAMPLE_FACTS = [
+    {"statement": "The primary diagnosis for this episode appears to be Congestive heart failure. Additional documented conditions include Hypertension, Type 2 diabetes mellitus.", "source": "diagnoses.csv", "date": None},
+    {"statement": "Furosemide 40 mg by mouth once daily.", "source": "medications.csv", "date": None},
+    {"statement": "Metformin 500 mg by mouth twice daily.", "source": "medications.csv", "date": None},
+    {"statement": "Systolic blood pressure readings were elevated on 3 of 8 visits, most recently 162 on 2024-03-02.", "source": "vitals.csv", "date": "2024-03-02"},
+    {"statement": "A stage III pressure ulcer of the sacrum, first noted on 2024-02-10, measured 3.0 x 2.5 cm on 2024-03-01.", "source": "wounds.csv", "date": "2024-03-01"},
+    {"statement": "An after-hours on-call interaction was documented on 2024-02-27.", "source": "notes.csv", "date": None},
+    {"statement": "Ambulation: Requires assistance of another person", "source": "oasis.csv", "date": "2024-02-05"},
+]
+
+
+def percentiles_ms(seconds: list[float]) -> tuple[float, float, float]:
+    if not seconds:
+        return (float("nan"),) * 3
+    return tuple(np.percentile(seconds, [50, 95, 99]) * 1e3)
+
+
+class Scenario:
+    """
+    The requests of one scenario. `send` returns the response status, or
+    the exception's type name when the request did not complete.
+    """
+
+    def __init__(self, name: str, client: httpx.AsyncClient, facts: list[dict], repeat_facts: bool):
+        self.name = name
+        self.client = client
+        self.facts = facts
+        self.repeat_facts = repeat_facts
+        self._sequence = itertools.count()
+        self._patients = None
+
+    async def prepare(self):
+        if self.name == "patient-summary":
+            response = await self.client.get("/patients")
+            response.raise_for_status()
+            patient_ids = response.json()["patient_ids"]
+            if not patient_ids:
+                raise SystemExit("the API has no patients to summarize")
+            self._patients = itertools.cycle(patient_ids)
+
+    def _request(self):
+        if self.name == "patient-summary":
+            return self.client.get(f"/patients/{next(self._patients)}/summary")
+        facts = self.facts
+        if not self.repeat_facts:
+            # A distinct fact list per request, so neither the LLM cache nor
+            # request coalescing answers it.
+            n = next(self._sequence)
+            facts = facts + [{"statement": f"Load test request {n}.", "source": "loadtest", "date": None}]
+        return self.client.post("/generate-summary", json={"clinical_facts": facts})
+
+    async def send(self) -> int | str:
+        try:
+            return (await self._request()).status_code
+        except httpx.HTTPError as e:
+            return type(e).__name__
+
+
+async def run_step(scenario: Scenario, concurrency: int, duration: float, warmup: float) -> dict:
+    """
+    Drive `concurrency` closed-loop clients for warmup + duration seconds.
+    Only requests that start after the warmup and finish within the step
+    are counted.
+    """
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+    latencies = []
+    outcomes = Counter()
+
+    async def client():
+        while (start := time.perf_counter()) < stop_at:
+            outcome = await scenario.send()
+            end = time.perf_counter()
+            if start >= measure_from and end <= stop_at:
+                outcomes[outcome] += 1
+                if outcome == 200:
+                    latencies.append(end - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    completed = sum(outcomes.values())
+    p50, p95, p99 = percentiles_ms(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": completed,
+        "throughput": len(latencies) / duration,
+        "error_rate": 1 - len(latencies) / completed if completed else 0.0,
+        "errors": {str(k): v for k, v in outcomes.items() if k != 200},
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+    }
+
+
+def capacity(steps: list[dict], slo_p95_ms: float, max_error_rate: float) -> dict | None:
+    """
+    The step with the highest throughput whose p95 latency and error rate
+    are within the SLO.
+    """
+    within = [
+        step for step in steps
+        if step["requests"] and step["p95_ms"] <= slo_p95_ms and step["error_rate"] <= max_error_rate
+    ]
+    return max(within, key=lambda step: step["throughput"], default=None)
+
+
+async def wait_until_ready(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url, timeout=2.0) as client:
+        while True:
+            try:
+                if (await client.get("/")).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f"{url} did not start within {timeout:.0f}s")
+            await asyncio.sleep(0.2)
+
+
+@contextlib.contextmanager
+def spawned_servers(api_port: int, fake_port: int, api_workers: int):
+    """
+    fake_llm_server.py and api.py (pointed at it) as uvicorn subprocesses.
+    The API runs without the response cache and the summary store, so every
+    request reaches the fake LLM.
+    """
+    api_env = {
+        **os.environ,
+        "LLM_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+        "OPEN_ROUTER_API_KEY": os.getenv("OPEN_ROUTER_API_KEY", "offline"),
+        "LLM_CACHE_ENABLED": "0",
+        "SUMMARY_STORE_PATH": "",
+    }
+    uvicorn = [sys.executable, "-m", "uvicorn", "--host", "127.0.0.1", "--log-level", "warning"]
+    # The API prints every failed LLM call; keep the report readable.
+    processes = [
+        subprocess.Popen(uvicorn + ["--port", str(fake_port), "fake_llm_server:app"], stdout=subprocess.DEVNULL),
+        subprocess.Popen(
+            uvicorn + ["--port", str(api_port), "--workers", str(api_workers), "api:app"],
+            env=api_env,
+            stdout=subprocess.DEVNULL,
+        ),
+    ]
+    try:
+        yield
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def load_test(args) -> list[dict]:
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        scenario = Scenario(args.scenario, client, args.facts, args.repeat_facts)
+        await scenario.prepare()
+
+        print(f"{args.scenario} against {args.url}, {args.duration:g}s per step after {args.warmup:g}s warm-up\n")
+        print(f"{'concurrency':>11} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        steps = []
+        for concurrency in args.concurrency:
+            step = await run_step(scenario, concurrency, args.duration, args.warmup)
+            steps.append(step)
+            print(
+                f"{concurrency:>11} {step['requests']:>9} {step['throughput']:>8.1f} {step['error_rate']:>7.1%} "
+                f"{step['p50_ms']:>9.1f} {step['p95_ms']:>9.1f} {step['p99_ms']:>9.1f}"
+            )
+            if step["errors"]:
+                print(f"{'':>11} errors: " + ", ".join(f"{k} x{v}" for k, v in sorted(step["errors"].items())))
+        return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stepped-concurrency load test of api.py")
+    parser.add_argument("--url", default=None, help="API base URL (default: http://localhost:8000)")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="generate-summary")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per step")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before each step")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--facts-file", default=None, help="JSON list of facts to send (default: a sample patient)")
+    parser.add_argument("--repeat-facts", action="store_true", help="send identical facts (measures cache hits)")
+    parser.add_argument("--slo-p95-ms", type=float, default=None, help="report the capacity within this p95")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="error rate allowed within the SLO")
+    parser.add_argument("--spawn", action="store_true", help="start fake_llm_server.py and api.py first")
+    parser.add_argument("--api-workers", type=int, default=1, help="uvicorn workers with --spawn")
+    parser.add_argument("--api-port", type=int, default=8000)
+    parser.add_argument("--fake-port", type=int, default=8001)
+    parser.add_argument("--save", default=None, help="write the step results as JSON")
+    args = parser.parse_args()
+
+    args.url = args.url or f"http://localhost:{args.api_port}"
+    if args.facts_file:
+        with open(args.facts_file) as f:
+            args.facts = json.load(f)
+    else:
+        args.facts = SAMPLE_FACTS
+
+    with spawned_servers(args.api_port, args.fake_port, args.api_workers) if args.spawn else contextlib.nullcontext():
+        if args.spawn:
+            asyncio.run(wait_until_ready(args.url, timeout=120))
+        steps = asyncio.run(load_test(args))
+
+    if args.slo_p95_ms is not None:
+        best = capacity(steps, args.slo_p95_ms, args.max_error_rate)
+        if best is None:
+            print(f"\nno step stayed within p95 {args.slo_p95_ms:g} ms and {args.max_error_rate:.1%} errors")
+        else:
+            print(
+                f"\ncapacity: {best['throughput']:.1f} req/s at concurrency {best['concurrency']} "
+                f"(p95 {best['p95_ms']:.0f} ms, {best['error_rate']:.1%} errors)"
+            )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"scenario": args.scenario, "url": args.url, "steps": steps}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,54 @@
 # main.py
 
 import streamlit as st
-import pandas as pd
 import requests
 import json
-from summarizers import (
-    DataLoader,
-    VitalSummarizer,
-    MedicationSummarizer,
-    DiagnosisSummarizer,
-    WoundsSummarizer,
-    NotesSummarizer,
-    OASISSummarizer,
-    SummaryGenerator
-)
 
 # API Configuration
 API_BASE_URL = "http://localhost:8000"
 
-@st.cache_data
-def load_clinical_data(data_dir="data"):
-    return {
-        "diagnoses_df": pd.read_csv(f"{data_dir}/diagnoses.csv"),
-        "meds_df": pd.read_csv(f"{data_dir}/medications.csv"),
-        "vitals_df": pd.read_csv(f"{data_dir}/vitals.csv"),
-        "notes_df": pd.read_csv(f"{data_dir}/notes.csv"),
-        "wounds_df": pd.read_csv(f"{data_dir}/wounds.csv"),
-        "oasis_df": pd.read_csv(f"{data_dir}/oasis.csv"),
-    }
-
-Dataframes = load_clinical_data()
-
-def get_latest_episode(patient_id: int) -> int:
-    df = Dataframes["diagnoses_df"]
-    patient_episodes = df[df["patient_id"] == patient_id]["episode_id"]
-
-    if patient_episodes.empty:
-        raise ValueError("No episodes found for this patient")
-
-    return patient_episodes.max()
-
-REPO = DataLoader(Dataframes)
-
-def generate_clinical_facts(patient_id: int) -> list[dict]:
-    
-    episode_id = get_latest_episode(patient_id)
-    
-    diagnoses_df = REPO.get("diagnoses_df", patient_id, episode_id)
-    meds_df = REPO.get("meds_df", patient_id, episode_id)
-    vitals_df = REPO.get("vitals_df", patient_id, episode_id)
-    wounds_df = REPO.get("wounds_df", patient_id, episode_id)
-    notes_df = REPO.get("notes_df", patient_id, episode_id)
-    oasis_df = REPO.get_patient_only("oasis_df", patient_id)
-
-    generator = SummaryGenerator(
-        [
-            DiagnosisSummarizer(diagnoses_df),
-            MedicationSummarizer(meds_df),
-            VitalSummarizer(vitals_df),
-            WoundsSummarizer(wounds_df),
-            NotesSummarizer(notes_df),
-            OASISSummarizer(oasis_df)
-        ]
-    )
-    
-    return generator.generate()
-
-def call_llm_api(clinical_facts: list[dict]) -> str:
-    """Call FastAPI endpoint to generate summary"""
+# Facts are generated by the API from its own warm copy of the clinical
+# data; this app only holds patient IDs and the current summary.
+
+@st.cache_data(ttl=300)
+def get_patient_ids():
+    response = requests.get(f"{API_BASE_URL}/patients", timeout=10)
+    response.raise_for_status()
+    return response.json()["patient_ids"]
+
+def stream_patient_summary(patient_id: int, result: dict):
+    """
+    Call the patient streaming endpoint and yield summary text as it arrives.
+    The clinical facts the server used are stored in result["clinical_facts"].
+    """
     try:
-        response = requests.post(
-            f"{API_BASE_URL}/generate-summary",
-            json={"clinical_facts": clinical_facts},
-            timeout=30
-        )
-        response.raise_for_status()
-        return response.json()["summary_markdown"]
+        with requests.get(
+            f"{API_BASE_URL}/patients/{patient_id}/summary/stream",
+            stream=True,
+            timeout=(5, 30)  # (connect, gap between events)
+        ) as response:
+            response.raise_for_status()
+
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):])
+                    if event == "error":
+                        raise Exception(f"API error: {data['detail']}")
+                    if event == "facts":
+                        result.update(data)
+                        continue
+                    if event == "done":
+                        return
+                    yield data["delta"]
+                elif not line:
+                    event = None
     except requests.exceptions.RequestException as e:
         raise Exception(f"API error: {str(e)}")
 
 
-def get_patient_ids():
-    return sorted(Dataframes["diagnoses_df"]["patient_id"].unique().tolist())
-
-
 
 
 # Streamlit UI
@@ -106,24 +71,20 @@ generate = st.button("Generate Clinical Summary", type="primary")
 
 if generate and selected_patient is not None:
     try:
-        with st.spinner("Processing clinical data..."):
-            # Step 1: Generate clinical facts locally
-            clinical_facts = generate_clinical_facts(selected_patient)
-        
-        with st.spinner("Generating AI summary via API..."):
-            # Step 2: Call API to generate summary
-            markdown_summary = call_llm_api(clinical_facts)
-        
-        st.success("✅ Summary generated successfully!")
+        status = st.empty()
+        status.info("Generating AI summary via API...")
         
         # Create tabs for different views
         tab1, tab2 = st.tabs(["📋 Clinical Summary", "🔍 Raw Data"])
         
         with tab1:
             st.markdown("---")
-            # Display the full markdown summary
-            st.markdown(markdown_summary)
+            # The API builds the facts and streams the summary, rendered as tokens arrive
+            result = {}
+            markdown_summary = st.write_stream(stream_patient_summary(selected_patient, result))
+            clinical_facts = result.get("clinical_facts", [])
             st.markdown("---")
+            status.success("✅ Summary generated successfully!")
             
             # Download section
             col1, col2 = st.columns(2)
@@ -0,0 +1,225 @@
+# metrics.py
+#
+# In-process metrics rendered in the Prometheus text exposition format, so
+# /metrics can be scraped without adding a client library. Values are per
+# process: with several uvicorn workers each one reports its own.
+
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self, items) -> list[str]:
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Pipeline metrics shared by summarizers.py, llm_client.py and api.py.
+
+DATALOADER_LOOKUP_SECONDS = REGISTRY.histogram(
+    "dataloader_lookup_seconds",
+    "Time to fetch one table's rows for a patient.",
+    ("table",),
+)
+SUMMARIZER_SECONDS = REGISTRY.histogram(
+    "summarizer_seconds",
+    "Time spent in BaseSummarizer.summarize, per summarizer.",
+    ("summarizer",),
+)
+SUMMARIZER_ERRORS = REGISTRY.counter(
+    "summarizer_errors_total",
+    "Summarizers that raised and were replaced by an error fact.",
+    ("summarizer",),
+)
+LLM_PROMPT_SERIALIZE_SECONDS = REGISTRY.histogram(
+    "llm_prompt_serialize_seconds",
+    "Time to serialize clinical facts into the LLM prompt.",
+)
+LLM_PROMPT_TOKENS_SAVED = REGISTRY.counter(
+    "llm_prompt_tokens_saved_total",
+    "Estimated prompt tokens saved by compaction versus indented JSON.",
+)
+LLM_PROMPT_FACTS_DROPPED = REGISTRY.counter(
+    "llm_prompt_facts_dropped_total",
+    "Facts left out of prompts to stay within LLM_INPUT_TOKEN_BUDGET.",
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds",
+    "LLM round-trip latency, excluding cache hits.",
+    ("model", "outcome"),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total",
+    "Tokens reported by the LLM, by kind (prompt or completion).",
+    ("model", "kind"),
+)
+LLM_ERRORS = REGISTRY.counter(
+    "llm_errors_total",
+    "Failed LLM calls, by exception type.",
+    ("model", "error"),
+)
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "llm_cache_lookups_total",
+    "LLM response cache lookups, by result (hit or miss).",
+    ("result",),
+)
+LLM_COALESCED = REGISTRY.counter(
+    "llm_coalesced_requests_total",
+    "LLM calls answered by another caller's in-flight request, by scope (process or worker).",
+    ("scope",),
+)
+LLM_RETRIES = REGISTRY.counter(
+    "llm_retries_total",
+    "LLM attempts retried after a rate-limit or transient error, by exception type.",
+    ("model", "error"),
+)
+LLM_HEDGES = REGISTRY.counter(
+    "llm_hedged_requests_total",
+    "Duplicate LLM requests sent because the first exceeded the hedging latency.",
+    ("model",),
+)
+LLM_FALLBACKS = REGISTRY.counter(
+    "llm_fallbacks_total",
+    "LLM calls that moved on to a fallback model.",
+    ("model",),
+)
+LLM_CIRCUIT_OPENED = REGISTRY.counter(
+    "llm_circuit_opened_total",
+    "Times a model's circuit breaker opened after repeated failures.",
+    ("model",),
+)
+SUMMARY_OVERVIEW_FALLBACKS = REGISTRY.counter(
+    "summary_overview_fallbacks_total",
+    "Hybrid summaries that used the template overview, by reason (timeout or error).",
+    ("reason",),
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds",
+    "API request latency, by route and status code.",
+    ("method", "route", "status"),
+)
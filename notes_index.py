@@ -0,0 +1,197 @@
+# notes_index.py
+#
+# Full-text index over notes.csv note_text, built once at ingest:
+#
+#   python notes_index.py build data              # -> data/notes_index.sqlite
+#   python notes_index.py search 1001 5001
+#
+# One SQLite FTS5 table holds every note, inserted in (patient_id,
+# episode_id) order so each episode is a contiguous rowid range, recorded in
+# a small side table. A search for one episode restricts the topic query to
+# that range, which FTS5 answers by seeking into the term posting lists: the
+# cost depends on the episode's notes, not on the size of the corpus. The
+# porter tokenizer makes "falls" and "falling" match "fall".
+#
+# NotesSummarizer uses search() to add the episode's most relevant snippets
+# (NOTE_TOPICS) to its facts, cited by note type and date.
+
+import argparse
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+import pandas as pd
+
+from metrics import DATALOADER_LOOKUP_SECONDS
+from schema import as_datetime
+
+NOTES_SNIPPET_LIMIT = int(os.getenv("NOTES_SNIPPET_LIMIT", "3"))
+SNIPPET_TOKENS = 24
+
+# Topic -> FTS5 query over note_text. Terms are stemmed like the notes.
+NOTE_TOPICS = {
+    "wound": 'wound OR ulcer OR dressing OR incision OR "pressure injury"',
+    "hospice": 'hospice OR palliative OR "comfort care" OR "end of life"',
+    "falls": "fall OR fell",
+    "weight loss": '"weight loss" OR "lost weight" OR "losing weight" OR cachexia OR "poor appetite"',
+}
+
+
+class NoteSnippet(NamedTuple):
+    note_date: str | None
+    note_type: str | None
+    topics: tuple[str, ...]
+    snippet: str
+
+
+def build_notes_index(notes_df: pd.DataFrame, path: str, batch_size: int = 50_000) -> int:
+    """
+    Write an index of `notes_df` to `path`, replacing any existing one
+    atomically. Returns the number of notes indexed.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    df = (
+        notes_df.dropna(subset=["patient_id", "episode_id", "note_text"])
+        .sort_values(["patient_id", "episode_id"], kind="stable")
+    )
+    dates = as_datetime(df["note_date"], errors="coerce").dt.strftime("%Y-%m-%d")
+    rows = zip(
+        range(1, len(df) + 1),
+        df["note_text"].astype(str).tolist(),
+        df["note_type"].astype(object).where(df["note_type"].notna(), None).tolist(),
+        dates.astype(object).where(dates.notna(), None).tolist(),
+    )
+
+    db = sqlite3.connect(tmp, isolation_level=None)
+    try:
+        db.execute(
+            "CREATE VIRTUAL TABLE notes USING fts5("
+            "note_text, note_type UNINDEXED, note_date UNINDEXED, "
+            "tokenize = 'porter unicode61')"
+        )
+        db.execute(
+            "CREATE TABLE episodes (patient_id INTEGER, episode_id INTEGER, "
+            "first_rowid INTEGER, last_rowid INTEGER, PRIMARY KEY (patient_id, episode_id)) WITHOUT ROWID"
+        )
+        db.execute("BEGIN")
+        while batch := list(itertools.islice(rows, batch_size)):
+            db.executemany("INSERT INTO notes(rowid, note_text, note_type, note_date) VALUES (?, ?, ?, ?)", batch)
+
+        keys = df[["patient_id", "episode_id"]].astype("int64").reset_index(drop=True)
+        keys["rowid"] = keys.index + 1
+        ranges = keys.groupby(["patient_id", "episode_id"], sort=False)["rowid"].agg(["min", "max"])
+        db.executemany(
+            "INSERT INTO episodes VALUES (?, ?, ?, ?)",
+            ranges.reset_index().itertuples(index=False, name=None),
+        )
+        db.execute("COMMIT")
+        db.execute("INSERT INTO notes(notes) VALUES ('optimize')")
+    finally:
+        db.close()
+
+    os.replace(tmp, path)
+    return len(df)
+
+
+class NotesIndex:
+    """
+    Read-only searches over an index written by build_notes_index.
+
+    One connection is shared by the threads of a process; pickling keeps
+    only the path, so a process pool reopens the index in each worker.
+    """
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"no notes index at {path}")
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def search(self, patient_id, episode_id, limit: int = NOTES_SNIPPET_LIMIT) -> list[NoteSnippet]:
+        """
+        Up to `limit` snippets from the episode's notes that mention a
+        NOTE_TOPICS topic: notes mentioning the most topics first, then the
+        most recent. A note matching several topics is returned once,
+        listing all of them.
+        """
+        # Not BM25 (`ORDER BY rank`): its document frequencies need a scan
+        # of every matching posting list, which costs milliseconds at a few
+        # hundred thousand notes, while an episode's own matches are few.
+        hits = {}
+        with DATALOADER_LOOKUP_SECONDS.time(table="notes_index"), self._lock:
+            episode = self._db.execute(
+                "SELECT first_rowid, last_rowid FROM episodes WHERE patient_id = ? AND episode_id = ?",
+                (int(patient_id), int(episode_id)),
+            ).fetchone()
+            for topic, query in NOTE_TOPICS.items() if episode and limit > 0 else ():
+                rows = self._db.execute(
+                    "SELECT rowid, note_date, note_type, "
+                    f"snippet(notes, 0, '', '', '…', {SNIPPET_TOKENS}) "
+                    "FROM notes WHERE notes MATCH ? AND rowid BETWEEN ? AND ?",
+                    (f"note_text : ({query})", *episode),
+                ).fetchall()
+                for rowid, note_date, note_type, snippet in rows:
+                    if rowid in hits:
+                        hits[rowid].topics.append(topic)
+                    else:
+                        hits[rowid] = NoteSnippet(note_date, note_type, [topic], " ".join(snippet.split()))
+
+        best = sorted(
+            hits.items(),
+            key=lambda item: (len(item[1].topics), item[1].note_date or "", -item[0]),
+            reverse=True,
+        )[:limit]
+        return [hit._replace(topics=tuple(hit.topics)) for _, hit in best]
+
+    def stats(self) -> dict:
+        with self._lock:
+            (notes,) = self._db.execute("SELECT COUNT(*) FROM notes").fetchone()
+        return {"notes": notes, "bytes": os.path.getsize(self.path)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text index over clinical note text")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser("build", help="index notes.csv of a data directory")
+    build_parser.add_argument("data_dir", nargs="?", default="data")
+    build_parser.add_argument("--out", default=None, help="default: <data_dir>/notes_index.sqlite")
+
+    search_parser = commands.add_parser("search", help="show the snippets of one episode")
+    search_parser.add_argument("patient_id", type=int)
+    search_parser.add_argument("episode_id", type=int)
+    search_parser.add_argument("--index", default="data/notes_index.sqlite")
+    search_parser.add_argument("--limit", type=int, default=NOTES_SNIPPET_LIMIT)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        out = args.out or os.path.join(args.data_dir, "notes_index.sqlite")
+        start = time.perf_counter()
+        count = build_notes_index(pd.read_csv(os.path.join(args.data_dir, "notes.csv")), out)
+        print(f"indexed {count:,} notes into {out} in {time.perf_counter() - start:.2f}s")
+        return
+
+    index = NotesIndex(args.index)
+    start = time.perf_counter()
+    snippets = index.search(args.patient_id, args.episode_id, args.limit)
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    for s in snippets:
+        print(f"{s.note_date} {s.note_type} [{', '.join(s.topics)}]\n  {s.snippet}")
+    print(f"{len(snippets)} snippets in {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
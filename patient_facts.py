@@ -0,0 +1,128 @@
+# patient_facts.py
+#
+# Clinical fact generation for one patient, independent of any UI. api.py
+# keeps one PatientFacts over a warm loader for the whole process, so the
+# Streamlit app only sends a patient_id.
+
+import os
+import threading
+
+from clinical_data import read_clinical_tables
+from columnar import ParquetDataLoader
+from notes_index import NotesIndex
+from shared_dataset import SharedDataLoader, current_version
+from summarizers import DataLoader, SummaryGenerator
+
+DATA_DIR = os.getenv("CLINICAL_DATA_DIR", "data")
+# Written by `python columnar.py`; used instead of the CSVs when present.
+PARQUET_DIR = os.getenv("CLINICAL_PARQUET_DIR", f"{DATA_DIR}/parquet")
+# Written by `python shared_dataset.py publish`; memory-mapped by every
+# worker process and preferred over both of the above when published.
+SHARED_DIR = os.getenv("CLINICAL_SHARED_DIR", f"{DATA_DIR}/shared")
+# Written by `python notes_index.py build`; adds note snippets when present.
+NOTES_INDEX_PATH = os.getenv("NOTES_INDEX_PATH", f"{DATA_DIR}/notes_index.sqlite")
+
+
+class PatientNotFound(LookupError):
+    pass
+
+
+def load_repo(data_dir: str = DATA_DIR, parquet_dir: str = PARQUET_DIR, shared_dir: str = SHARED_DIR):
+    if current_version(shared_dir) is not None:
+        return SharedDataLoader(shared_dir)
+    if os.path.isdir(parquet_dir):
+        return ParquetDataLoader(parquet_dir)
+    return DataLoader(read_clinical_tables(data_dir, compact=True))
+
+
+def load_notes_index(path: str = NOTES_INDEX_PATH) -> NotesIndex | None:
+    return NotesIndex(path) if path and os.path.exists(path) else None
+
+
+class PatientFacts:
+    """
+    Patient lookups and fact generation over one shared loader.
+
+    Episode keys are read once; `warm()` builds the loader's lookup indexes
+    up front so the first request does not pay for them, and so request
+    threads only ever read the loader. With a notes index, facts include
+    relevant note snippets.
+    """
+
+    def __init__(self, repo, notes_index: NotesIndex | None = None):
+        self.repo = repo
+        self.notes_index = notes_index
+        episodes = repo.get_columns("diagnoses_df", ["patient_id", "episode_id"]).dropna()
+        self._latest = episodes.groupby("patient_id")["episode_id"].max().to_dict()
+        self._episodes = {
+            patient_id: set(group.tolist())
+            for patient_id, group in episodes.groupby("patient_id")["episode_id"]
+        }
+
+    def warm(self):
+        if isinstance(self.repo, SharedDataLoader):
+            self.repo.warm()
+            return
+        if not isinstance(self.repo, DataLoader):
+            return
+        for table in self.repo.dfs:
+            if table == "oasis_df":
+                self.repo.get_patient_only(table, None)
+            else:
+                self.repo.get(table, None, None, copy=False)
+
+    def patient_ids(self) -> list[int]:
+        return sorted(self._latest)
+
+    def latest_episode(self, patient_id: int) -> int:
+        if patient_id not in self._latest:
+            raise PatientNotFound(f"No episodes found for patient {patient_id}")
+        return self._latest[patient_id]
+
+    def generate(
+        self,
+        patient_id: int,
+        episode_id: int | None = None,
+        timings: dict | None = None,
+    ) -> tuple[int, list[dict]]:
+        """
+        (episode_id, facts) for the given episode, or for the patient's
+        latest episode when episode_id is None. `timings`, if given,
+        receives the seconds spent in each summarizer.
+        """
+        if episode_id is None:
+            episode_id = self.latest_episode(patient_id)
+        elif episode_id not in self._episodes.get(patient_id, ()):
+            raise PatientNotFound(f"No episode {episode_id} found for patient {patient_id}")
+
+        generator = SummaryGenerator.for_patient(self.repo, patient_id, episode_id, notes_index=self.notes_index)
+        facts = generator.generate()
+        if timings is not None:
+            timings.update(generator.timings)
+        return episode_id, facts
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def _stale(patients: PatientFacts) -> bool:
+    return isinstance(patients.repo, SharedDataLoader) and patients.repo.stale()
+
+
+def shared_patient_facts() -> PatientFacts:
+    """
+    The process-wide PatientFacts over load_repo(), loaded and warmed by the
+    first caller. Concurrent first callers wait for that one load. Over a
+    shared dataset, a newly published version is attached by the first
+    caller after it appears; callers in flight keep the one they hold.
+    """
+    global _shared
+    if _shared is not None and not _stale(_shared):
+        return _shared
+    with _shared_lock:
+        if _shared is None or _stale(_shared):
+            patients = PatientFacts(load_repo(), load_notes_index())
+            patients.warm()
+            _shared = patients
+    return _shared
@@ -0,0 +1,126 @@
+# prompt_compaction.py
+#
+# Turns a clinical fact list into the user prompt sent to the LLM.
+#
+# json.dumps(facts, indent=2) repeats "statement", "source" and "date" on
+# every fact, and OASIS emits a dozen facts with the same source and date.
+# The compact form groups statements by source and then by date, so each
+# source and date is written once:
+#
+#   {"diagnoses.csv":{"undated":["..."]},"oasis.csv":{"2025-08-15":["...","..."]}}
+#
+# When the prompt would exceed the input-token budget, the lowest-priority
+# facts are dropped first (see SOURCE_PRIORITY) and the prompt records how
+# many were omitted.
+
+import json
+import math
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+# Sources in the order they are kept under a tight budget; unknown sources
+# go first. Within a source, later facts are dropped before earlier ones,
+# so e.g. the OASIS overview outlives the individual OASIS fields.
+SOURCE_PRIORITY = ["diagnoses.csv", "medications.csv", "vitals.csv", "wounds.csv", "notes.csv", "oasis.csv"]
+
+UNDATED = "undated"
+OMITTED_KEY = "omitted_facts"
+
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count of `text`: exact for OpenAI-style BPE when tiktoken is
+    installed, otherwise ~4 characters per token, which is close for English
+    and JSON on most current tokenizers.
+    """
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def group_facts(facts: list[dict], omitted: int = 0) -> dict:
+    """
+    {source: {date | "undated": [statement, ...]}}, keeping first-seen order
+    of sources, dates and statements. Exact duplicate statements under the
+    same source and date are written once.
+    """
+    grouped = {}
+    for fact in facts:
+        source = fact.get("source") or "unknown"
+        date = fact.get("date") or UNDATED
+        statements = grouped.setdefault(source, {}).setdefault(str(date), [])
+        statement = str(fact.get("statement", "")).strip()
+        if statement not in statements:
+            statements.append(statement)
+    if omitted:
+        grouped[OMITTED_KEY] = omitted
+    return grouped
+
+
+def serialize(grouped: dict) -> str:
+    return json.dumps(grouped, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _drop_order(facts: list[dict]) -> list[int]:
+    # Fact positions, least important first.
+    def rank(position):
+        source = facts[position].get("source")
+        priority = SOURCE_PRIORITY.index(source) if source in SOURCE_PRIORITY else -1
+        return (-priority, -position)
+
+    return sorted(range(len(facts)), key=rank)
+
+
+def compact_prompt(facts: list[dict], token_budget: int | None = None) -> tuple[str, dict]:
+    """
+    Compact prompt text for `facts`, and a report of what compaction did.
+
+    With a positive `token_budget`, the fewest lowest-priority facts are
+    dropped that bring the prompt within it. The report holds the estimated
+    tokens of the prompt (`prompt_tokens`) and of the old indented-JSON
+    prompt (`original_tokens`), their difference (`tokens_saved`), and the
+    number of facts dropped (`facts_dropped`).
+    """
+    original_tokens = estimate_tokens(json.dumps(facts, indent=2, default=str))
+
+    text = serialize(group_facts(facts))
+    tokens = estimate_tokens(text)
+    dropped = 0
+
+    if token_budget and token_budget > 0 and tokens > token_budget:
+        # Fewer kept facts never make the prompt longer, so binary-search the
+        # smallest number of drops that fits.
+        order = _drop_order(facts)
+
+        def attempt(n_dropped):
+            removed = set(order[:n_dropped])
+            kept = [fact for i, fact in enumerate(facts) if i not in removed]
+            candidate = serialize(group_facts(kept, omitted=n_dropped))
+            return candidate, estimate_tokens(candidate)
+
+        low, high = 1, len(facts)
+        text, tokens = attempt(high)
+        dropped = high
+        while low < high:
+            mid = (low + high) // 2
+            candidate, candidate_tokens = attempt(mid)
+            if candidate_tokens <= token_budget:
+                text, tokens, dropped = candidate, candidate_tokens, mid
+                high = mid
+            else:
+                low = mid + 1
+
+    return text, {
+        "prompt_tokens": tokens,
+        "original_tokens": original_tokens,
+        "tokens_saved": original_tokens - tokens,
+        "facts_dropped": dropped,
+    }
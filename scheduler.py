@@ -0,0 +1,160 @@
+# scheduler.py
+#
+# Nightly warm-up of the summary store: walks every patient's latest episode,
+# regenerates the facts, and asks the LLM for a new summary only where the
+# facts have changed since the stored one. The API then answers
+# /patients/{id}/summary from the store without waiting on the LLM.
+#
+#   python scheduler.py --concurrency 8
+#   python scheduler.py --every 86400          # keep running, once a day
+#
+# LLM calls run at most --concurrency at a time. On top of llm_client's own
+# retries, a patient whose call still fails on a rate limit, a transient
+# error, the deadline or open circuit breakers is retried with longer jittered exponential
+# backoff, honouring Retry-After when the server sends one; a patient that
+# still fails keeps its previous stored summary. So does a patient answered by
+# a fallback model (LLM_MODELS), to be tried again on the next run.
+
+import argparse
+import asyncio
+import os
+import time
+
+import llm_client
+from llm_resilience import CircuitOpenError, backoff_delay, retry_after, retryable
+from patient_facts import PatientFacts, load_notes_index, load_repo
+from summary_store import SUMMARY_STORE_PATH, SummaryStore, fact_hash
+
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "4"))
+SCHEDULER_MAX_RETRIES = int(os.getenv("SCHEDULER_MAX_RETRIES", "5"))
+SCHEDULER_BACKOFF_SECONDS = 1.0
+SCHEDULER_MAX_BACKOFF_SECONDS = 60.0
+
+
+async def summarize_with_backoff(
+    facts: list[dict],
+    max_retries: int = SCHEDULER_MAX_RETRIES,
+    models: set | None = None,
+) -> str:
+    attempt = 0
+    while True:
+        try:
+            return await llm_client.async_call_llm(facts, models=models)
+        except Exception as e:
+            if attempt >= max_retries or not (retryable(e) or isinstance(e, (CircuitOpenError, TimeoutError))):
+                raise
+            delay = backoff_delay(attempt, SCHEDULER_BACKOFF_SECONDS, SCHEDULER_MAX_BACKOFF_SECONDS, retry_after(e))
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+async def warm_summaries(
+    patients,
+    store: SummaryStore,
+    concurrency: int = SCHEDULER_CONCURRENCY,
+    max_retries: int = SCHEDULER_MAX_RETRIES,
+    force: bool = False,
+    patient_ids: list[int] | None = None,
+) -> dict:
+    """
+    Bring the stored summary of each patient's latest episode up to date.
+
+    Args:
+        patients: PatientFacts over the clinical data
+        store: SummaryStore receiving the summaries
+        concurrency: LLM calls in flight at once
+        max_retries: Retries per patient on rate-limit and transient errors
+        force: Regenerate even where the fact hash is unchanged
+        patient_ids: Patients to visit (default: all of them)
+
+    Returns:
+        Counts of generated, unchanged, empty, fallback (answered by a
+        fallback model, not stored) and failed patients, with the failures'
+        errors and the elapsed seconds
+    """
+    slots = asyncio.Semaphore(concurrency)
+    counts = {"generated": 0, "unchanged": 0, "empty": 0, "fallback": 0, "failed": 0}
+    errors = {}
+    started = time.perf_counter()
+
+    async def refresh(patient_id: int):
+        # Fact generation is CPU-bound; one patient at a time per slot keeps
+        # it from running far ahead of the LLM calls.
+        async with slots:
+            try:
+                episode_id, facts = await asyncio.to_thread(patients.generate, patient_id)
+                if not facts:
+                    counts["empty"] += 1
+                    return
+
+                facts_hash = fact_hash(facts)
+                # SQLite, so off the event loop like fact generation.
+                if not force and await asyncio.to_thread(store.current, patient_id, episode_id, facts_hash) is not None:
+                    counts["unchanged"] += 1
+                    return
+
+                models = set()
+                summary = await summarize_with_backoff(facts, max_retries, models)
+                if models != {llm_client.LLM_MODEL}:
+                    counts["fallback"] += 1
+                    return
+                await asyncio.to_thread(store.put, patient_id, episode_id, facts_hash, summary, llm_client.LLM_MODEL)
+                counts["generated"] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                errors[patient_id] = f"{type(e).__name__}: {e}"
+
+    if patient_ids is None:
+        patient_ids = patients.patient_ids()
+    await asyncio.gather(*(refresh(patient_id) for patient_id in patient_ids))
+
+    return {**counts, "errors": errors, "seconds": time.perf_counter() - started}
+
+
+async def run(args):
+    store = SummaryStore(args.store)
+    try:
+        while True:
+            # Reload each round so the run sees the latest data.
+            patients = PatientFacts(await asyncio.to_thread(load_repo), load_notes_index())
+            await asyncio.to_thread(patients.warm)
+            result = await warm_summaries(
+                patients,
+                store,
+                concurrency=args.concurrency,
+                max_retries=args.max_retries,
+                force=args.force,
+                patient_ids=args.patients,
+            )
+
+            print(
+                f"{result['generated']} generated, {result['unchanged']} unchanged, "
+                f"{result['empty']} without facts, {result['fallback']} from a fallback model, "
+                f"{result['failed']} failed "
+                f"in {result['seconds']:.1f}s"
+            )
+            for patient_id, error in sorted(result["errors"].items()):
+                print(f"  patient {patient_id}: {error}")
+
+            if args.every is None:
+                break
+            await asyncio.sleep(args.every)
+    finally:
+        await llm_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute patient summaries into the summary store")
+    parser.add_argument("--store", default=SUMMARY_STORE_PATH, help="SQLite summary store")
+    parser.add_argument("--concurrency", type=int, default=SCHEDULER_CONCURRENCY, help="LLM calls in flight")
+    parser.add_argument("--max-retries", type=int, default=SCHEDULER_MAX_RETRIES)
+    parser.add_argument("--patients", type=int, nargs="+", help="only these patient IDs")
+    parser.add_argument("--force", action="store_true", help="regenerate unchanged summaries too")
+    parser.add_argument("--every", type=float, help="repeat every N seconds instead of running once")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# schema.py
+#
+# Compact dtypes for the clinical tables, applied once at load time:
+#
+#   ids          patient_id / episode_id           -> int32
+#   readings     vital readings and their limits   -> float32
+#   dates        visit, onset, note and assessment -> datetime64
+#   categories   repeated strings (vital_type, note_type, classification,
+#                frequency, location, OASIS answers, ...) -> category
+#
+# Free text (note_text) stays as plain strings. The summarizers accept both
+# raw and compact frames and skip date parsing when a column is already
+# datetime64.
+#
+#   python schema.py data        # memory before/after per table
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+IDS = ["patient_id", "episode_id"]
+
+TABLE_SCHEMAS = {
+    "diagnoses_df": {
+        "categories": ["diagnosis_description", "diagnosis_code"],
+    },
+    "meds_df": {
+        "categories": ["medication_name", "frequency", "classification", "reason"],
+    },
+    "vitals_df": {
+        "categories": ["vital_type"],
+        "readings": ["reading", "min_value", "max_value"],
+        "dates": ["visit_date"],
+    },
+    "notes_df": {
+        "categories": ["note_type"],
+        "dates": ["note_date"],
+    },
+    "wounds_df": {
+        "categories": ["description", "location"],
+        "dates": ["onset_date", "visit_date"],
+    },
+    "oasis_df": {
+        # Every column after the first three is an OASIS answer.
+        "categories": ["assessment_type"],
+        "answers_from": 3,
+        "dates": ["assessment_date"],
+    },
+}
+
+
+def as_datetime(values: pd.Series, **kwargs) -> pd.Series:
+    """
+    `values` as datetime64, parsing only if it is not datetime64 already.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, **kwargs)
+
+
+def compact_table(table: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy of `df` with the compact dtypes of TABLE_SCHEMAS[table]. Columns a
+    table does not have are skipped; ids that do not fit int32, or contain
+    nulls, are left alone.
+    """
+    schema = TABLE_SCHEMAS.get(table, {})
+    columns = {}
+
+    for column in IDS:
+        if column in df.columns and pd.api.types.is_integer_dtype(df[column]):
+            info = np.iinfo(np.int32)
+            values = df[column]
+            if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+                columns[column] = values.astype(np.int32)
+
+    for column in schema.get("readings", []):
+        if column in df.columns:
+            columns[column] = df[column].astype(np.float32)
+
+    for column in schema.get("dates", []):
+        if column in df.columns:
+            # Unparseable dates become NaT, as the summarizers' errors="coerce" did.
+            columns[column] = as_datetime(df[column], errors="coerce")
+
+    categories = list(schema.get("categories", []))
+    if "answers_from" in schema:
+        categories += list(df.columns[schema["answers_from"]:])
+    for column in categories:
+        if column in df.columns and column not in columns:
+            columns[column] = df[column].astype("category")
+
+    return df.assign(**columns)
+
+
+def compact_tables(dataframes: dict) -> dict:
+    return {table: compact_table(table, df) for table, df in dataframes.items()}
+
+
+def memory_report(before: dict, after: dict) -> pd.DataFrame:
+    """
+    Deep memory use (bytes) per table before and after compaction, with a
+    total row.
+    """
+    rows = []
+    for table in before:
+        rows.append({
+            "table": table,
+            "rows": len(before[table]),
+            "before_bytes": int(before[table].memory_usage(deep=True).sum()),
+            "after_bytes": int(after[table].memory_usage(deep=True).sum()),
+        })
+
+    report = pd.DataFrame(rows)
+    total = {
+        "table": "total",
+        "rows": report["rows"].sum(),
+        "before_bytes": report["before_bytes"].sum(),
+        "after_bytes": report["after_bytes"].sum(),
+    }
+    report = pd.concat([report, pd.DataFrame([total])], ignore_index=True)
+    report["ratio"] = report["after_bytes"] / report["before_bytes"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory footprint of the clinical tables before and after compaction")
+    parser.add_argument("data_dir", nargs="?", default="data")
+    args = parser.parse_args()
+
+    from clinical_data import read_clinical_tables
+
+    before = read_clinical_tables(args.data_dir)
+    report = memory_report(before, compact_tables(before))
+
+    print(f"{'table':<14} {'rows':>12} {'before':>12} {'after':>12} {'ratio':>7}")
+    for row in report.itertuples():
+        print(
+            f"{row.table:<14} {row.rows:>12,} {row.before_bytes / 1e6:>10.2f}MB "
+            f"{row.after_bytes / 1e6:>10.2f}MB {row.ratio:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# sectioned.py
+#
+# Map-reduce summary generation. Instead of one completion writing all seven
+# sections (up to LLM_MAX_TOKENS of output, decoded one token at a time),
+# the facts are partitioned by source and every section is written by its
+# own, smaller completion, all at once:
+#
+#   map      one call per section over that section's facts
+#            (LLM_SECTION_MAX_TOKENS each), plus one call writing the
+#            narrative overview from all facts under a tighter token budget
+#   reduce   the sections are put together in the usual order
+#
+# Wall-clock time is that of the slowest call rather than of the whole
+# document. Each call goes through llm_client.complete, so it is cached per
+# section: a patient whose vitals changed only regenerates the vitals
+# section and the overview. A section without facts gets a fixed line and
+# no LLM call.
+
+import asyncio
+import os
+from collections import Counter
+
+import llm_client
+from llm_client import INPUT_FORMAT, PromptSpec
+
+SUMMARY_STRATEGIES = ("single", "sectioned")
+# Strategy used by the API's non-streaming summary endpoints unless a
+# request names one.
+LLM_SUMMARY_STRATEGY = os.getenv("LLM_SUMMARY_STRATEGY", "single")
+
+LLM_SECTION_MAX_TOKENS = int(os.getenv("LLM_SECTION_MAX_TOKENS", "600"))
+OVERVIEW_MAX_TOKENS = 500
+OVERVIEW_TOKEN_BUDGET = 1500
+
+OVERVIEW_TITLE = "## 📋 Clinical Summary"
+
+# (title, sources, what each bullet covers), in document order.
+SECTIONS = [
+    ("## 🏥 Diagnoses", ("diagnoses.csv",), "Each diagnosis with relevant details and citation from source"),
+    ("## 💊 Medications", ("medications.csv",), "Each medication with dosage, frequency, and citation"),
+    ("## 📈 Vital Signs", ("vitals.csv",), "Recent vital signs with values, dates, and citations"),
+    ("## 🩹 Wounds and Skin Assessment", ("wounds.csv",), "Wound descriptions, locations, measurements with citations"),
+    ("## 🚶 Functional Status", ("oasis.csv",), "Functional assessments, mobility, ADLs with citations"),
+    ("## 📝 Recent Clinical Notes", ("notes.csv",), "Key points from recent documentation with dates and citations"),
+]
+
+NO_FACTS = "- No documentation available."
+
+SECTION_PROMPT = """
+You are a clinical documentation specialist.
+
+Write one section of a clinical summary using clear markdown formatting.
+
+{input_format}
+Output Format:
+Start with this exact header, followed by bullet points only:
+
+{title}
+- [{focus}]
+
+Instructions:
+- Include citations referencing the source facts (e.g., "per admission assessment 2024-01-15")
+- Include specific dates, values, and measurements when available
+- Keep language professional but readable
+- Organize information chronologically when relevant
+- Do not write any other section
+"""
+
+OVERVIEW_PROMPT = f"""
+You are a clinical documentation specialist.
+
+Write the opening overview of a clinical summary using clear markdown formatting.
+
+{INPUT_FORMAT}
+Output Format:
+Start with this exact header:
+
+{OVERVIEW_TITLE}
+[Write a 2-3 paragraph narrative overview synthesizing the key clinical information]
+
+Instructions:
+- Keep language professional but readable
+- Mention the most important diagnoses, treatments and recent changes
+- Do not write any other section or bullet lists
+"""
+
+
+def section_prompts() -> list[PromptSpec]:
+    return [
+        PromptSpec(
+            SECTION_PROMPT.format(input_format=INPUT_FORMAT, title=title, focus=focus),
+            LLM_SECTION_MAX_TOKENS,
+            llm_client.LLM_INPUT_TOKEN_BUDGET,
+        )
+        for title, _, focus in SECTIONS
+    ]
+
+
+def overview_prompt() -> PromptSpec:
+    return PromptSpec(OVERVIEW_PROMPT, OVERVIEW_MAX_TOKENS, OVERVIEW_TOKEN_BUDGET)
+
+
+def partition_facts(facts: list[dict]) -> list[list[dict]]:
+    """
+    Facts per entry of SECTIONS, by source. Facts from other sources only
+    inform the overview.
+    """
+    section_of = {source: i for i, (_, sources, _) in enumerate(SECTIONS) for source in sources}
+    parts = [[] for _ in SECTIONS]
+    for fact in facts:
+        position = section_of.get(fact.get("source"))
+        if position is not None:
+            parts[position].append(fact)
+    return parts
+
+
+def _with_title(text: str, title: str) -> str:
+    text = text.strip()
+    return text if text.startswith(title) else f"{title}\n{text}"
+
+
+async def sectioned_call_llm(summary, report: dict | None = None, models: set | None = None) -> str:
+    """
+    Map-reduce variant of llm_client.async_call_llm: the same markdown
+    summary, written section by section in parallel.
+
+    Args:
+        summary: List of clinical fact dictionaries
+        report: Optional dict that receives the prompt compaction reports
+            of the calls made, summed, plus the number of LLM calls made
+            (`llm_calls`); cached sections contribute nothing
+        models: Optional set that receives the models that wrote the
+            sections, as in async_call_llm
+
+    Returns:
+        str: Markdown-formatted clinical summary
+    """
+    parts = partition_facts(summary)
+    reports = []
+
+    async def write(facts: list[dict], prompt: PromptSpec) -> str:
+        call_report = {}
+        text = await llm_client.complete(facts, prompt, call_report, models)
+        reports.append(call_report)
+        return text
+
+    calls = [write(summary, overview_prompt())]
+    for facts, prompt in zip(parts, section_prompts()):
+        if facts:
+            calls.append(write(facts, prompt))
+    texts = iter(await asyncio.gather(*calls))
+
+    sections = [_with_title(next(texts), OVERVIEW_TITLE)]
+    for facts, (title, _, _) in zip(parts, SECTIONS):
+        sections.append(_with_title(next(texts), title) if facts else f"{title}\n{NO_FACTS}")
+
+    if report is not None:
+        totals = Counter()
+        for call_report in reports:
+            totals.update(call_report)
+        report.update(totals)
+        report["llm_calls"] = sum(1 for call_report in reports if call_report)
+
+    return "\n\n".join(sections)
+
+
+async def summarize(
+    summary,
+    report: dict | None = None,
+    strategy: str | None = None,
+    models: set | None = None,
+) -> str:
+    """
+    async_call_llm or sectioned_call_llm, by `strategy` (default
+    LLM_SUMMARY_STRATEGY).
+    """
+    strategy = strategy or LLM_SUMMARY_STRATEGY
+    if strategy not in SUMMARY_STRATEGIES:
+        raise ValueError(f"strategy must be one of {SUMMARY_STRATEGIES}, got {strategy!r}")
+    if strategy == "sectioned":
+        return await sectioned_call_llm(summary, report, models)
+    return await llm_client.async_call_llm(summary, report, models)
@@ -0,0 +1,215 @@
+# shared_dataset.py
+#
+# One copy of the clinical tables for every worker process on a host. The
+# tables are published once as uncompressed Arrow IPC (Feather v2) files;
+# each worker memory-maps them, so the data lives in the OS page cache once
+# instead of once per uvicorn worker or scheduler process.
+#
+#   python shared_dataset.py publish data            # -> data/shared
+#   python shared_dataset.py info
+#
+# Layout:
+#
+#   <shared_dir>/CURRENT                 name of the live version
+#   <shared_dir>/<version>/<table>.arrow one file per table
+#
+# Publishing writes a new version directory and then swaps CURRENT
+# atomically, so readers see either the old or the new data, never a mix.
+# Workers poll CURRENT (at most every SHARED_DATA_CHECK_SECONDS) and
+# re-attach when it changes, without a restart. Older versions are pruned
+# after a publish; on Linux a worker still mapping one keeps reading it
+# until it re-attaches.
+#
+# Each table is sorted by (patient_id, episode_id) and written as a single
+# record batch, so the id columns are contiguous arrays inside the mapping:
+# lookups binary-search them in place and only the matching rows, and only
+# the columns the summarizers read (columnar.SUMMARY_COLUMNS), are converted
+# to pandas.
+
+import argparse
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from clinical_data import TABLE_FILES, read_clinical_tables
+from columnar import SUMMARY_COLUMNS
+from metrics import DATALOADER_LOOKUP_SECONDS
+
+SHARED_DATA_CHECK_SECONDS = float(os.getenv("SHARED_DATA_CHECK_SECONDS", "5"))
+CURRENT = "CURRENT"
+KEEP_VERSIONS = 2
+
+
+def table_path(shared_dir: str, version: str, table: str) -> str:
+    return os.path.join(shared_dir, version, f"{table}.arrow")
+
+
+def current_version(shared_dir: str) -> str | None:
+    try:
+        with open(os.path.join(shared_dir, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish(data_dir: str, shared_dir: str, keep: int = KEEP_VERSIONS) -> str:
+    """
+    Load the CSVs in `data_dir` with compact dtypes, write them as a new
+    version under `shared_dir` and make it current. Returns the version.
+    """
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.join(shared_dir, version))
+
+    for table, df in read_clinical_tables(data_dir, compact=True).items():
+        keys = [k for k in ("patient_id", "episode_id") if k in df.columns]
+        df = df.sort_values(keys, kind="stable")
+        feather.write_feather(
+            df.reset_index(drop=True),
+            table_path(shared_dir, version, table),
+            compression="uncompressed",
+            chunksize=max(len(df), 1),
+        )
+
+    pointer = os.path.join(shared_dir, f"{CURRENT}.{version}.tmp")
+    with open(pointer, "w") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(shared_dir, CURRENT))
+
+    _prune(shared_dir, keep)
+    return version
+
+
+def _prune(shared_dir: str, keep: int):
+    live = current_version(shared_dir)
+    versions = sorted(
+        (entry for entry in os.scandir(shared_dir) if entry.is_dir()),
+        key=lambda entry: entry.stat().st_mtime_ns,
+    )
+    for entry in versions[:-keep] if keep > 0 else versions:
+        if entry.name != live:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class SharedDataLoader:
+    """
+    DataLoader over the memory-mapped tables of one published version.
+
+    Nothing is parsed or copied when attaching; lookups binary-search the
+    mapped id columns and convert only the matching rows, so results are
+    always fresh frames and `copy` is accepted for interface compatibility.
+    Rows come back in (patient_id, episode_id) order, as from the Parquet
+    store.
+    """
+
+    def __init__(self, shared_dir: str, version: str | None = None):
+        self.shared_dir = shared_dir
+        self.version = version or current_version(shared_dir)
+        if self.version is None:
+            raise FileNotFoundError(f"no published dataset in {shared_dir}")
+
+        self.tables = {
+            table: feather.read_table(table_path(shared_dir, self.version, table), memory_map=True)
+            for table in TABLE_FILES
+        }
+        # Zero-copy projection: the pages of note_text are mapped but never
+        # touched, so lookups do not convert (or fault in) the note text.
+        for table, columns in SUMMARY_COLUMNS.items():
+            self.tables[table] = self.tables[table].select(columns)
+        self._keys = {}
+        self._published = self.version
+        self._checked_at = time.monotonic()
+
+    def stale(self) -> bool:
+        """
+        True once a newer version has been published. CURRENT is read at
+        most every SHARED_DATA_CHECK_SECONDS; once a new version is seen,
+        this stays True.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= SHARED_DATA_CHECK_SECONDS:
+            self._checked_at = now
+            self._published = current_version(self.shared_dir) or self._published
+        return self._published != self.version
+
+    def _key_column(self, table: str, column: str) -> np.ndarray:
+        cache_key = (table, column)
+        if cache_key not in self._keys:
+            values = self.tables[table].column(column)
+            # A single-chunk, null-free integer column is a view of the
+            # mapping; anything else is materialized once.
+            if values.num_chunks == 1 and values.null_count == 0:
+                self._keys[cache_key] = values.chunk(0).to_numpy()
+            else:
+                self._keys[cache_key] = values.to_numpy()
+        return self._keys[cache_key]
+
+    def _rows(self, table: str, start: int, stop: int) -> pd.DataFrame:
+        # The pandas metadata stored with the file only describes the
+        # RangeIndex written by publish(); skipping it saves a third of the
+        # conversion time of a lookup.
+        return self.tables[table].slice(start, stop - start).to_pandas(ignore_metadata=True)
+
+    def _patient_range(self, table: str, patient_id) -> tuple[int, int]:
+        patients = self._key_column(table, "patient_id")
+        return (
+            int(np.searchsorted(patients, patient_id, side="left")),
+            int(np.searchsorted(patients, patient_id, side="right")),
+        )
+
+    def warm(self):
+        for table in self.tables:
+            for column in ("patient_id", "episode_id"):
+                if column in self.tables[table].column_names:
+                    self._key_column(table, column)
+
+    def get(self, table: str, patient_id: int, episode_id: int, copy: bool = True) -> pd.DataFrame:
+        with DATALOADER_LOOKUP_SECONDS.time(table=table):
+            start, stop = self._patient_range(table, patient_id)
+            episodes = self._key_column(table, "episode_id")[start:stop]
+            first = start + int(np.searchsorted(episodes, episode_id, side="left"))
+            last = start + int(np.searchsorted(episodes, episode_id, side="right"))
+            return self._rows(table, first, last)
+
+    def get_patient_only(self, key, patient_id, copy: bool = False) -> pd.DataFrame:
+        with DATALOADER_LOOKUP_SECONDS.time(table=key):
+            return self._rows(key, *self._patient_range(key, patient_id))
+
+    def get_columns(self, table: str, columns: list[str]) -> pd.DataFrame:
+        return self.tables[table].select(columns).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish the clinical tables as a shared memory-mapped dataset")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish_parser = commands.add_parser("publish", help="write a new version and make it current")
+    publish_parser.add_argument("data_dir", nargs="?", default="data")
+    publish_parser.add_argument("--shared-dir", default=None, help="default: <data_dir>/shared")
+    publish_parser.add_argument("--keep", type=int, default=KEEP_VERSIONS, help="versions kept on disk")
+
+    info_parser = commands.add_parser("info", help="show the current version and table sizes")
+    info_parser.add_argument("shared_dir", nargs="?", default="data/shared")
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        shared_dir = args.shared_dir or os.path.join(args.data_dir, "shared")
+        start = time.perf_counter()
+        version = publish(args.data_dir, shared_dir, args.keep)
+        print(f"published {version} to {shared_dir} in {time.perf_counter() - start:.2f}s")
+        return
+
+    loader = SharedDataLoader(args.shared_dir)
+    print(f"version {loader.version}")
+    for table, data in loader.tables.items():
+        size = os.path.getsize(table_path(args.shared_dir, loader.version, table))
+        print(f"{TABLE_FILES[table]:<18} {data.num_rows:>12,} rows {size / 1e6:>10.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
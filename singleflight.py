@@ -0,0 +1,104 @@
+# singleflight.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one.
+
+    The first caller for a key (the leader) starts `fn()` as a task; callers
+    arriving while it runs await the same task and get its result or its
+    exception. The key is forgotten once the task finishes, so later calls
+    start a fresh one. A caller that is cancelled stops waiting without
+    cancelling the shared task, so the others still get their answer.
+
+    One instance serves one event loop.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key: str, fn) -> tuple:
+        """
+        Returns (result, shared), where shared is True for callers that
+        joined another caller's flight.
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        return await asyncio.shield(task), shared
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every caller was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+
+class SQLiteLease:
+    """
+    Cross-process mutual exclusion per key, through an SQLite table.
+
+    A worker that acquires a key's lease owns it for `ttl_seconds` or until
+    it releases it; others see it as held. Expired leases are taken over,
+    so a crashed worker blocks a key for at most one TTL. Every process
+    pointing at the same file shares the leases.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 120.0):
+        self.ttl_seconds = ttl_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+
+    def acquire(self, key: str) -> bool:
+        now = time.time()
+        with self._lock:
+            # Take the key if it is free or its lease has lapsed.
+            self._db.execute(
+                """
+                INSERT INTO leases VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.expires_at < ?
+                """,
+                (key, self.owner, now + self.ttl_seconds, now),
+            )
+            row = self._db.execute("SELECT owner FROM leases WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] == self.owner
+
+    def held(self, key: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM leases WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def release(self, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
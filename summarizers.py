@@ -1,20 +1,290 @@
+import os
+import threading
+import time
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from metrics import DATALOADER_LOOKUP_SECONDS, SUMMARIZER_ERRORS, SUMMARIZER_SECONDS
+from schema import as_datetime
+
+EXECUTION_MODES = ("serial", "thread", "process")
+SUMMARY_EXECUTION_MODE = os.getenv("SUMMARY_EXECUTION_MODE", "serial")
+SUMMARY_MAX_WORKERS = int(os.getenv("SUMMARY_MAX_WORKERS", "6"))
+
 class DataLoader:
-    
+    """
+    Per-patient lookups over the clinical tables.
+
+    The first lookup against a table sorts it once by its key columns and
+    records the [start, stop) offsets of every key, so later lookups are a
+    dict hit plus a positional slice instead of a boolean scan of the whole
+    table. The tables are treated as read-only once handed to the loader.
+    """
+
     def __init__(self,dataframes: dict):
         self.dfs = dataframes
-    
-    def get(self, table: str, patient_id : int, episode_id : int):
-        df = self.dfs[table]
-        
-        return df[(df["patient_id"] == patient_id) & (df["episode_id"] == episode_id)].copy()
-    
-    
-    def get_patient_only(self, key, patient_id):
-        df = self.dfs[key]
-        return df[df["patient_id"] == patient_id]
+        self._indexes = {}
+
+    def _index(self, table: str, keys: tuple):
+        cache_key = (table, keys)
+        if cache_key not in self._indexes:
+            self._indexes[cache_key] = build_key_index(self.dfs[table], list(keys))
+        return self._indexes[cache_key]
+
+    def get(self, table: str, patient_id : int, episode_id : int, copy: bool = True):
+        """
+        Rows of `table` for one patient episode, in their original order.
+
+        With copy=False the result is a slice of the loader's sorted table;
+        only pass it to code that does not modify it in place.
+        """
+        with DATALOADER_LOOKUP_SECONDS.time(table=table):
+            sorted_df, offsets = self._index(table, ("patient_id", "episode_id"))
+            start, stop = offsets.get((patient_id, episode_id), (0, 0))
+            rows = sorted_df.iloc[start:stop]
+
+            return rows.copy() if copy else rows
+
+
+    def get_patient_only(self, key, patient_id, copy: bool = False):
+        with DATALOADER_LOOKUP_SECONDS.time(table=key):
+            sorted_df, offsets = self._index(key, ("patient_id",))
+            start, stop = offsets.get((patient_id,), (0, 0))
+            rows = sorted_df.iloc[start:stop]
+            return rows.copy() if copy else rows
+
+    def get_columns(self, table: str, columns: list[str]) -> pd.DataFrame:
+        return self.dfs[table][columns]
+
+
+def build_key_index(df: pd.DataFrame, keys: list[str]):
+    """
+    Stable-sort `df` by `keys` and map every key tuple to its row range.
+
+    Returns (sorted_df, {key_tuple: (start, stop)}). Rows that share a key
+    keep their original relative order, so a slice matches what a boolean
+    mask over the unsorted table would have returned.
+    """
+    sorted_df = df.sort_values(keys, kind="stable")
+    n = len(sorted_df)
+    if n == 0:
+        return sorted_df, {}
+
+    columns = [sorted_df[k].to_numpy() for k in keys]
+
+    boundary = np.zeros(n, dtype=bool)
+    boundary[0] = True
+    for values in columns:
+        boundary[1:] |= values[1:] != values[:-1]
+
+    starts = np.flatnonzero(boundary)
+    stops = np.append(starts[1:], n)
+    key_tuples = zip(*(values[starts].tolist() for values in columns))
+
+    return sorted_df, dict(zip(key_tuples, zip(starts.tolist(), stops.tolist())))
+
+# Statement builders shared by the per-patient summarizers and the cohort
+# engine in cohort.py, so both produce word-for-word identical facts.
+
+IMPORTANT_NOTE_TYPES = {
+    "NARRATIVE",
+    "RECERT/DISCHARGE DECISION",
+    "ON CALL",
+    "HOSPICE QUALIFYING CRITERIA"
+}
+
+OASIS_FUNCTIONAL_SUMMARY = (
+    "OASIS assessment indicates the patient is highly dependent and "
+    "requires assistance with most activities of daily living, "
+    "including bathing, transfers, toileting, and ambulation."
+)
+
+
+def classify_vital_alerts(df: pd.DataFrame) -> np.ndarray:
+    reading = df['reading'].to_numpy()
+    min_value = df['min_value'].to_numpy()
+    max_value = df['max_value'].to_numpy()
+
+    low = pd.notna(min_value) & (reading < min_value)
+    high = pd.notna(max_value) & (reading > max_value)
+    return np.where(low, 'low', np.where(high, 'high', 'Stable'))
+
+
+def vital_readings(reading: np.ndarray) -> np.ndarray:
+    if reading.dtype == np.float32:
+        # Shortest float32 repr, so a compact 98.6 reads 98.6, not 98.5999985.
+        return np.array([float(str(value)) for value in reading])
+    return reading
+
+
+def aggregate_vital_alerts(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """
+    One row per `keys` group of the alerting rows of a classified vitals
+    frame: high_count, low_count, and the reading, visit_date and
+    last_date ("%Y-%m-%d") of the latest alert.
+
+    Groups come out in order of first appearance. The latest alert is the
+    last row with the greatest visit_date (NaT counting as greatest), i.e.
+    what the last row of a stable date sort would be.
+    """
+    alert = df['alert'].to_numpy()
+    is_alert = alert != 'Stable'
+
+    # Group codes numbered in order of first appearance; -1 marks a NaN key.
+    if len(keys) == 1:
+        group, _ = pd.factorize(df[keys[0]].to_numpy()[is_alert])
+    else:
+        group = df[is_alert].groupby(keys, sort=False, observed=True).ngroup().to_numpy()
+
+    rows = np.flatnonzero(is_alert)[group >= 0]
+    group = group[group >= 0]
+    n_groups = int(group.max()) + 1 if len(group) else 0
+
+    is_high = alert[rows] == 'high'
+    high_count = np.bincount(group, weights=is_high, minlength=n_groups).astype(np.int64)
+    low_count = np.bincount(group, minlength=n_groups) - high_count
+
+    # Stable sort by (group, visit_date), NaT last: the final row of each
+    # group's run is its latest alert, ties going to the later row.
+    visit_date = df['visit_date'].to_numpy()[rows]
+    order = np.lexsort((visit_date, group))
+    last = order[np.append(np.flatnonzero(np.diff(group[order])), len(order) - 1)] if len(order) else order
+    _, first = np.unique(group, return_index=True)
+
+    stats = {key: df[key].to_numpy()[rows][first] for key in keys}
+    stats['high_count'] = high_count
+    stats['low_count'] = low_count
+    stats['reading'] = vital_readings(df['reading'].to_numpy()[rows][last])
+    stats['visit_date'] = visit_date[last]
+    stats['last_date'] = np.datetime_as_string(visit_date[last], unit='D')
+    return pd.DataFrame(stats)
+
+
+def vital_statement(vital, high_count, low_count, last_value, last_date) -> str | None:
+
+    # Case 1: Persistently HIGH
+    if high_count >= 2 and low_count == 0:
+        return (
+            f"{vital} has shown persistently elevated readings, "
+            f"most recently {last_value} on {last_date}."
+        )
+
+    # Case 2: Persistently LOW
+    if low_count >= 2 and high_count == 0:
+        return (
+            f"{vital} has shown persistently low readings, "
+            f"most recently {last_value} on {last_date}."
+        )
+
+    # Case 3: Mixed HIGH and LOW
+    if high_count >= 1 and low_count >= 1:
+        return (
+            f"{vital} readings have been variable, with both high and low values observed, "
+            f"most recently {last_value} on {last_date}."
+        )
+
+    # Case 4: Isolated HIGH
+    if high_count == 1:
+        return (
+            f"An isolated elevated {vital.lower()} reading was noted at "
+            f"{last_value} on {last_date}."
+        )
+
+    # Case 5: Isolated LOW
+    if low_count == 1:
+        return (
+            f"An isolated low {vital.lower()} reading was noted at "
+            f"{last_value} on {last_date}."
+        )
+
+    return None
+
+
+def wound_statement(w: dict) -> str:
+
+    if w["visit_count"] > 1:
+        followup = (
+            f"monitored across {w['visit_count']} visits, "
+            f"most recently on {w['last_seen']}"
+        )
+    else:
+        followup = f"documented on {w['last_seen']}"
+
+    return (
+        f"An active {w['latest_description'].lower()} is present at the "
+        f"{w['location'].lower()}, first noted on {w['onset_date']}, "
+        f"{followup}."
+    )
+
+
+def medication_statement(classification, reasons, frequencies) -> str:
+    return (
+        f"{classification} medications are being used for "
+        f"{reasons}."
+        f"(administration frequencies include {frequencies})."
+    )
+
+
+def diagnosis_statement(primary_diagnosis, secondary_diagnoses: list) -> str:
+
+    if secondary_diagnoses:
+        return (
+            f"The primary diagnosis for this episode appears to be "
+            f"{primary_diagnosis}. Additional documented conditions include "
+            f"{', '.join(secondary_diagnoses)}."
+        )
+
+    return (
+        f"The primary diagnosis for this episode appears to be "
+        f"{primary_diagnosis}."
+    )
+
+
+def note_statement(note_type: str, note_date: str) -> str:
+
+    # SAFE, non-inferential phrasing
+    if note_type == "ON CALL":
+        return (
+            f"An after-hours on-call interaction was documented on {note_date}."
+        )
+    if note_type == "NARRATIVE":
+        return (
+            "Recent nursing narrative documentation provides additional "
+            "context regarding the patient’s condition and care."
+        )
+    return (
+        f"Relevant clinical documentation ({note_type.lower()}) "
+        f"was recorded on {note_date}."
+    )
+
+
+def note_snippet_statement(note_type, note_date, topics, snippet: str) -> str:
+    topics = list(topics)
+    mentioned = topics[0] if len(topics) == 1 else f"{', '.join(topics[:-1])} and {topics[-1]}"
+    note = f"A {note_type.lower()} note" if note_type else "A note"
+    when = f" on {note_date}" if note_date else ""
+    return f"{note}{when} mentions {mentioned}: \"{snippet}\""
+
+
+def note_snippet_facts(notes_index, patient_id, episode_id) -> list[dict]:
+    """
+    Cited facts for the episode's most relevant note snippets
+    (notes_index.NOTE_TOPICS), best first.
+    """
+    return [
+        {
+            "statement": note_snippet_statement(s.note_type, s.note_date, s.topics, s.snippet),
+            "source": "notes.csv",
+            "date": s.note_date,
+        }
+        for s in notes_index.search(patient_id, episode_id)
+    ]
+
+
+def oasis_field_statement(column: str, value) -> str:
+    return f"{column.capitalize()}: {value}"
+
 
 class BaseSummarizer(ABC):
     
@@ -32,74 +302,32 @@ class BaseSummarizer(ABC):
     
 
 class VitalSummarizer(BaseSummarizer):
+
+    source = "vitals.csv"
     
     def __init__(self,df_vitals):
         self.df = df_vitals
     
     def summarize(self):
-        
-        self.df = self.df.drop_duplicates()
-        self.df['visit_date'] = pd.to_datetime(self.df['visit_date'])
-        
-        self.df['alert'] = np.where(self.df['min_value'].notna() & self.df['reading'] < self.df['min_value'],'low',
-                              np.where(self.df['max_value'].notna() & self.df['reading'] > self.df['max_value'],'high','Stable'))
-        
-        df_vital_alert = self.df[(self.df['alert'] == 'low')|(self.df['alert'] == 'high') ]
-        
-        vital_statements = []
 
-        alert_classes = df_vital_alert['vital_type'].unique()
+        df = self.df.drop_duplicates()
+        df = df.assign(visit_date=as_datetime(df['visit_date']))
+        self.df = df.assign(alert=classify_vital_alerts(df))
 
-        for vital in alert_classes:
-            df_vital = (
-                df_vital_alert[df_vital_alert['vital_type'] == vital]
-                .sort_values("visit_date")
-            )
+        stats = aggregate_vital_alerts(self.df, ['vital_type'])
+
+        vital_statements = []
 
-            high_count = (df_vital['alert'] == 'high').sum()
-            low_count  = (df_vital['alert'] == 'low').sum()
-
-            last_row = df_vital.iloc[-1]
-            last_value = last_row['reading']
-            last_date = last_row['visit_date'].strftime("%Y-%m-%d")
-            print(last_date)
-            # Case 1: Persistently HIGH
-            if high_count >= 2 and low_count == 0:
-                statement = (
-                    f"{vital} has shown persistently elevated readings, "
-                    f"most recently {last_value} on {last_date}."
-                )
-
-            # Case 2: Persistently LOW
-            elif low_count >= 2 and high_count == 0:
-                statement = (
-                    f"{vital} has shown persistently low readings, "
-                    f"most recently {last_value} on {last_date}."
-                )
-
-            # Case 3: Mixed HIGH and LOW
-            elif high_count >= 1 and low_count >= 1:
-                statement = (
-                    f"{vital} readings have been variable, with both high and low values observed, "
-                    f"most recently {last_value} on {last_date}."
-                )
-
-            # Case 4: Isolated HIGH
-            elif high_count == 1:
-                statement = (
-                    f"An isolated elevated {vital.lower()} reading was noted at "
-                    f"{last_value} on {last_date}."
-                )
-
-            # Case 5: Isolated LOW
-            elif low_count == 1:
-                statement = (
-                    f"An isolated low {vital.lower()} reading was noted at "
-                    f"{last_value} on {last_date}."
-                )
-
-            else:
-                continue  
+        for vital, high_count, low_count, last_value, last_date in zip(
+            stats['vital_type'].tolist(),
+            stats['high_count'].tolist(),
+            stats['low_count'].tolist(),
+            stats['reading'].tolist(),
+            stats['last_date'].tolist(),
+        ):
+            statement = vital_statement(vital, high_count, low_count, last_value, last_date)
+            if statement is None:
+                continue
             
             vital_statements.append({
                 "statement": statement,
@@ -111,16 +339,18 @@ class VitalSummarizer(BaseSummarizer):
     
 
 class WoundsSummarizer(BaseSummarizer):
+
+    source = "wounds.csv"
     
     def __init__(self,df_wounds):
         self.df = df_wounds
     
     def summarize(self):
         
-        self.df['visit_date'] = pd.to_datetime(self.df['visit_date'])
-        self.df['onset_date'] = pd.to_datetime(self.df['onset_date'])
+        self.df['visit_date'] = as_datetime(self.df['visit_date'])
+        self.df['onset_date'] = as_datetime(self.df['onset_date'])
         
-        wound_groups = self.df.groupby(["location", "onset_date"])
+        wound_groups = self.df.groupby(["location", "onset_date"], observed=True)
         
         wound_summaries = []
 
@@ -143,20 +373,8 @@ class WoundsSummarizer(BaseSummarizer):
         wound_statements = []
 
         for w in wound_summaries:
-        
-            if w["visit_count"] > 1:
-                followup = (
-                    f"monitored across {w['visit_count']} visits, "
-                    f"most recently on {w['last_seen']}"
-                )
-            else:
-                followup = f"documented on {w['last_seen']}"
-
-            statement = (
-                f"An active {w['latest_description'].lower()} is present at the "
-                f"{w['location'].lower()}, first noted on {w['onset_date']}, "
-                f"{followup}."
-            )
+
+            statement = wound_statement(w)
 
             wound_statements.append({
                 "statement": statement,
@@ -169,6 +387,8 @@ class WoundsSummarizer(BaseSummarizer):
     
 # Fix OASISSummarizer.summarize() - it's returning a nested structure
 class OASISSummarizer(BaseSummarizer):
+
+    source = "oasis.csv"
     
     def __init__(self, df_oasis):
         self.df = df_oasis
@@ -177,7 +397,7 @@ class OASISSummarizer(BaseSummarizer):
         if self.df.empty:
             return []
             
-        self.df["assessment_date"] = pd.to_datetime(self.df["assessment_date"])
+        self.df["assessment_date"] = as_datetime(self.df["assessment_date"])
         oasis_filtered = (
             self.df
             .drop_duplicates()
@@ -194,11 +414,7 @@ class OASISSummarizer(BaseSummarizer):
         
         # Add functional summary FIRST
         functional_summary = {
-            "statement": (
-                "OASIS assessment indicates the patient is highly dependent and "
-                "requires assistance with most activities of daily living, "
-                "including bathing, transfers, toileting, and ambulation."
-            ),
+            "statement": OASIS_FUNCTIONAL_SUMMARY,
             "source": "oasis.csv",
             "date": latest_oasis["assessment_date"].strftime("%Y-%m-%d")
         }
@@ -207,7 +423,7 @@ class OASISSummarizer(BaseSummarizer):
         # Add individual field values
         for col in oasis_fields:
             oasis_statements.append({
-                "statement": f"{col.capitalize()}: {latest_oasis[col]}",
+                "statement": oasis_field_statement(col, latest_oasis[col]),
                 "source": "oasis.csv",
                 "date": latest_oasis["assessment_date"].strftime("%Y-%m-%d")
             })
@@ -218,6 +434,8 @@ class OASISSummarizer(BaseSummarizer):
 
 class MedicationSummarizer(BaseSummarizer):
 
+    source = "medications.csv"
+
     def __init__(self, meds_df):
         self.df = meds_df
 
@@ -226,24 +444,31 @@ class MedicationSummarizer(BaseSummarizer):
         if self.df.empty:
             return []
 
-        grouped = (
-            self.df
-            .groupby("classification")
-            .agg(
-                reasons=("reason", lambda x: ", ".join(sorted(x.dropna().unique()))),
-                frequencies=("frequency", lambda x: ", ".join(sorted(x.dropna().unique())))
-            )
-            .reset_index()
-        )
+        # Grouped in Python: per-patient frames are a handful of rows, where
+        # a groupby with Python aggregations costs far more than the work.
+        reasons, frequencies = {}, {}
+        for classification, reason, frequency in zip(
+            self.df['classification'].tolist(),
+            self.df['reason'].tolist(),
+            self.df['frequency'].tolist(),
+        ):
+            if pd.isna(classification):
+                continue
+            reasons.setdefault(classification, set())
+            frequencies.setdefault(classification, set())
+            if not pd.isna(reason):
+                reasons[classification].add(reason)
+            if not pd.isna(frequency):
+                frequencies[classification].add(frequency)
 
         medication_statements = []
 
-        for _, row in grouped.iterrows():
+        for classification in sorted(reasons):
             medication_statements.append({
-                "statement": (
-                    f"{row['classification']} medications are being used for "
-                    f"{row['reasons']}."
-                    f"(administration frequencies include {row['frequencies']})."
+                "statement": medication_statement(
+                    classification,
+                    ", ".join(sorted(reasons[classification])),
+                    ", ".join(sorted(frequencies[classification]))
                 ),
                 "source": "medications.csv",
                 "date": None
@@ -254,6 +479,8 @@ class MedicationSummarizer(BaseSummarizer):
 
 class DiagnosisSummarizer(BaseSummarizer):
 
+    source = "diagnoses.csv"
+
     def __init__(self, diagnoses_df):
         self.df = diagnoses_df
 
@@ -272,48 +499,31 @@ class DiagnosisSummarizer(BaseSummarizer):
             else []
         )
 
-        if secondary_diagnoses:
-            statement = (
-                f"The primary diagnosis for this episode appears to be "
-                f"{primary_diagnosis}. Additional documented conditions include "
-                f"{', '.join(secondary_diagnoses)}."
-            )
-        else:
-            statement = (
-                f"The primary diagnosis for this episode appears to be "
-                f"{primary_diagnosis}."
-            )
-
         return [{
-            "statement": statement,
+            "statement": diagnosis_statement(primary_diagnosis, secondary_diagnoses),
             "source": "diagnoses.csv",
             "date": None
         }]
 
 class NotesSummarizer(BaseSummarizer):
 
-    def __init__(self, df_notes):
+    source = "notes.csv"
+
+    def __init__(self, df_notes, notes_index=None):
         self.df = df_notes.copy()
+        # notes_index.NotesIndex; without one, note_text is not used.
+        self.notes_index = notes_index
 
     def summarize(self) -> list[dict]:
 
         if self.df.empty:
             return []
 
-        self.df["note_date"] = pd.to_datetime(self.df["note_date"], errors="coerce")
+        self.df["note_date"] = as_datetime(self.df["note_date"], errors="coerce")
         self.df = self.df.dropna(subset=["note_date"])
 
-        latest_episode_id = (
-            self.df.sort_values("note_date", ascending=False)
-            .iloc[0]["episode_id"]
-        )
-
-        IMPORTANT_NOTE_TYPES = {
-            "NARRATIVE",
-            "RECERT/DISCHARGE DECISION",
-            "ON CALL",
-            "HOSPICE QUALIFYING CRITERIA"
-        }
+        latest_note = self.df.sort_values("note_date", ascending=False).iloc[0]
+        latest_episode_id = latest_note["episode_id"]
 
         df_filtered = (
             self.df[
@@ -331,44 +541,138 @@ class NotesSummarizer(BaseSummarizer):
             note_type = row["note_type"]
             note_date = row["note_date"].strftime("%Y-%m-%d")
 
-            # SAFE, non-inferential phrasing
-            if note_type == "ON CALL":
-                statement = (
-                    f"An after-hours on-call interaction was documented on {note_date}."
-                )
-            elif note_type == "NARRATIVE":
-                statement = (
-                    "Recent nursing narrative documentation provides additional "
-                    "context regarding the patient’s condition and care."
-                )
-            else:
-                statement = (
-                    f"Relevant clinical documentation ({note_type.lower()}) "
-                    f"was recorded on {note_date}."
-                )
+            statement = note_statement(note_type, note_date)
 
             notes_statements.append({
                 "statement": statement,
                 "source": "notes.csv"
             })
 
+        if self.notes_index is not None:
+            notes_statements.extend(
+                note_snippet_facts(self.notes_index, latest_note["patient_id"], latest_episode_id)
+            )
+
         return notes_statements
 
 
+def _run_summarizer(summary: BaseSummarizer):
+    """
+    Run one summarizer and return (facts, elapsed_seconds, error).
+
+    Top-level so a process pool can pickle it. Exceptions are returned
+    rather than raised so one failing table does not abort the others.
+    """
+    start = time.perf_counter()
+    try:
+        facts, error = summary.summarize(), None
+    except Exception as e:
+        facts, error = [], f"{type(e).__name__}: {e}"
+    return facts, time.perf_counter() - start, error
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(mode: str) -> Executor:
+    # One long-lived pool per mode; starting worker processes per patient
+    # would cost more than the summarizers themselves.
+    with _executors_lock:
+        if mode not in _executors:
+            pool = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+            _executors[mode] = pool(max_workers=SUMMARY_MAX_WORKERS)
+        return _executors[mode]
+
+
 class SummaryGenerator:
-    
-    
-    def __init__(self,summaries: list[BaseSummarizer]):
+    """
+    Runs summarizers and concatenates their facts in list order.
+
+    mode="serial" runs them one after another in the calling thread.
+    mode="thread" and mode="process" submit them to a shared pool; the
+    summarizers read disjoint tables, so they run concurrently. Threads
+    suit the numpy/pandas-heavy summarizers, which release the GIL for
+    much of their work; processes pay to pickle each frame but avoid the
+    GIL entirely when the vitals and notes frames are large.
+
+    Facts keep the summarizer order whatever the mode. A summarizer that
+    raises contributes a single error fact instead of aborting the run.
+    """
+
+    def __init__(self, summaries: list[BaseSummarizer], mode: str = SUMMARY_EXECUTION_MODE):
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"mode must be one of {EXECUTION_MODES}, got {mode!r}")
         self.summaries = summaries
-        
+        self.mode = mode
+        # Seconds spent in each summarizer during the last generate() call.
+        self.timings = {}
+        # Error message of each summarizer that failed during the last generate() call.
+        self.errors = {}
+
+    @classmethod
+    def for_patient(
+        cls,
+        repo: DataLoader,
+        patient_id: int,
+        episode_id: int,
+        mode: str = SUMMARY_EXECUTION_MODE,
+        notes_index=None,
+    ) -> "SummaryGenerator":
+        """
+        The standard six-summarizer pipeline for one patient episode. With a
+        notes_index.NotesIndex, the notes facts include relevant snippets of
+        the note text.
+        """
+        # Wounds and OASIS summarizers write parsed date columns back into
+        # their frame, so they get copies; the rest only read and can take
+        # slices.
+        return cls(
+            [
+                DiagnosisSummarizer(repo.get("diagnoses_df", patient_id, episode_id, copy=False)),
+                MedicationSummarizer(repo.get("meds_df", patient_id, episode_id, copy=False)),
+                VitalSummarizer(repo.get("vitals_df", patient_id, episode_id, copy=False)),
+                WoundsSummarizer(repo.get("wounds_df", patient_id, episode_id)),
+                NotesSummarizer(repo.get("notes_df", patient_id, episode_id, copy=False), notes_index),
+                OASISSummarizer(repo.get_patient_only("oasis_df", patient_id, copy=True))
+            ],
+            mode=mode
+        )
+
+    def _results(self) -> list[tuple]:
+        if self.mode == "serial" or len(self.summaries) < 2:
+            return [_run_summarizer(summary) for summary in self.summaries]
+
+        futures = [_executor(self.mode).submit(_run_summarizer, summary) for summary in self.summaries]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # Raised outside the summarizer: pickling or a dead worker.
+                results.append(([], 0.0, f"{type(e).__name__}: {e}"))
+        return results
+
     def generate(self) -> list[dict]:
-        
+
         generated_summary = []
-        for summary in self.summaries:
-            
-            temp_summary = summary.summarize()
-            generated_summary.extend(temp_summary)
-            
+        self.timings = {}
+        self.errors = {}
+        for summary, (facts, elapsed, error) in zip(self.summaries, self._results()):
+
+            name = type(summary).__name__
+            SUMMARIZER_SECONDS.observe(elapsed, summarizer=name)
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+
+            if error is not None:
+                SUMMARIZER_ERRORS.inc(summarizer=name)
+                self.errors[name] = error
+                facts = [{
+                    "statement": f"{name} could not summarize this table ({error}).",
+                    "source": getattr(summary, "source", name),
+                    "date": None,
+                    "error": True
+                }]
+            generated_summary.extend(facts)
+
         return generated_summary
-        
-       
\ No newline at end of file
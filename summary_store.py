@@ -0,0 +1,86 @@
+# summary_store.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Written by scheduler.py and read by api.py. Empty disables the store.
+SUMMARY_STORE_PATH = os.getenv("SUMMARY_STORE_PATH", "summaries.sqlite")
+# scheduler.py stores single-completion summaries (llm_client.async_call_llm);
+# summaries generated any other way must neither be served from the store
+# nor replace what is in it.
+STORED_STRATEGY = "single"
+
+
+def fact_hash(facts: list[dict]) -> str:
+    """
+    SHA-256 of the canonical JSON of a fact list. A stored summary is
+    current while the patient's facts still hash to the same value.
+    """
+    canonical = json.dumps(facts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SummaryStore:
+    """
+    Latest generated summary per patient episode, in SQLite.
+
+    Filled ahead of time by scheduler.py and written through by the API's
+    patient endpoints. Each row keeps the hash of the facts it was generated
+    from, so callers can tell whether it still matches the current data.
+    """
+
+    def __init__(self, path: str = SUMMARY_STORE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                patient_id INTEGER NOT NULL,
+                episode_id INTEGER NOT NULL,
+                fact_hash TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                model TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (patient_id, episode_id)
+            )
+            """
+        )
+
+    def get(self, patient_id: int, episode_id: int) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fact_hash, summary, model, created_at FROM summaries WHERE patient_id = ? AND episode_id = ?",
+                (int(patient_id), int(episode_id)),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("fact_hash", "summary", "model", "created_at"), row))
+
+    def current(self, patient_id: int, episode_id: int, facts_hash: str) -> str | None:
+        """
+        The stored summary if it was generated from facts hashing to
+        `facts_hash`, else None.
+        """
+        entry = self.get(patient_id, episode_id)
+        if entry is None or entry["fact_hash"] != facts_hash:
+            return None
+        return entry["summary"]
+
+    def put(self, patient_id: int, episode_id: int, facts_hash: str, summary: str, model: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?)",
+                (int(patient_id), int(episode_id), facts_hash, summary, model, time.time()),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, oldest, newest = self._db.execute(
+                "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM summaries"
+            ).fetchone()
+        return {"summaries": count, "oldest": oldest, "newest": newest}
@@ -0,0 +1,299 @@
+# synthetic_data.py
+#
+# Synthetic clinical tables with the same schemas as the CSVs in data/, for
+# benchmarking at realistic scale.
+#
+#   python synthetic_data.py --patients 100000 --visits 10 --out data/synthetic
+#
+# Every patient gets --episodes episodes of --visits visits each. Per
+# episode: a primary and 0-6 secondary diagnoses, 2-8 medications, one row
+# per vital type per visit, 0-2 wounds measured on every visit, and one note
+# per visit; per patient, one or two OASIS assessments. Values are drawn
+# from small vocabularies modelled on the real data, with about 10% of vital
+# readings outside their normal range.
+#
+# Generation is vectorized; string columns index into shared vocabularies,
+# so large tables stay cheap in memory.
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from clinical_data import TABLE_FILES
+
+DIAGNOSES = [
+    ("PRESSURE ULCER OF LEFT HIP, STAGE 3", "L89.223"),
+    ("PRESSURE ULCER OF LEFT HIP, STAGE 4", "L89.224"),
+    ("ESSENTIAL (PRIMARY) HYPERTENSION", "I10"),
+    ("TYPE 2 DIABETES MELLITUS WITHOUT COMPLICATIONS", "E11.9"),
+    ("HEART FAILURE, UNSPECIFIED", "I50.9"),
+    ("CHRONIC OBSTRUCTIVE PULMONARY DISEASE, UNSPECIFIED", "J44.9"),
+    ("PERIPHERAL VASCULAR DISEASE, UNSPECIFIED", "I73.9"),
+    ("ANEMIA, UNSPECIFIED", "D64.9"),
+    ("UNSPECIFIED DEMENTIA WITHOUT BEHAVIORAL DISTURBANCE", "F03.90"),
+    ("HISTORY OF FALLING", "Z91.81"),
+    ("CHRONIC KIDNEY DISEASE, STAGE 3", "N18.30"),
+    ("URINARY TRACT INFECTION, SITE NOT SPECIFIED", "N39.0"),
+]
+
+MEDICATIONS = [
+    ("furosemide 40 mg tablet", "Cardiovascular Therapy Agents", "DIURETIC "),
+    ("losartan 25 mg tablet", "Cardiovascular Therapy Agents", "HIGH BLOOD PRESSURE "),
+    ("amlodipine 5 mg tablet", "Cardiovascular Therapy Agents", "HTN"),
+    ("atenolol 25 mg tablet", "Cardiovascular Therapy Agents", "BLOOD PRESSURE "),
+    ("aspirin 81 mg tablet,delayed release", "Hematological Agents", "ANTIPLATELET "),
+    ("ferrous sulfate 325 mg (65 mg iron) tablet", "Electrolyte Balance-Nutritional Products", "ANEMIA "),
+    ("Juven (with collagen) 7 gram-7 gram-1.5 gram oral powder packet", "Electrolyte Balance-Nutritional Products", "WOUND HEALING "),
+    ("gentamicin 0.1 % topical ointment", "Dermatological", "WOUND CARE"),
+    ("pantoprazole 20 mg tablet,delayed release", "Gastrointestinal Therapy Agents", "ACID REFLUX"),
+    ("Miralax 17 gram oral powder packet", "Gastrointestinal Therapy Agents", "CONSTIPATION "),
+    ("tramadol 50 mg tablet", "Analgesic, Anti-inflammatory or Antipyretic", "PAIN "),
+    ("Tylenol Extra Strength 500 mg tablet", "Analgesic, Anti-inflammatory or Antipyretic", "PAIN "),
+    ("albuterol sulfate HFA 90 mcg/actuation aerosol inhaler", "Respiratory Therapy Agents", "WHEEZING "),
+    ("levofloxacin 250 mg tablet", "Anti-Infective Agents", "URINARY TRACT INFECTION "),
+    ("ondansetron 8 mg disintegrating tablet", "Gastrointestinal Therapy Agents", "NAUSEA "),
+    ("chlorpromazine 50 mg tablet", "Central Nervous System Agents", "HICCUPS "),
+]
+
+FREQUENCIES = ["DAILY", "2 TIMES DAILY", "3 TIMES DAILY", "BEDTIME", "EVERY 6 HOURS", "EVERY 4 HOURS", "EVERY 72 HOURS"]
+
+# vital_type -> (min_value, max_value, mean, standard deviation); readings
+# are drawn from the normal distribution and rounded to one decimal.
+VITALS = {
+    "Systolic Blood Pressure": (90.0, 180.0, 135.0, 25.0),
+    "Diastolic Blood Pressure": (50.0, 90.0, 75.0, 10.0),
+    "Pulse": (60.0, 100.0, 80.0, 12.0),
+    "Respirations": (12.0, 24.0, 18.0, 3.0),
+    "Temperature": (96.0, 100.4, 98.2, 1.0),
+    "O2 Saturation (%)": (90.0, 100.0, 96.0, 2.5),
+}
+
+NOTE_TYPES = [
+    "NARRATIVE", "HOSPICE QUALIFYING CRITERIA", "RECERT/DISCHARGE DECISION",
+    "PLAN OF CARE APPROVAL CONFIRMATION", "CLINICAL EXCEPTION", "SUPPLY ORDER STATUS",
+    "MEDICARE ELIGIBILITY", "ON CALL", "LATE VISIT DOCUMENTATION",
+]
+
+NOTE_TEXTS = [
+    "PATIENT SITTING IN WHEELCHAIR AT TIME OF VISIT. ASSESSMENT COMPLETE WITH VITAL SIGNS TAKEN. WOUND CARE PROVIDED. NO NEW ORDERS.",
+    "PATIENT LYING IN BED. CAREGIVER REPORTS PAIN EARLIER TODAY, NOW SUBSIDED. MEASUREMENTS TAKEN. EDUCATED ON WHEN TO CALL 911.",
+    "DSM NON-CRITICAL EXCEPTION FOR VITAL SIGN NOT TAKEN: WEIGHT REASON: PATIENT CANNOT STAND.",
+    "MEDICARE REMAINS ACTIVE. SHOWING NO ADDITIONAL PAYERS. BENEFITS ATTACHED TO THE CHART.",
+    "DELIVERY SHIPPED. ITEM: BORDERED FOAM DRESSING 4X4 QTY ORDER: 10 QTY SHIP: 10",
+]
+
+WOUND_DESCRIPTIONS = ["PRESSURE ULCER STAGE II", "PRESSURE ULCER STAGE III", "PRESSURE ULCER STAGE IV"]
+WOUND_LOCATIONS = ["HEEL, LEFT", "HEEL, RIGHT", "ILIAC CREST, LEFT", "SACRUM", "UPPER BUTTOCK, LEFT", "PROXIMAL THIGH, LEFT"]
+
+OASIS_ITEMS = {
+    "grooming": [
+        "1 - GROOMING UTENSILS MUST BE PLACED WITHIN REACH BEFORE ABLE TO COMPLETE GROOMING ACTIVITIES.",
+        "2 - SOMEONE MUST ASSIST THE PATIENT TO GROOM SELF",
+        "3 - PATIENT DEPENDS ENTIRELY UPON SOMEONE ELSE FOR GROOMING NEEDS",
+    ],
+    "bathing": [
+        "3 - ABLE TO PARTICIPATE IN BATHING SELF IN SHOWER OR TUB, BUT REQUIRES PRESENCE OF ANOTHER PERSON THROUGHOUT THE BATH FOR ASSISTANCE OR SUPERVISION.",
+        "5 - UNABLE TO USE THE SHOWER OR TUB, BUT ABLE TO PARTICIPATE IN BATHING SELF IN BED, AT THE SINK, IN BEDSIDE CHAIR, OR ON COMMODE, WITH THE ASSISTANCE OR SUPERVISION OF ANOTHER PERSON.",
+        "6 - UNABLE TO PARTICIPATE EFFECTIVELY IN BATHING AND IS BATHED TOTALLY BY ANOTHER PERSON.",
+    ],
+    "toilet_transfer": [
+        "1 - WHEN REMINDED, ASSISTED, OR SUPERVISED BY ANOTHER PERSON, ABLE TO GET TO AND FROM THE TOILET AND TRANSFER.",
+        "2 - UNABLE TO GET TO AND FROM THE TOILET BUT IS ABLE TO USE A BEDSIDE COMMODE (WITH OR WITHOUT ASSISTANCE). ",
+        "4 - IS TOTALLY DEPENDENT IN TOILETING.",
+    ],
+    "transfer": [
+        "1 - ABLE TO TRANSFER WITH MINIMAL HUMAN ASSISTANCE OR WITH USE OF AN ASSISTIVE DEVICE.",
+        "3 - UNABLE TO TRANSFER SELF AND IS UNABLE TO BEAR WEIGHT OR PIVOT WHEN TRANSFERRED BY ANOTHER PERSON",
+    ],
+    "ambulation": [
+        "3 - ABLE TO WALK ONLY WITH THE SUPERVISION OR ASSISTANCE OF ANOTHER PERSON AT ALL TIMES. ",
+        "5 - CHAIRFAST, UNABLE TO AMBULATE AND IS UNABLE TO WHEEL SELF. ",
+    ],
+}
+
+FIRST_PATIENT_ID = 1001
+FIRST_EPISODE_ID = 5001
+START_DATE = np.datetime64("2024-01-01")
+EPISODE_DAYS = 60
+
+
+def _pick(vocabulary: list, index: np.ndarray) -> np.ndarray:
+    # Object array whose cells share the vocabulary's string objects.
+    return np.array(vocabulary, dtype=object)[index]
+
+
+def _format_dates(days: np.ndarray, fmt: str = "%Y-%m-%d") -> np.ndarray:
+    # Format each distinct day once, then index: dates repeat a lot.
+    unique, inverse = np.unique(days, return_inverse=True)
+    labels = pd.to_datetime(START_DATE + unique.astype("timedelta64[D]")).strftime(fmt).to_numpy(dtype=object)
+    return labels[inverse]
+
+
+def _per_episode(rng, n_episodes: int, low: int, high: int) -> tuple[np.ndarray, np.ndarray]:
+    # Row counts in [low, high] per episode, and each row's episode position.
+    counts = rng.integers(low, high + 1, n_episodes)
+    return counts, np.repeat(np.arange(n_episodes), counts)
+
+
+def generate_tables(
+    n_patients: int,
+    visits_per_episode: int = 10,
+    episodes_per_patient: int = 1,
+    seed: int = 0,
+) -> dict[str, pd.DataFrame]:
+    """
+    Synthetic clinical tables keyed like read_clinical_tables():
+    {"diagnoses_df": ..., "meds_df": ..., ...}, with the same columns in the
+    same order as the CSVs in data/.
+    """
+    rng = np.random.default_rng(seed)
+    n_episodes = n_patients * episodes_per_patient
+
+    episode_patient = np.repeat(FIRST_PATIENT_ID + np.arange(n_patients), episodes_per_patient)
+    episode_id = FIRST_EPISODE_ID + np.arange(n_episodes)
+    # Each patient's episodes follow one another from a random start day.
+    patient_start = rng.integers(0, 365, n_patients)
+    episode_start = (
+        np.repeat(patient_start, episodes_per_patient)
+        + np.tile(np.arange(episodes_per_patient), n_patients) * EPISODE_DAYS
+    )
+
+    # Visits: evenly spread over the episode, with a day of jitter.
+    visit_episode = np.repeat(np.arange(n_episodes), visits_per_episode)
+    visit_number = np.tile(np.arange(visits_per_episode), n_episodes)
+    spacing = max(1, EPISODE_DAYS // max(1, visits_per_episode))
+    visit_day = (
+        episode_start[visit_episode]
+        + visit_number * spacing
+        + rng.integers(0, 2, len(visit_episode))
+    )
+
+    # diagnoses: one primary plus 0-6 secondaries per episode
+    counts, rows = _per_episode(rng, n_episodes, 1, 7)
+    codes = rng.integers(0, len(DIAGNOSES), len(rows))
+    diagnoses_df = pd.DataFrame({
+        "patient_id": episode_patient[rows],
+        "episode_id": episode_id[rows],
+        "diagnosis_description": _pick([d for d, _ in DIAGNOSES], codes),
+        "diagnosis_code": _pick([c for _, c in DIAGNOSES], codes),
+    })
+
+    # medications: 2-8 per episode
+    counts, rows = _per_episode(rng, n_episodes, 2, 8)
+    meds = rng.integers(0, len(MEDICATIONS), len(rows))
+    meds_df = pd.DataFrame({
+        "episode_id": episode_id[rows],
+        "medication_name": _pick([m[0] for m in MEDICATIONS], meds),
+        "frequency": _pick(FREQUENCIES, rng.integers(0, len(FREQUENCIES), len(rows))),
+        "classification": _pick([m[1] for m in MEDICATIONS], meds),
+        "reason": _pick([m[2] for m in MEDICATIONS], meds),
+        "patient_id": episode_patient[rows],
+    })
+
+    # vitals: every vital type on every visit
+    vital_names = list(VITALS)
+    limits = np.array(list(VITALS.values()))
+    n_vitals = len(vital_names)
+    vital_visit = np.repeat(np.arange(len(visit_episode)), n_vitals)
+    vital_kind = np.tile(np.arange(n_vitals), len(visit_episode))
+    readings = rng.normal(limits[vital_kind, 2], limits[vital_kind, 3]).round(1)
+    vitals_df = pd.DataFrame({
+        "episode_id": episode_id[visit_episode[vital_visit]],
+        "visit_date": _format_dates(visit_day[vital_visit]),
+        "vital_type": _pick(vital_names, vital_kind),
+        "reading": readings,
+        "min_value": limits[vital_kind, 0],
+        "max_value": limits[vital_kind, 1],
+        "patient_id": episode_patient[visit_episode[vital_visit]],
+    })
+
+    # notes: one per visit, timestamped within the visit day
+    seconds = rng.integers(8 * 3600, 20 * 3600, len(visit_episode))
+    unique_seconds, inverse = np.unique(seconds, return_inverse=True)
+    clock = np.array(
+        [f" {s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}.000" for s in unique_seconds.tolist()],
+        dtype=object,
+    )
+    notes_df = pd.DataFrame({
+        "episode_id": episode_id[visit_episode],
+        "note_date": _format_dates(visit_day) + clock[inverse],
+        "note_type": _pick(NOTE_TYPES, rng.integers(0, len(NOTE_TYPES), len(visit_episode))),
+        "note_text": _pick(NOTE_TEXTS, rng.integers(0, len(NOTE_TEXTS), len(visit_episode))),
+        "patient_id": episode_patient[visit_episode],
+    })
+
+    # wounds: 0-2 per episode, each measured on every visit
+    counts, wound_episode = _per_episode(rng, n_episodes, 0, 2)
+    wound_onset = episode_start[wound_episode] - rng.integers(0, 200, len(wound_episode))
+    wound_row = np.repeat(np.arange(len(wound_episode)), visits_per_episode)
+    wound_visit = wound_episode[wound_row] * visits_per_episode + np.tile(
+        np.arange(visits_per_episode), len(wound_episode)
+    )
+    wound_stage = rng.integers(0, len(WOUND_DESCRIPTIONS), len(wound_episode))
+    wound_location = rng.integers(0, len(WOUND_LOCATIONS), len(wound_episode))
+    wounds_df = pd.DataFrame({
+        "episode_id": episode_id[wound_episode[wound_row]],
+        "description": _pick(WOUND_DESCRIPTIONS, wound_stage[wound_row]),
+        "location": _pick(WOUND_LOCATIONS, wound_location[wound_row]),
+        "onset_date": _format_dates(wound_onset[wound_row]),
+        "visit_date": _format_dates(visit_day[wound_visit]),
+        "patient_id": episode_patient[wound_episode[wound_row]],
+    })
+
+    # oasis: one or two assessments per patient, at episode starts
+    counts = rng.integers(1, 3, n_patients)
+    assessment_patient = np.repeat(np.arange(n_patients), counts)
+    repeat = np.arange(len(assessment_patient)) - np.repeat(np.cumsum(counts) - counts, counts)
+    oasis = {
+        "patient_id": FIRST_PATIENT_ID + assessment_patient,
+        "assessment_date": _format_dates(patient_start[assessment_patient] + repeat * EPISODE_DAYS),
+        "assessment_type": _pick(["Start of Care", "Recert"], np.minimum(repeat, 1)),
+    }
+    for item, answers in OASIS_ITEMS.items():
+        oasis[item] = _pick(answers, rng.integers(0, len(answers), len(assessment_patient)))
+    oasis_df = pd.DataFrame(oasis)
+
+    return {
+        "diagnoses_df": diagnoses_df,
+        "meds_df": meds_df,
+        "vitals_df": vitals_df,
+        "notes_df": notes_df,
+        "wounds_df": wounds_df,
+        "oasis_df": oasis_df,
+    }
+
+
+def write_tables(dataframes: dict, out_dir: str):
+    """
+    Write tables as CSVs named like data/, so read_clinical_tables(out_dir)
+    and columnar.convert_data_dir(out_dir, ...) accept them.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for table, df in dataframes.items():
+        df.to_csv(os.path.join(out_dir, TABLE_FILES[table]), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic clinical CSVs")
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--visits", type=int, default=10, help="visits per episode")
+    parser.add_argument("--episodes", type=int, default=1, help="episodes per patient")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="data/synthetic")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    dataframes = generate_tables(args.patients, args.visits, args.episodes, args.seed)
+    generated = time.perf_counter() - start
+    write_tables(dataframes, args.out)
+
+    for table, df in dataframes.items():
+        print(f"{TABLE_FILES[table]:<18} {len(df):>12,} rows")
+    print(f"generated in {generated:.2f}s, written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# template_renderer.py
+#
+# Summaries without (or with less of) the LLM. The structured sections of a
+# summary restate the facts SummaryGenerator already produces, so they can
+# be rendered locally, in the section layout of llm_client.SYSTEM_PROMPT,
+# with every bullet citing its source file and date:
+#
+#   template   every section rendered from the facts, overview included;
+#              no LLM call, well under a millisecond
+#   llm        the whole summary from the LLM (llm_client / sectioned.py)
+#   hybrid     the LLM writes only the narrative overview
+#              (sectioned.OVERVIEW_PROMPT); the sections are rendered. If the
+#              overview fails or takes longer than
+#              SUMMARY_HYBRID_TIMEOUT_SECONDS, the template overview is used
+#
+# As in sectioned.py, facts from sources outside SECTIONS only count towards
+# the overview.
+
+import asyncio
+import os
+
+import llm_client
+from metrics import SUMMARY_OVERVIEW_FALLBACKS
+from sectioned import NO_FACTS, OVERVIEW_TITLE, SECTIONS, overview_prompt, partition_facts, summarize
+
+SUMMARY_MODES = ("template", "llm", "hybrid")
+# Mode used by the API's non-streaming summary endpoints unless a request
+# names one.
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "llm")
+SUMMARY_HYBRID_TIMEOUT_SECONDS = float(os.getenv("SUMMARY_HYBRID_TIMEOUT_SECONDS", "10"))
+
+# How the template overview counts the facts of each section after the
+# diagnoses, which it quotes instead.
+SECTION_NOUNS = ["medication classes", "vital sign findings", "wound findings", "functional status items",
+                 "note entries"]
+
+
+def cite(fact: dict) -> str:
+    source = fact.get("source") or "unknown source"
+    date = fact.get("date")
+    return f"{source}, {date}" if date else source
+
+
+def fact_bullet(fact: dict) -> str:
+    return f"- {str(fact.get('statement', '')).strip()} *({cite(fact)})*"
+
+
+def template_overview(facts: list[dict]) -> str:
+    parts = partition_facts(facts)
+    paragraphs = []
+    if parts[0]:
+        paragraphs.append(str(parts[0][0].get("statement", "")).strip())
+
+    counts = [f"{len(part)} {noun}" for part, noun in zip(parts[1:], SECTION_NOUNS) if part]
+    if counts:
+        listed = counts[0] if len(counts) == 1 else f"{', '.join(counts[:-1])} and {counts[-1]}"
+        paragraphs.append(f"The documentation for this episode includes {listed}.")
+    if not paragraphs:
+        paragraphs.append("No structured clinical documentation is available for this episode.")
+
+    paragraphs.append(
+        "*This overview was assembled from the structured facts without an LLM; "
+        "each item below cites its source.*"
+    )
+    return "\n\n".join(paragraphs)
+
+
+def render_summary(facts: list[dict], overview: str | None = None) -> str:
+    """
+    The markdown summary of `facts`, section by section, in the layout the
+    LLM is asked for. `overview` replaces the template overview text (the
+    section title is added if missing).
+    """
+    overview = (overview or template_overview(facts)).strip()
+    if overview.startswith(OVERVIEW_TITLE):
+        overview = overview[len(OVERVIEW_TITLE):].strip()
+
+    sections = [f"{OVERVIEW_TITLE}\n{overview}"]
+    for part, (title, _, _) in zip(partition_facts(facts), SECTIONS):
+        bullets = "\n".join(fact_bullet(fact) for fact in part) if part else NO_FACTS
+        sections.append(f"{title}\n{bullets}")
+    return "\n\n".join(sections)
+
+
+async def hybrid_summary(facts: list[dict], report: dict | None = None, models: set | None = None) -> str:
+    """
+    render_summary with an LLM-written overview, falling back to the
+    template overview when the LLM fails or is slower than
+    SUMMARY_HYBRID_TIMEOUT_SECONDS.
+    """
+    overview = None
+    call_report = {}
+    try:
+        overview = await asyncio.wait_for(
+            llm_client.complete(facts, overview_prompt(), call_report, models),
+            SUMMARY_HYBRID_TIMEOUT_SECONDS or None,
+        )
+    except asyncio.TimeoutError:
+        SUMMARY_OVERVIEW_FALLBACKS.inc(reason="timeout")
+    except Exception as e:
+        print(f"Overview generation failed, using the template: {e}")
+        SUMMARY_OVERVIEW_FALLBACKS.inc(reason="error")
+
+    if report is not None:
+        report.update(call_report)
+        report["llm_calls"] = 1 if call_report else 0
+        report["overview_fallback"] = int(overview is None)
+    return render_summary(facts, overview)
+
+
+async def summarize_with_mode(
+    facts: list[dict],
+    report: dict | None = None,
+    mode: str | None = None,
+    strategy: str | None = None,
+    models: set | None = None,
+) -> str:
+    """
+    A summary by `mode` (default SUMMARY_MODE); `strategy` applies to the
+    llm mode only, as in sectioned.summarize. `models` receives the models
+    that wrote any of it, as in llm_client.async_call_llm.
+    """
+    mode = mode or SUMMARY_MODE
+    if mode not in SUMMARY_MODES:
+        raise ValueError(f"mode must be one of {SUMMARY_MODES}, got {mode!r}")
+    if mode == "template":
+        return render_summary(facts)
+    if mode == "hybrid":
+        return await hybrid_summary(facts, report, models)
+    return await summarize(facts, report, strategy, models)
@@ -0,0 +1,67 @@
+# tests/reference.py
+#
+# Reference implementations and fixture builders shared by the tests and the
+# benchmarks that time the optimized code against them.
+
+import numpy as np
+import pandas as pd
+
+from summarizers import vital_statement
+
+
+def make_vitals(n_rows: int, rows_per_episode: int = 50, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n_episodes = max(1, n_rows // rows_per_episode)
+    episode = rng.integers(0, n_episodes, n_rows)
+
+    return pd.DataFrame({
+        "episode_id": 5000 + episode,
+        "visit_date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 60, n_rows), unit="D"),
+        "vital_type": rng.choice(["Pulse", "Temperature", "Respirations"], n_rows),
+        "reading": rng.normal(90, 15, n_rows).round(1),
+        "min_value": 60.0,
+        "max_value": 100.0,
+        "patient_id": 1000 + episode,
+    })
+
+
+def split_episodes(df: pd.DataFrame) -> list[pd.DataFrame]:
+    return [group for _, group in df.groupby(["patient_id", "episode_id"], sort=False)]
+
+
+def loop_vital_summary(df: pd.DataFrame) -> list[dict]:
+    # The pre-vectorization VitalSummarizer.summarize, with the alert mask's
+    # operator precedence corrected.
+    df = df.drop_duplicates().copy()
+    df['visit_date'] = pd.to_datetime(df['visit_date'])
+
+    df['alert'] = np.where(df['min_value'].notna() & (df['reading'] < df['min_value']), 'low',
+                           np.where(df['max_value'].notna() & (df['reading'] > df['max_value']), 'high', 'Stable'))
+
+    df_vital_alert = df[(df['alert'] == 'low') | (df['alert'] == 'high')]
+
+    vital_statements = []
+    for vital in df_vital_alert['vital_type'].unique():
+        df_vital = (
+            df_vital_alert[df_vital_alert['vital_type'] == vital]
+            .sort_values("visit_date", kind="stable")
+        )
+
+        high_count = (df_vital['alert'] == 'high').sum()
+        low_count = (df_vital['alert'] == 'low').sum()
+
+        last_row = df_vital.iloc[-1]
+        last_value = last_row['reading']
+        last_date = last_row['visit_date'].strftime("%Y-%m-%d")
+
+        statement = vital_statement(vital, high_count, low_count, last_value, last_date)
+        if statement is None:
+            continue
+
+        vital_statements.append({
+            "statement": statement,
+            "source": "vitals.csv",
+            "date": last_date
+        })
+
+    return vital_statements
@@ -0,0 +1,55 @@
+# tests/test_cohort.py
+#
+# CohortSummaryGenerator against SummaryGenerator run once per patient, on
+# data/ and on a small synthetic dataset, with raw and compact (schema.py)
+# dtypes, with and without a notes index.
+
+import pytest
+
+from clinical_data import read_clinical_tables
+from cohort import CohortSummaryGenerator, latest_episodes
+from notes_index import NotesIndex, build_notes_index
+from schema import compact_tables
+from summarizers import DataLoader, SummaryGenerator
+from synthetic_data import generate_tables
+
+
+@pytest.fixture(scope="module")
+def synthetic() -> dict:
+    return generate_tables(25, visits_per_episode=3, episodes_per_patient=2, seed=5)
+
+
+def per_patient_facts(dataframes: dict, notes_index=None) -> dict:
+    repo = DataLoader(dataframes)
+    episodes = latest_episodes(dataframes["diagnoses_df"])
+    return {
+        patient_id: SummaryGenerator.for_patient(repo, patient_id, episode_id, notes_index=notes_index).generate()
+        for patient_id, episode_id in zip(episodes["patient_id"].tolist(), episodes["episode_id"].tolist())
+    }
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("dataset", ["data", "synthetic"])
+def test_matches_per_patient_facts(dataset, compact, synthetic):
+    dataframes = read_clinical_tables("data") if dataset == "data" else synthetic
+    if compact:
+        dataframes = compact_tables(dataframes)
+
+    expected = per_patient_facts(dataframes)
+    actual = CohortSummaryGenerator(dataframes).generate()
+
+    assert actual.keys() == expected.keys()
+    for patient_id, facts in expected.items():
+        assert actual[patient_id] == facts
+
+
+def test_matches_per_patient_facts_with_notes_index(tmp_path):
+    dataframes = read_clinical_tables("data")
+    path = str(tmp_path / "notes_index.sqlite")
+    build_notes_index(dataframes["notes_df"], path)
+    notes_index = NotesIndex(path)
+
+    expected = per_patient_facts(dataframes, notes_index)
+    # The index adds note snippets, so this covers more than the test above.
+    assert expected != per_patient_facts(dataframes)
+    assert CohortSummaryGenerator(dataframes, notes_index).generate() == expected
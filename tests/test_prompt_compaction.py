@@ -0,0 +1,82 @@
+# tests/test_prompt_compaction.py
+#
+# compact_prompt: the grouped prompt, the input-token budget, and the order
+# in which facts are dropped to meet it.
+
+import json
+
+import pytest
+
+from prompt_compaction import OMITTED_KEY, compact_prompt, estimate_tokens, group_facts, serialize
+
+
+def fact(source: str | None, statement: str, date: str | None = None) -> dict:
+    return {"statement": statement, "source": source, "date": date}
+
+
+FACTS = [
+    fact("oasis.csv", "Functional status overview: needs assistance with most activities.", "2025-08-15"),
+    fact("diagnoses.csv", "Primary diagnosis: congestive heart failure."),
+    fact("notes.csv", "A narrative note mentions a fall at home.", "2025-08-12"),
+    fact("medications.csv", "Cardiovascular medications: furosemide, metoprolol."),
+    fact("oasis.csv", "Ambulation: walks only with supervision.", "2025-08-15"),
+    fact("vitals.csv", "Pulse has shown persistently elevated readings.", "2025-08-14"),
+    fact("wounds.csv", "Stage 2 pressure ulcer on the sacrum.", "2025-08-10"),
+    fact(None, "Patient prefers morning visits."),
+    fact("diagnoses.csv", "Secondary diagnosis: type 2 diabetes."),
+    fact("oasis.csv", "Bathing: dependent on caregiver.", "2025-08-15"),
+]
+
+# Least important first: OASIS, notes, wounds, vitals, medications,
+# diagnoses, then unknown sources; later facts before earlier ones.
+DROP_ORDER = [9, 4, 0, 2, 6, 5, 3, 8, 1, 7]
+
+
+def kept_statements(text: str) -> set[str]:
+    grouped = json.loads(text)
+    grouped.pop(OMITTED_KEY, None)
+    return {statement for dates in grouped.values() for statements in dates.values() for statement in statements}
+
+
+def test_groups_by_source_and_date_within_budget():
+    text, report = compact_prompt(FACTS)
+
+    grouped = json.loads(text)
+    assert grouped["oasis.csv"] == {"2025-08-15": [FACTS[0]["statement"], FACTS[4]["statement"], FACTS[9]["statement"]]}
+    assert grouped["unknown"] == {"undated": [FACTS[7]["statement"]]}
+    assert OMITTED_KEY not in grouped
+    assert report["facts_dropped"] == 0
+    assert report["prompt_tokens"] == estimate_tokens(text)
+    assert report["tokens_saved"] == report["original_tokens"] - report["prompt_tokens"] > 0
+
+
+def test_duplicate_statements_are_written_once():
+    text, _ = compact_prompt([FACTS[1], dict(FACTS[1]), FACTS[8]])
+    assert json.loads(text) == {"diagnoses.csv": {"undated": [FACTS[1]["statement"], FACTS[8]["statement"]]}}
+
+
+def test_drops_fewest_lowest_priority_facts_to_meet_budget():
+    full_tokens = compact_prompt(FACTS)[1]["prompt_tokens"]
+    dropped_counts = set()
+
+    for budget in range(full_tokens - 1, 0, -1):
+        text, report = compact_prompt(FACTS, token_budget=budget)
+        dropped = report["facts_dropped"]
+        dropped_counts.add(dropped)
+
+        assert kept_statements(text) == {FACTS[i]["statement"] for i in DROP_ORDER[dropped:]}
+        assert json.loads(text)[OMITTED_KEY] == dropped
+        if dropped < len(FACTS):
+            assert report["prompt_tokens"] <= budget
+        # One drop fewer would not have fit.
+        fewer = [FACTS[i] for i in sorted(DROP_ORDER[dropped - 1:])]
+        assert estimate_tokens(serialize(group_facts(fewer, omitted=dropped - 1))) > budget
+
+    # The sweep saw every stage, down to dropping everything.
+    assert dropped_counts == set(range(1, len(FACTS) + 1))
+
+
+@pytest.mark.parametrize("token_budget", [None, 0, -1])
+def test_no_positive_budget_keeps_every_fact(token_budget):
+    _, report = compact_prompt(FACTS, token_budget=token_budget)
+    assert report["facts_dropped"] == 0
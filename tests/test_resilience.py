@@ -0,0 +1,154 @@
+# tests/test_resilience.py
+#
+# ResilientCaller's policy with scripted attempts: retries of transient
+# errors, non-retryable errors, circuit breakers, model fallback, the
+# deadline and hedging. Backoff is zero, so nothing here sleeps for long.
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from llm_resilience import CircuitOpenError, ResilientCaller, backoff_delay, retryable
+
+REQUEST = httpx.Request("POST", "http://llm/v1/chat/completions")
+
+
+def status_error(status: int, headers: dict | None = None) -> openai.APIStatusError:
+    response = httpx.Response(status, headers=headers, request=REQUEST)
+    error_types = {400: openai.BadRequestError, 429: openai.RateLimitError, 503: openai.InternalServerError}
+    return error_types[status](f"HTTP {status}", response=response, body=None)
+
+
+class Script:
+    """
+    attempt(model) that raises or returns the next outcome scripted for
+    `model` (its last outcome repeats), recording every call.
+    """
+
+    def __init__(self, **outcomes):
+        self.outcomes = {model: list(steps) for model, steps in outcomes.items()}
+        self.calls = []
+
+    def next(self, model: str):
+        self.calls.append(model)
+        steps = self.outcomes[model]
+        outcome = steps.pop(0) if len(steps) > 1 else steps[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def __call__(self, model: str):
+        return self.next(model)
+
+    def sync(self, model: str, timeout):
+        return self.next(model)
+
+
+def caller(**options) -> ResilientCaller:
+    options = {"max_retries": 2, "backoff_seconds": 0.0, "max_backoff_seconds": 0.0, **options}
+    return ResilientCaller(["primary", "backup"], **options)
+
+
+def test_retryable_errors():
+    assert retryable(status_error(429))
+    assert retryable(status_error(503))
+    assert retryable(openai.APIConnectionError(request=REQUEST))
+    assert not retryable(status_error(400))
+    assert not retryable(ValueError("LLM returned empty response"))
+
+
+def test_backoff_honours_retry_after():
+    assert backoff_delay(0, base=0.5, cap=8.0, retry_after=3.0) >= 3.0
+    assert 0 <= backoff_delay(10, base=0.5, cap=8.0) <= 8.0
+
+
+def test_transient_errors_are_retried_on_the_same_model():
+    script = Script(primary=[status_error(503), status_error(429), "summary"])
+    resilience = caller()
+
+    assert asyncio.run(resilience.call(script)) == ("summary", "primary")
+    assert script.calls == ["primary"] * 3
+    assert resilience.breakers["primary"].state == "closed"
+
+
+def test_retries_exhausted_fall_back_to_the_next_model():
+    script = Script(primary=[status_error(503)], backup=["backup summary"])
+
+    assert asyncio.run(caller().call(script)) == ("backup summary", "backup")
+    assert script.calls == ["primary"] * 3 + ["backup"]
+
+
+def test_non_retryable_error_falls_back_without_retry_or_breaker():
+    script = Script(primary=[status_error(400)], backup=["backup summary"])
+    resilience = caller(breaker_failures=1)
+
+    assert asyncio.run(resilience.call(script)) == ("backup summary", "backup")
+    assert script.calls == ["primary", "backup"]
+    # A bad request says nothing about the model's health.
+    assert resilience.breakers["primary"].state == "closed"
+
+
+def test_open_breaker_skips_the_model():
+    script = Script(primary=[status_error(503), "summary"], backup=["backup summary"])
+    resilience = caller(breaker_failures=1, breaker_reset_seconds=60.0)
+
+    # The first failure opens the primary's breaker, so it is not retried.
+    assert asyncio.run(resilience.call(script)) == ("backup summary", "backup")
+    assert resilience.breakers["primary"].state == "open"
+
+    assert asyncio.run(resilience.call(script)) == ("backup summary", "backup")
+    assert script.calls == ["primary", "backup", "backup"]
+
+
+def test_every_breaker_open_raises_circuit_open():
+    script = Script(primary=[status_error(503)], backup=[status_error(503)])
+    resilience = caller(breaker_failures=1, breaker_reset_seconds=60.0)
+
+    with pytest.raises(openai.InternalServerError):
+        asyncio.run(resilience.call(script))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call(script))
+    assert script.calls == ["primary", "backup"]
+
+
+def test_every_model_failing_raises_the_last_error():
+    script = Script(primary=[status_error(503)], backup=[status_error(400)])
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(caller().call(script))
+    assert script.calls == ["primary"] * 3 + ["backup"]
+
+
+def test_deadline_bounds_the_whole_call():
+    async def slow(model):
+        await asyncio.sleep(10)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(caller(deadline_seconds=0.05).call(slow))
+
+
+def test_slow_attempt_is_hedged():
+    resilience = caller(hedge_percentile=50, hedge_min_samples=1)
+    resilience.latencies["primary"].observe(0.01)
+    attempts = []
+
+    async def attempt(model):
+        attempts.append(model)
+        if len(attempts) == 1:
+            await asyncio.sleep(10)
+            return "first"
+        return "hedge"
+
+    assert asyncio.run(resilience.call(attempt)) == ("hedge", "primary")
+    assert attempts == ["primary", "primary"]
+
+
+def test_call_sync_retries_and_falls_back():
+    script = Script(primary=[status_error(429), status_error(400)], backup=["backup summary"])
+    resilience = caller(breaker_failures=2)
+
+    assert resilience.call_sync(script.sync) == ("backup summary", "backup")
+    assert script.calls == ["primary", "primary", "backup"]
+    assert resilience.breakers["primary"].state == "closed"
@@ -0,0 +1,124 @@
+# tests/test_singleflight.py
+#
+# SingleFlight: concurrent callers with one key share one call, its result
+# or its exception; and SQLiteLease's cross-process ownership.
+
+import asyncio
+
+from singleflight import SingleFlight, SQLiteLease
+
+
+class Call:
+    """An async function that counts its calls and returns once released."""
+
+    def __init__(self, result="summary", error: Exception | None = None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_callers_share_one_call():
+    async def main():
+        flights = SingleFlight()
+        call = Call()
+        callers = [asyncio.ensure_future(flights.do("key", call)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flights.inflight() == 1
+
+        call.release.set()
+        results = await asyncio.gather(*callers)
+
+        assert call.calls == 1
+        assert results == [("summary", False)] + [("summary", True)] * 4
+        assert flights.inflight() == 0
+
+    asyncio.run(main())
+
+
+def test_distinct_keys_and_later_calls_start_their_own_flight():
+    async def main():
+        flights = SingleFlight()
+        first, second = Call("a"), Call("b")
+        callers = [flights.do("a", first), flights.do("b", second)]
+        first.release.set()
+        second.release.set()
+        assert await asyncio.gather(*callers) == [("a", False), ("b", False)]
+
+        # The key was forgotten when its flight finished.
+        assert await flights.do("a", first) == ("a", False)
+        assert first.calls == 2
+
+    asyncio.run(main())
+
+
+def test_callers_share_the_exception():
+    async def main():
+        flights = SingleFlight()
+        call = Call(error=ValueError("LLM returned empty response"))
+        callers = [asyncio.ensure_future(flights.do("key", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        call.release.set()
+
+        results = await asyncio.gather(*callers, return_exceptions=True)
+
+        assert call.calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flights.inflight() == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_leaves_the_flight_running():
+    async def main():
+        flights = SingleFlight()
+        call = Call()
+        leader = asyncio.ensure_future(flights.do("key", call))
+        follower = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        call.release.set()
+
+        assert await follower == ("summary", True)
+        assert leader.cancelled()
+        assert call.calls == 1
+
+    asyncio.run(main())
+
+
+def test_lease_is_held_by_one_owner_until_released_or_expired(tmp_path):
+    path = str(tmp_path / "leases.sqlite")
+    first, second = SQLiteLease(path), SQLiteLease(path)
+
+    assert first.acquire("key")
+    assert not second.acquire("key")
+    assert second.held("key")
+
+    first.release("key")
+    assert not second.held("key")
+    assert second.acquire("key")
+
+    # A lapsed lease is taken over.
+    expiring = SQLiteLease(path, ttl_seconds=-1)
+    assert expiring.acquire("other")
+    assert not first.held("other")
+    assert first.acquire("other")
+
+
+def test_release_by_another_owner_keeps_the_lease(tmp_path):
+    path = str(tmp_path / "leases.sqlite")
+    owner, other = SQLiteLease(path), SQLiteLease(path)
+
+    assert owner.acquire("key")
+    other.release("key")
+    assert owner.held("key")
+    assert not other.acquire("key")
@@ -0,0 +1,81 @@
+# tests/test_vitals.py
+#
+# The vectorized VitalSummarizer and aggregate_vital_alerts against the
+# previous per-vital-type loop (alert mask precedence corrected), kept in
+# tests/reference.py.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from clinical_data import read_clinical_tables
+from summarizers import VitalSummarizer, aggregate_vital_alerts, classify_vital_alerts
+from tests.reference import loop_vital_summary, make_vitals, split_episodes
+
+KEYS = ["patient_id", "episode_id", "vital_type"]
+
+
+@pytest.fixture(scope="module")
+def vitals_csv() -> pd.DataFrame:
+    return pd.read_csv("data/vitals.csv")
+
+
+def test_matches_loop_on_data_vitals(vitals_csv):
+    for episode in split_episodes(vitals_csv):
+        assert VitalSummarizer(episode.copy()).summarize() == loop_vital_summary(episode.copy())
+
+
+def test_compact_dtypes_match_loop_on_raw_data(vitals_csv):
+    # float32 readings must still print as the CSV wrote them.
+    compact = read_clinical_tables("data", compact=True)["vitals_df"]
+    assert compact["reading"].dtype == np.float32
+
+    expected = {
+        key: loop_vital_summary(episode.copy())
+        for key, episode in vitals_csv.groupby(["patient_id", "episode_id"], sort=False)
+    }
+    for key, episode in compact.groupby(["patient_id", "episode_id"], sort=False, observed=True):
+        assert VitalSummarizer(episode.copy()).summarize() == expected[key]
+
+
+def test_matches_loop_on_synthetic_episodes():
+    for episode in split_episodes(make_vitals(5_000, rows_per_episode=100)):
+        assert VitalSummarizer(episode.copy()).summarize() == loop_vital_summary(episode.copy())
+
+
+def test_float32_reading_uses_shortest_repr():
+    df = pd.DataFrame({
+        "patient_id": [1, 1, 1],
+        "episode_id": [7, 7, 7],
+        "visit_date": ["2025-01-01", "2025-01-02", "2025-01-03"],
+        "vital_type": ["Temperature"] * 3,
+        "reading": np.array([99.1, 98.6, 97.2], dtype=np.float32),
+        "min_value": np.array([97.0] * 3, dtype=np.float32),
+        "max_value": np.array([98.5] * 3, dtype=np.float32),
+    })
+
+    facts = VitalSummarizer(df).summarize()
+
+    assert len(facts) == 1
+    assert facts[0]["statement"] == (
+        "Temperature has shown persistently elevated readings, most recently 98.6 on 2025-01-02."
+    )
+
+
+def test_aggregate_matches_per_group_counts():
+    # The cohort engine's multi-key path: one row per patient episode and
+    # vital type, with the loop's counts and latest alert.
+    df = make_vitals(5_000, rows_per_episode=100, seed=1)
+    df = df.assign(alert=classify_vital_alerts(df))
+
+    stats = aggregate_vital_alerts(df, KEYS).set_index(KEYS)
+
+    alerts = df[df["alert"] != "Stable"]
+    assert len(stats) == alerts.groupby(KEYS).ngroups
+    for key, group in alerts.groupby(KEYS):
+        latest = group.sort_values("visit_date", kind="stable").iloc[-1]
+        row = stats.loc[key]
+        assert row["high_count"] == (group["alert"] == "high").sum()
+        assert row["low_count"] == (group["alert"] == "low").sum()
+        assert row["reading"] == latest["reading"]
+        assert row["last_date"] == latest["visit_date"].strftime("%Y-%m-%d")